@@ -0,0 +1,76 @@
+# Kline decode: the former chart_component path (12-column frame from the
+# REST rows, per-column astype, timestamp round-trip) against decode_klines
+# + kline_frame. Reports time, peak allocation and the frame's size.
+#
+#   python -m benchmarks.bench_decode [--rows 300 10000] [--repeat 20]
+
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from core.klines import decode_klines, kline_frame
+
+
+def synthetic_rows(rows, step=60_000):
+    start = 1_600_000_000_000
+    return [
+        [
+            start + i * step,
+            f"{100 + i % 7:.8f}", f"{101 + i % 5:.8f}", f"{99 + i % 3:.8f}",
+            f"{100.5 + i % 4:.8f}", f"{1234.5 + i:.8f}",
+            start + (i + 1) * step - 1, "123456.78900000", 100 + i % 50,
+            "600.00000000", "60000.00000000", "0",
+        ]
+        for i in range(rows)
+    ]
+
+
+def legacy_frame(data):
+    df = pd.DataFrame(data, columns=['TIMESTAMP', 'OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME', 'CLOSE_TIME', 'QUOTE_VOL', 'TRADES', 'TB_BASE_VOL', 'TB_QUOTE_VOL', 'IGNORE'])
+    for col in ['OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']:
+        df[col] = df[col].astype(float)
+    df['TIMESTAMP'] = df['TIMESTAMP'].astype(float) / 1000.0
+    df['UTCTIME'] = pd.to_datetime(df['TIMESTAMP'].astype(int), unit='s')
+    return df
+
+
+def decoded_frame(data):
+    return kline_frame(decode_klines(data))
+
+
+def measure(fn, data, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(data)
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+
+    tracemalloc.start()
+    df = fn(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, int(df.memory_usage(deep=True).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[300, 10_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'rows':>7} {'path':<8} {'ms':>8} {'peak KiB':>9} {'frame KiB':>10}")
+    for rows in args.rows:
+        data = synthetic_rows(rows)
+        legacy, decoded = legacy_frame(data), decoded_frame(data)
+        for column in ('OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME', 'TIMESTAMP'):
+            assert (legacy[column].to_numpy() == decoded[column].to_numpy()).all(), column
+        assert (legacy['UTCTIME'].to_numpy() == decoded['UTCTIME'].to_numpy()).all()
+
+        for name, fn in (("legacy", legacy_frame), ("decode", decoded_frame)):
+            ms, peak, size = measure(fn, data, args.repeat)
+            print(f"{rows:>7} {name:<8} {ms:>8.2f} {peak / 1024:>9.0f} {size / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
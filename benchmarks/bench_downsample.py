@@ -0,0 +1,82 @@
+# Figure payload size and serialization time against chart range, with and
+# without downsampling. The figure mirrors chart_component's Candlestick +
+# VOL + MA layout.
+#
+#   python -m benchmarks.bench_downsample [--ranges 300 1000 5000 20000] [--budget 500]
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from core.downsample import downsample_candles, downsample_line
+
+
+def synthetic_frame(rows, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, rows))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    df = pd.DataFrame({
+        'UTCTIME': pd.date_range("2020-01-01", periods=rows, freq="h"),
+        'OPEN': open_,
+        'HIGH': np.maximum(open_, close) + rng.uniform(0, 1, rows),
+        'LOW': np.minimum(open_, close) - rng.uniform(0, 1, rows),
+        'CLOSE': close,
+        'VOLUME': rng.uniform(100, 1000, rows),
+    })
+    for window in (7, 50, 100):
+        df[f'MA{window}'] = df['CLOSE'].rolling(window).mean()
+    return df
+
+
+def build_figure(df, budget=None):
+    candles = df if budget is None else downsample_candles(df, budget)
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.00, row_heights=[0.85, 0.15])
+    fig.add_trace(go.Candlestick(
+        x=candles['UTCTIME'], open=candles['OPEN'], high=candles['HIGH'],
+        low=candles['LOW'], close=candles['CLOSE']), row=1, col=1)
+    fig.add_trace(go.Bar(
+        x=candles['UTCTIME'], y=candles['VOLUME'],
+        marker_color=np.where(candles['CLOSE'] > candles['OPEN'], 'green', 'red')), row=2, col=1)
+    for column in ('MA7', 'MA50', 'MA100'):
+        if budget is None:
+            x, y = df['UTCTIME'], df[column]
+        else:
+            x, y = downsample_line(df, column, budget)
+        fig.add_trace(go.Scatter(x=x, y=y, mode='lines'), row=1, col=1)
+    fig.update_layout(template='plotly_dark', xaxis_rangeslider_visible=False)
+    return fig
+
+
+def measure(df, budget, repeat):
+    build = serialize = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fig = build_figure(df, budget)
+        built = time.perf_counter()
+        payload = fig.to_json()
+        serialize += time.perf_counter() - built
+        build += built - start
+    return build / repeat * 1000, serialize / repeat * 1000, len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ranges", type=int, nargs="+", default=[300, 1000, 5000, 20000])
+    parser.add_argument("--budget", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'range':>7} {'mode':<11} {'build ms':>9} {'json ms':>9} {'json KiB':>9}")
+    for rows in args.ranges:
+        df = synthetic_frame(rows)
+        for mode, budget in (("full", None), ("downsample", args.budget)):
+            build_ms, json_ms, size = measure(df, budget, args.repeat)
+            print(f"{rows:>7} {mode:<11} {build_ms:>9.1f} {json_ms:>9.1f} {size / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
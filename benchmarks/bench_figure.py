@@ -0,0 +1,71 @@
+# Chart figure build and serialize time per configuration: a template built
+# from scratch (first run of a configuration) against refilling a cached one
+# (every later run). Serialization is what st.plotly_chart does with a
+# figure: to_dict() and plotly.io.to_json(validate=False).
+#
+#   python -m benchmarks.bench_figure [--rows 300] [--repeat 20]
+
+import argparse
+import time
+
+import plotly.io as pio
+
+from benchmarks.bench_downsample import synthetic_frame
+from core.downsample import downsample_candles, downsample_line
+from core.figure import ChartTemplate, OVERLAYS
+
+CHART_TYPES = ("Candlestick", "Line", "OHLC")
+INDICATOR_SETS = ((), ("VOL",), ("MA",), ("EMA",), ("VOL", "MA"), ("VOL", "EMA"))
+
+
+def fill_args(df, chart_type, budget):
+    close_line = downsample_line(df, 'CLOSE', budget) if chart_type == "Line" else None
+    lines = {
+        column: downsample_line(df, column, budget)
+        for overlay in OVERLAYS.values() for column, _, _ in overlay
+    }
+    return {
+        "candles": downsample_candles(df, budget),
+        "close_line": close_line,
+        "lines": lines,
+        "volume_name": "Volume (BTC)",
+        "overlay_text": {"MA": "MA", "EMA": "EMA"},
+    }
+
+
+def serialize(fig):
+    return pio.to_json(fig.to_dict(), validate=False)
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=300)
+    parser.add_argument("--budget", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    for window in (7, 50, 100):
+        df[f'EMA{window}'] = df['CLOSE'].ewm(span=window, adjust=False).mean()
+
+    print(f"engine: {pio.json.config.default_engine}, rows: {args.rows}")
+    print(f"{'chart':<12} {'indicators':<8} {'cold ms':>8} {'fill ms':>8} {'json ms':>8} {'json KiB':>9}")
+    for chart_type in CHART_TYPES:
+        kwargs = fill_args(df, chart_type, args.budget)
+        for indicators in INDICATOR_SETS:
+            cold_ms, _ = timed(lambda: ChartTemplate(chart_type, indicators).fill(**kwargs), max(1, args.repeat // 4))
+            template = ChartTemplate(chart_type, indicators)
+            fill_ms, fig = timed(lambda: template.fill(**kwargs), args.repeat)
+            json_ms, payload = timed(lambda: serialize(fig), args.repeat)
+            print(f"{chart_type:<12} {'+'.join(indicators) or '-':<8} {cold_ms:>8.1f} {fill_ms:>8.2f} {json_ms:>8.2f} {len(payload) / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Cold import time of the core modules, each in a fresh interpreter, and the
+# heavy libraries each one pulls in. Modules in HEADLESS are what workers, the
+# bot and the benchmarks import; the run fails if any of them loads
+# streamlit or plotly. With --top, the slowest imports under each module are
+# listed from `python -X importtime`.
+#
+#   python -m benchmarks.bench_import [--modules core.klines ...] [--repeat 5] [--top 0]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEADLESS = (
+    "core.binance",
+    "core.klines",
+    "core.archive",
+    "core.kernels",
+    "core.indicator_engine",
+    "core.payload",
+    "core.screener",
+    "core.reference",
+    "core.ath",
+    "core.fng",
+    "core.ai",
+    "core.ai_jobs",
+    "core.ai_batch",
+    "core.stream",
+    "core.metrics",
+    "core.figure",
+)
+RENDERING = ("core.downsample", "core.indicators", "streamlit", "plotly.graph_objects", "pandas")
+HEAVY = ("streamlit", "plotly", "pandas")
+FORBIDDEN = ("streamlit", "plotly")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run(args, env):
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True, env=env)
+
+
+def probe(module, env):
+    out = run(["-c", PROBE.format(module=module, heavy=HEAVY)], env)
+    return json.loads(out.stdout)
+
+
+def slowest(module, env, top):
+    # (cumulative us, name) of the slowest imports, from -X importtime.
+    err = run(["-X", "importtime", "-c", f"import {module}"], env).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[1:top + 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", nargs="+", default=list(HEADLESS + RENDERING))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0)
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=os.getcwd() + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    failed = []
+
+    print(f"{'module':<24} {'median ms':>10} {'min ms':>8}  loads")
+    for module in args.modules:
+        runs = [probe(module, env) for _ in range(args.repeat)]
+        times = [r["ms"] for r in runs]
+        loaded = runs[-1]["loaded"]
+        print(f"{module:<24} {statistics.median(times):>10.1f} {min(times):>8.1f}  {', '.join(loaded) or '-'}")
+        if module in HEADLESS and any(m in loaded for m in FORBIDDEN):
+            failed.append(module)
+        for cumulative, name in slowest(module, env, args.top) if args.top else ():
+            print(f"    {name:<36} {cumulative / 1000:>8.1f}")
+
+    if failed:
+        sys.exit(f"not headless: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
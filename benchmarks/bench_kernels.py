@@ -0,0 +1,65 @@
+# Times core.kernels against the pandas formulas in core.indicators. That the
+# outputs are identical is asserted by tests/test_kernels.py.
+#
+#   python -m benchmarks.bench_kernels [--rows 300 5000] [--repeat 200]
+
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from core import indicators, kernels
+
+
+def synthetic_ohlc(rows, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, rows))
+    high = close + rng.uniform(0, 2, rows)
+    low = close - rng.uniform(0, 2, rows)
+    # A flat stretch exercises the zero-range / equal-value branches.
+    flat = slice(rows // 3, rows // 3 + 10)
+    close[flat] = high[flat] = low[flat] = close[rows // 3 - 1]
+    return high, low, close
+
+
+def cases(high, low, close):
+    h, l, c = pd.Series(high), pd.Series(low), pd.Series(close)
+    return {
+        "rsi": (
+            lambda: indicators.calculate_rsi(c, 14),
+            lambda: kernels.rsi(close, 14),
+        ),
+        "macd": (
+            lambda: indicators.calculate_macd(c),
+            lambda: kernels.macd(close),
+        ),
+        "adx": (
+            lambda: indicators.calculate_adx(h, l, c, 14),
+            lambda: kernels.adx(high, low, close, 14),
+        ),
+        "atr": (
+            lambda: pd.concat([h - l, (h - c.shift()).abs(), (l - c.shift()).abs()], axis=1)
+            .max(axis=1).ewm(alpha=1 / 14, adjust=False).mean(),
+            lambda: kernels.atr(high, low, close, 14),
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[300, 5000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'rows':>6} {'kernel':<6} {'pandas ms':>10} {'numpy ms':>10} {'speedup':>8}")
+    for rows in args.rows:
+        high, low, close = synthetic_ohlc(rows)
+        for name, (reference, kernel) in cases(high, low, close).items():
+            pandas_ms = timeit.timeit(reference, number=args.repeat) / args.repeat * 1000
+            numpy_ms = timeit.timeit(kernel, number=args.repeat) / args.repeat * 1000
+            print(f"{rows:>6} {name:<6} {pandas_ms:>10.3f} {numpy_ms:>10.3f} {pandas_ms / numpy_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# End-to-end pipeline timings against the local stand-in server, so runs are
+# offline and repeatable. Each stage is timed per symbol:
+#
+#   fetch        paginated /klines download and JSON parse
+#   decode       REST rows -> KLINE_DTYPE records
+#   indicators   payload indicator kernels over the whole history
+#   engine       streaming indicator update with only the live candle new
+#   payload      technical payload build
+#   figure_build chart template build + fill (first run of a configuration)
+#   figure_fill  refill of a cached template
+#   serialize    figure to JSON, as st.plotly_chart does it
+#   ticker       /ticker/24hr request
+#   ai_request   OpenRouter request and parse
+#
+# With --app, full script runs of main.py (cold and warm) are timed too.
+# Output is one JSON object per stage and configuration (--format jsonl), keyed
+# by commit, for comparing runs across commits.
+#
+#   python -m benchmarks.bench_pipeline [--symbols 1 8] [--rows 300 5000] [--repeat 5]
+#       [--fixtures DIR] [--format jsonl|table] [--output FILE] [--app]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import standin
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def symbols(count):
+    from core.screener import binance_symbol
+    from core.symbols import CRYPTO_OPTIONS
+
+    names = [binance_symbol(i) for i in CRYPTO_OPTIONS]
+    return (names + [f"S{i:03d}USDT" for i in range(count)])[:count]
+
+
+def fetch_history(symbol, interval, rows):
+    from core.binance import fetch_klines
+    from core.klines import INTERVAL_MS, KLINE_PAGE_LIMIT
+
+    if rows <= KLINE_PAGE_LIMIT:
+        return fetch_klines(symbol, interval, rows)
+    start = int(time.time() * 1000) - rows * INTERVAL_MS[interval]
+    out = []
+    while len(out) < rows:
+        page = fetch_klines(symbol, interval, KLINE_PAGE_LIMIT, start_time=start)
+        out.extend(page)
+        if len(page) < KLINE_PAGE_LIMIT:
+            break
+        start = page[-1][0] + 1
+    return out[-rows:]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+
+    def time(self, stage, fn):
+        start = time.perf_counter()
+        result = fn()
+        self.samples.setdefault(stage, []).append((time.perf_counter() - start) * 1000)
+        return result
+
+
+def run_pipeline(symbol_names, rows, interval, recorder):
+    import plotly.io as pio
+
+    from core.ai import parse_ai_insight, request_ai_insight
+    from core.binance import fetch_ticker_24hr
+    from core.downsample import downsample_candles, downsample_line
+    from core.figure import ChartTemplate, OVERLAYS
+    from core.indicator_engine import IndicatorEngine
+    from core.klines import decode_klines, kline_frame
+    from core.payload import PAYLOAD_HISTORY, build_technical_payload, indicator_columns
+
+    budget = 500
+    for symbol in symbol_names:
+        raw = recorder.time("fetch", lambda: fetch_history(symbol, interval, rows))
+        klines = recorder.time("decode", lambda: decode_klines(raw))
+        high, low, close = klines['high'], klines['low'], klines['close']
+        columns = recorder.time("indicators", lambda: indicator_columns(high, low, close))
+
+        # Fed the frame columns, as chart_component does.
+        df = kline_frame(klines)
+        engine = IndicatorEngine(max(len(klines), PAYLOAD_HISTORY))
+        engine.update(df['TIMESTAMP'], df['HIGH'], df['LOW'], df['CLOSE'])
+        indicators = recorder.time("engine", lambda: engine.update(df['TIMESTAMP'], df['HIGH'], df['LOW'], df['CLOSE']))
+
+        tail = slice(-PAYLOAD_HISTORY, None)
+        payload_columns = {name: values[tail] for name, values in columns.items()}
+        recorder.time("payload", lambda: build_technical_payload(symbol, close[tail], payload_columns, 50, "Neutral"))
+
+        for name, values in indicators.items():
+            df[name] = values
+        fill = {
+            "candles": downsample_candles(df, budget),
+            "lines": {
+                column: downsample_line(df, column, budget)
+                for overlay in OVERLAYS.values() for column, _, _ in overlay
+            },
+            "volume_name": f"Volume ({symbol})",
+            "overlay_text": {"MA": "MA", "EMA": "EMA"},
+        }
+        recorder.time("figure_build", lambda: ChartTemplate("Candlestick", ("VOL", "MA")).fill(**fill))
+        template = ChartTemplate("Candlestick", ("VOL", "MA"))
+        fig = recorder.time("figure_fill", lambda: template.fill(**fill))
+        recorder.time("serialize", lambda: pio.to_json(fig.to_dict(), validate=False))
+
+        recorder.time("ticker", lambda: fetch_ticker_24hr(symbol))
+        recorder.time("ai_request", lambda: parse_ai_insight(request_ai_insight({"instrument": symbol}, "standin")))
+
+
+def rendered(at):
+    # AppTest leaves at.exception empty when main.py does not even compile,
+    # so a run only counts once the page's metrics are there.
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    if not at.metric:
+        raise RuntimeError("main.py rendered no metrics")
+    return at
+
+
+def run_app(recorder, repeat):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, "main.py"), default_timeout=120)
+    recorder.time("app_cold", lambda: rendered(at.run()))
+    for _ in range(repeat):
+        recorder.time("app_warm", lambda: rendered(at.run()))
+
+
+def summarize(stage, samples, config):
+    samples = sorted(samples)
+    return {
+        **config,
+        "stage": stage,
+        "runs": len(samples),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--rows", type=int, nargs="+", default=[300, 5000])
+    parser.add_argument("--interval", default="1h", choices=["1m", "1h", "1d"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fixtures", help="directory of recorded responses (see benchmarks.standin)")
+    parser.add_argument("--format", default="jsonl", choices=["jsonl", "table"])
+    parser.add_argument("--output", help="append results to this file instead of printing them")
+    parser.add_argument("--app", action="store_true", help="also time full runs of main.py")
+    args = parser.parse_args()
+
+    server, base_url = standin.start(fixtures=args.fixtures)
+    # Before any core import: module constants read these.
+    os.environ.update(standin.environ(base_url))
+    os.environ.setdefault("DASHBOARD_DATA_DIR", tempfile.mkdtemp(prefix="bench-"))
+    # Always empty, so a market worker running on this host cannot serve
+    # the cold app runs.
+    os.environ["MARKET_DATA_DIR"] = tempfile.mkdtemp(prefix="bench-market-")
+
+    # One discarded pass pays for imports and first-call setup.
+    run_pipeline(symbols(1), min(args.rows), args.interval, Recorder())
+
+    results = []
+    base = {"commit": commit(), "python": sys.version.split()[0], "interval": args.interval}
+    for count in args.symbols:
+        for rows in args.rows:
+            recorder = Recorder()
+            for _ in range(args.repeat):
+                run_pipeline(symbols(count), rows, args.interval, recorder)
+            config = {**base, "symbols": count, "rows": rows}
+            results.extend(summarize(stage, samples, config) for stage, samples in recorder.samples.items())
+    if args.app:
+        recorder = Recorder()
+        run_app(recorder, args.repeat)
+        results.extend(summarize(stage, samples, {**base, "symbols": 1, "rows": None}) for stage, samples in recorder.samples.items())
+    server.shutdown()
+
+    if args.format == "table":
+        lines = [f"{'symbols':>7} {'rows':>6} {'stage':<13} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}"]
+        lines += [
+            f"{r['symbols']:>7} {r['rows'] or '-':>6} {r['stage']:<13} {r['mean_ms']:>9.3f} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f}"
+            for r in results
+        ]
+    else:
+        lines = [json.dumps(r, sort_keys=True) for r in results]
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write("\n".join(lines) + "\n")
+    else:
+        print("\n".join(lines))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+# Local stand-in for the Binance, alternative.me and OpenRouter endpoints the
+# dashboard calls, for offline benchmarks and runs. Responses are replayed
+# from recorded fixtures when one matches the request, otherwise generated:
+# deterministic per symbol, with candles on the real clock's interval
+# boundaries.
+#
+# A WebSocket endpoint stands in for Binance's combined stream: it pushes
+# 24hrTicker and kline events for the subscribed streams and answers (and
+# records) SUBSCRIBE/UNSUBSCRIBE requests.
+#
+#   python -m benchmarks.standin [--port 8765] [--ws-port 8766] [--fixtures DIR] [--ai-delay 0.5]
+#   python -m benchmarks.standin --record DIR BTCUSDT ETHUSDT
+#
+# Point the app at it with
+#
+#   BINANCE_API_URL=http://127.0.0.1:8765/api/v3 \
+#   FNG_API_URL=http://127.0.0.1:8765/fng/ \
+#   OPENROUTER_URL=http://127.0.0.1:8765/api/v1/chat/completions \
+#   BINANCE_WS_URL=ws://127.0.0.1:8766/stream streamlit run main.py
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import numpy as np
+import requests
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+STEP_MS = {"1m": 60_000, "1h": 3_600_000, "1d": 86_400_000}
+# No candle opens before this; symbols are listed at the first candle of
+# each interval from here on.
+LISTED_MS = 1_500_000_000_000
+
+LIVE_URLS = {
+    "/api/v3": "https://data-api.binance.vision/api/v3",
+    "/fng/": "https://api.alternative.me/fng/",
+}
+
+
+def fixture_name(path, query):
+    # File a recorded response is stored under. limit and startTime are left
+    # out: one recording of a series answers every window of it, sliced by
+    # replay_fixture, including incremental refreshes.
+    params = sorted((k, v) for k, v in query.items() if k not in ("limit", "startTime"))
+    return (path.strip("/").replace("/", "_") + "_" + urlencode(params)).replace("&", "_").replace("=", "-") + ".json"
+
+
+def replay_fixture(path, query, body):
+    # The part of a recording the request asks for: klines at or after
+    # startTime, or the latest ones, up to `limit`; the newest `limit`
+    # Fear & Greed points (all of them for limit=0).
+    if path.endswith("/klines"):
+        limit = int(query.get("limit", 500))
+        if "startTime" in query:
+            start = int(query["startTime"])
+            return [k for k in body if k[0] >= start][:limit]
+        return body[-limit:]
+    if path.startswith("/fng") and int(query.get("limit", 1)):
+        return dict(body, data=body["data"][:int(query.get("limit", 1))])
+    return body
+
+
+HOUR_MS = 3_600_000
+
+
+def hourly_prices(seed, hours):
+    # The base series every interval's candles are cut from: one price per
+    # hour since the epoch. Slow swings for the daily and monthly views,
+    # faster ones and noise for the intraday ones.
+    h = hours.astype(np.float64)
+    return 100 * (
+        1.5 + 0.4 * np.sin(h / 2328 + seed) + 0.1 * np.sin(h / 328.8 + 2 * seed) + 0.02 * np.sin(h / 13.7 + seed)
+    ) + np.sin(h * 12.9898 + seed) % 1 * 0.5
+
+
+def candle_index(interval, ms):
+    # Index of the candle containing `ms`. As on Binance, candles open on
+    # multiples of the interval since the epoch (UTC midnight for 1d) and
+    # on calendar months for 1M.
+    if interval == "1M":
+        day = datetime.fromtimestamp(ms / 1000, timezone.utc)
+        return (day.year - 1970) * 12 + day.month - 1
+    return ms // STEP_MS[interval]
+
+
+def candle_open(interval, index):
+    if interval == "1M":
+        return int(datetime(1970 + index // 12, index % 12 + 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+    return index * STEP_MS[interval]
+
+
+def first_index(interval, ms):
+    # Index of the first candle opening at or after `ms`.
+    index = candle_index(interval, ms)
+    return index if candle_open(interval, index) >= ms else index + 1
+
+
+def candles(symbol, interval, indices):
+    # REST rows for consecutive candle indices. Every interval is cut from
+    # the same hourly series, interpolated linearly within the hour, so a
+    # candle's high and low bound those of the shorter candles inside it
+    # (the 1M highs hold the all-time high of every other interval).
+    if not len(indices):
+        return []
+    seed = zlib.crc32(symbol.encode()) % 1000
+    bounds = [candle_open(interval, i) for i in range(indices[0], indices[-1] + 2)]
+    first_hour, last_hour = bounds[0] // HOUR_MS, -(-bounds[-1] // HOUR_MS)
+    hourly = hourly_prices(seed, np.arange(first_hour, last_hour + 1))
+
+    def price_at(ms):
+        k, frac = divmod(ms - first_hour * HOUR_MS, HOUR_MS)
+        if not frac:
+            return float(hourly[k])
+        return float(hourly[k] + (hourly[k + 1] - hourly[k]) * frac / HOUR_MS)
+
+    rows = []
+    listed = first_index(interval, LISTED_MS)
+    for index, open_time, close_time in zip(indices, bounds, bounds[1:]):
+        open_, close = price_at(open_time), price_at(close_time)
+        inside = hourly[-(-open_time // HOUR_MS) - first_hour:close_time // HOUR_MS - first_hour + 1]
+        high = max(open_, close, float(inside.max()) if len(inside) else open_) * 1.004
+        low = min(open_, close, float(inside.min()) if len(inside) else open_) * 0.996
+        volume = 1000 + ((index - listed) * 7919) % 500
+        rows.append([
+            open_time, f"{open_:.8f}", f"{high:.8f}", f"{low:.8f}", f"{close:.8f}", f"{volume:.8f}",
+            close_time - 1, f"{volume * close:.8f}", 100, f"{volume / 2:.8f}", f"{volume * close / 2:.8f}", "0",
+        ])
+    return rows
+
+
+def candle(symbol, interval, open_time):
+    index = candle_index(interval, open_time)
+    return candles(symbol, interval, [index])[0]
+
+
+def current_open(interval, now=None):
+    # Open time of the candle that is live now.
+    now = int(time.time() * 1000) if now is None else now
+    return candle_open(interval, candle_index(interval, now))
+
+
+def klines(query):
+    interval = query.get("interval", "1d")
+    limit = int(query.get("limit", 500))
+    listed = first_index(interval, LISTED_MS)
+    last = candle_index(interval, int(time.time() * 1000))
+    if "startTime" in query:
+        first = max(listed, first_index(interval, int(query["startTime"])))
+        indices = range(first, min(last, first + limit - 1) + 1)
+    else:
+        indices = range(max(listed, last - limit + 1), last + 1)
+    return candles(query["symbol"], interval, indices)
+
+
+def ticker_24hr(query):
+    day = candle(query["symbol"], "1d", current_open("1d"))
+    return {
+        "symbol": query["symbol"],
+        "lastPrice": day[4],
+        "priceChangePercent": f"{(float(day[4]) / float(day[1]) - 1) * 100:.3f}",
+        "highPrice": day[2],
+        "lowPrice": day[3],
+        "closeTime": int(time.time() * 1000),
+    }
+
+
+def fng(query):
+    limit = int(query.get("limit", 1)) or 2000
+    day = int(time.time()) // 86400 * 86400
+    classes = ((25, "Extreme Fear"), (45, "Fear"), (55, "Neutral"), (75, "Greed"), (101, "Extreme Greed"))
+    data = []
+    for i in range(limit):
+        value = int(50 + 40 * math.sin((day // 86400 - i) / 9))
+        data.append({
+            "value": str(value),
+            "value_classification": next(name for bound, name in classes if value < bound),
+            "timestamp": str(day - i * 86400),
+            "time_until_update": str(86400 - int(time.time()) % 86400) if i == 0 else None,
+        })
+    return {"name": "Fear and Greed Index", "data": data, "metadata": {"error": None}}
+
+
+def stream_event(name):
+    # Combined-stream payload for "<symbol>@ticker" or "<symbol>@kline_<interval>".
+    symbol, kind = name.split("@")
+    symbol = symbol.upper()
+    now = int(time.time() * 1000)
+    if kind == "ticker":
+        ticker = ticker_24hr({"symbol": symbol})
+        return {
+            "e": "24hrTicker", "E": now, "s": symbol,
+            "c": ticker["lastPrice"], "P": ticker["priceChangePercent"],
+            "h": ticker["highPrice"], "l": ticker["lowPrice"], "C": ticker["closeTime"],
+        }
+    interval = kind[len("kline_"):]
+    k = candle(symbol, interval, current_open(interval, now))
+    return {
+        "e": "kline", "E": now, "s": symbol,
+        "k": {
+            "t": k[0], "T": k[6], "s": symbol, "i": interval,
+            "o": k[1], "h": k[2], "l": k[3], "c": k[4], "v": k[5],
+            "n": k[8], "x": False, "q": k[7], "V": k[9], "Q": k[10], "B": "0",
+        },
+    }
+
+
+def chat_completion():
+    content = {"buy_confidence": 0.4, "hold_confidence": 0.4, "sell_confidence": 0.2, "reasoning": "Stand-in response."}
+    return {"model": "standin/model", "choices": [{"message": {"content": json.dumps(content)}}]}
+
+
+class StandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fixtures=None, ai_delay=0.0):
+        super().__init__(address, _Handler)
+        self.fixtures = fixtures
+        self.ai_delay = ai_delay
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def count(self, path):
+        with self._lock:
+            self.counts[path] = self.counts.get(path, 0) + 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = dict(parse_qsl(url.query))
+        self.server.count(url.path)
+
+        body = self._fixture(url.path, query)
+        if body is None:
+            if url.path.endswith("/klines"):
+                body = klines(query)
+            elif url.path.endswith("/ticker/24hr"):
+                body = ticker_24hr(query)
+            elif url.path.startswith("/fng"):
+                body = fng(query)
+            else:
+                return self._send(404, {"error": "not found"})
+        self._send(200, body, {"X-MBX-USED-WEIGHT-1M": "1"})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        self.server.count(path)
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not path.endswith("/chat/completions"):
+            return self._send(404, {"error": "not found"})
+        if self.server.ai_delay:
+            time.sleep(self.server.ai_delay)
+        self._send(200, chat_completion())
+
+    def _fixture(self, path, query):
+        if not self.server.fixtures:
+            return None
+        try:
+            with open(os.path.join(self.server.fixtures, fixture_name(path, query))) as f:
+                return replay_fixture(path, query, json.load(f))
+        except OSError:
+            return None
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInStream:
+    # Combined-stream endpoint (/stream?streams=a/b). Every `every` seconds
+    # each connection gets one event per subscribed stream. SUBSCRIBE and
+    # UNSUBSCRIBE requests are applied, answered and kept in `requests`;
+    # `paused` holds the events back and `drop()` closes every connection.
+
+    def __init__(self, every=0.5):
+        self.every = every
+        self.paused = False
+        self.requests = []
+        self.connects = []
+        self._connections = set()
+        self._loop = None
+        self._server = None
+
+    def start(self, port=0):
+        # Serves on a background thread; returns the stream URL.
+        ready = threading.Event()
+
+        async def open_server():
+            return await serve(self._handle, "127.0.0.1", port)
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(open_server())
+            ready.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=run, daemon=True, name="standin-stream").start()
+        ready.wait()
+        return f"ws://127.0.0.1:{self._server.sockets[0].getsockname()[1]}/stream"
+
+    def drop(self):
+        async def close_all():
+            for connection in list(self._connections):
+                await connection.close()
+
+        asyncio.run_coroutine_threadsafe(close_all(), self._loop).result()
+
+    def stop(self):
+        async def close():
+            self._server.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    async def _handle(self, connection):
+        query = dict(parse_qsl(urlsplit(connection.request.path).query))
+        streams = set(filter(None, query.get("streams", "").split("/")))
+        self.connects.append(sorted(streams))
+        self._connections.add(connection)
+        sender = asyncio.ensure_future(self._send_events(connection, streams))
+        try:
+            async for message in connection:
+                request = json.loads(message)
+                params = request.get("params", [])
+                self.requests.append((request["method"], sorted(params)))
+                if request["method"] == "SUBSCRIBE":
+                    streams.update(params)
+                elif request["method"] == "UNSUBSCRIBE":
+                    streams.difference_update(params)
+                await connection.send(json.dumps({"result": None, "id": request.get("id")}))
+        except ConnectionClosed:
+            pass
+        finally:
+            sender.cancel()
+            self._connections.discard(connection)
+
+    async def _send_events(self, connection, streams):
+        while True:
+            if not self.paused:
+                for name in sorted(streams):
+                    await connection.send(json.dumps({"stream": name, "data": stream_event(name)}))
+            await asyncio.sleep(self.every)
+
+
+def start(port=0, fixtures=None, ai_delay=0.0):
+    # Serves on a background thread; returns (server, base URL).
+    server = StandIn(("127.0.0.1", port), fixtures, ai_delay)
+    threading.Thread(target=server.serve_forever, daemon=True, name="standin").start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def start_stream(port=0, every=0.5):
+    # Returns (stream server, ws URL).
+    stream = StandInStream(every)
+    return stream, stream.start(port)
+
+
+def environ(base_url, ws_url=None):
+    # Environment that points the core modules at a stand-in; it must be in
+    # place before they are imported. Without `ws_url` the stream URL points
+    # where nothing listens, so the live mode falls back to REST.
+    return {
+        "BINANCE_API_URL": f"{base_url}/api/v3",
+        "FNG_API_URL": f"{base_url}/fng/",
+        "OPENROUTER_URL": f"{base_url}/api/v1/chat/completions",
+        "BINANCE_WS_URL": ws_url or "ws://127.0.0.1:1",
+    }
+
+
+def record(directory, symbols, intervals=("1d", "1h", "1m"), limit=1000):
+    # Saves live responses covering the requests a dashboard run makes: a
+    # full page of every series and the whole Fear & Greed history.
+    os.makedirs(directory, exist_ok=True)
+    requests_ = [("/fng/", {"limit": "0", "format": "json"})]
+    for symbol in symbols:
+        requests_.append(("/api/v3/ticker/24hr", {"symbol": symbol}))
+        for interval in ("1M",) + tuple(intervals):
+            requests_.append(("/api/v3/klines", {"symbol": symbol, "interval": interval, "limit": str(limit)}))
+    for path, query in requests_:
+        prefix = next(p for p in LIVE_URLS if path.startswith(p))
+        response = requests.get(LIVE_URLS[prefix] + path[len(prefix):], params=query, timeout=(3.05, 30))
+        response.raise_for_status()
+        with open(os.path.join(directory, fixture_name(path, query)), "w") as f:
+            json.dump(response.json(), f)
+        print(f"recorded {path} {query}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ws-port", type=int, default=8766)
+    parser.add_argument("--fixtures", help="directory of recorded responses to replay")
+    parser.add_argument("--ai-delay", type=float, default=0.0, help="seconds each AI response takes")
+    parser.add_argument("--record", metavar="DIR", help="record live responses into DIR and exit")
+    parser.add_argument("symbols", nargs="*", default=["BTCUSDT"])
+    args = parser.parse_args()
+
+    if args.record:
+        return record(args.record, args.symbols)
+    server, base_url = start(args.port, args.fixtures, args.ai_delay)
+    stream, ws_url = start_stream(args.ws_port)
+    print(f"serving on {base_url} and {ws_url}")
+    for name, value in environ(base_url, ws_url).items():
+        print(f"  {name}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        stream.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+
+from core.cache import SingleFlight
+from core.http import session
+from core.metrics import metrics
+from core.storage import data_path, file_lock, read_json, write_json
+
+OPENROUTER_URL = os.environ.get("OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions")
+AI_MODEL = "google/gemini-3-flash-preview"
+# (connect, read) seconds; LLM responses take a while.
+AI_TIMEOUT = (3.05, 90)
+
+AI_CACHE_PATH = data_path("ai_cache.json")
+AI_CACHE_TTL = 3600
+AI_CACHE_ENTRIES = 2048
+# Payload numbers are rounded to this many significant digits before
+# hashing, so live-tick noise in the closes still hits the cache.
+AI_CACHE_SIGNIFICANT_DIGITS = 4
+
+
+SYSTEM_PROMPT = """
+You are a professional crypto technical analyst.
+
+STRICT RULES:
+- Analyze ONLY provided data
+- Do NOT assume external market context
+- Be consistent and deterministic in reasoning.
+"""
+
+
+def build_user_prompt(payload):
+    return f"""
+You are analyzing crypto technical indicators on the DAILY timeframe.
+
+OUTPUT RULES:
+- buy_confidence + hold_confidence + sell_confidence MUST sum to 1.0
+- Higher value = stronger directional bias.
+
+DATA STRUCTURE:
+- Any field ending with `_last_N` is a LIST ordered chronologically.
+- The FIRST element is the OLDEST value.
+- The LAST element is the MOST RECENT value.
+
+PAYLOAD FIELD DESCRIPTIONS:
+- price_last_14: Closing prices of the last 14 daily candles ordered chronologically.
+- ema_20: Latest EMA(20) value representing short-term trend baseline.
+- ema_50: Latest EMA(50) value representing mid-term trend baseline.
+- ema_100: Latest EMA(100) value representing long-term trend baseline.
+- price_vs_ema20_percent: Percentage distance between latest price and EMA(20); positive means price above trend.
+- price_vs_ema50_percent: Percentage distance between latest price and EMA(50); positive means price above trend.
+- price_vs_ema100_percent: Percentage distance between latest price and EMA(100); positive means price above trend.
+- rsi_14_last_7: RSI(14) values from the last 7 candles showing momentum progression.
+- macd_histogram_12_26_9_last_7: MACD histogram values showing recent momentum acceleration or deceleration.
+- adx_14: ADX(14) value indicating current trend strength regardless of direction.
+- positive_di_14: Positive directional index measuring bullish directional pressure.
+- negative_di_14: Negative directional index measuring bearish directional pressure.
+- di_delta_14: Difference between positive_di_14 and negative_di_14 indicating directional dominance.
+- crypto_fng_value: Current Fear & Greed Index numerical sentiment value.
+- crypto_fng_class: Text classification of Fear & Greed sentiment state.
+
+CONTEXT:
+- Indicators derived from daily candles.
+- Latest candle contains live market tick update.
+- Use ONLY provided values.
+
+TECHNICAL PAYLOAD:
+{payload}
+"""
+
+
+class AiRateLimitError(RuntimeError):
+    # OpenRouter answered 429; `retry_after` is its Retry-After in seconds, if any.
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def request_ai_insight(payload, api_key):
+    url = OPENROUTER_URL
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+
+    body = {
+        "model": AI_MODEL,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": build_user_prompt(payload)}
+        ],
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "crypto_analysis",
+                "strict": True,
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "buy_confidence": {
+                            "type": "number",
+                            "minimum": 0,
+                            "maximum": 1,
+                            "description": "Probability score favoring a buy decision."
+                        },
+                        "hold_confidence": {
+                            "type": "number",
+                            "minimum": 0,
+                            "maximum": 1,
+                            "description": "Probability score favoring a hold decision."
+                        },
+                        "sell_confidence": {
+                            "type": "number",
+                            "minimum": 0,
+                            "maximum": 1,
+                            "description": "Probability score favoring a sell decision."
+                        },
+                        "reasoning": {
+                            "type": "string",
+                            "description": "Brief technical explanation supporting the dominant decision. Keep it concise and signal-focused."
+                        }
+                    },
+                    "required": ["buy_confidence","hold_confidence","sell_confidence","reasoning"],
+                    "additionalProperties": False
+                }
+            }
+        }
+    }
+
+    res = session.post(url, headers=headers, json=body, timeout=AI_TIMEOUT)
+    if res.status_code == 429:
+        retry_after = res.headers.get("Retry-After")
+        raise AiRateLimitError(
+            "AI request failed: rate limited",
+            float(retry_after) if retry_after and retry_after.isdigit() else None,
+        )
+    return res.json()
+
+
+def parse_ai_insight(raw):
+    if "choices" not in raw:
+        error = raw.get("error")
+        message = error.get("message") if isinstance(error, dict) else error
+        raise RuntimeError(f"AI request failed: {message or 'Unknown error'}")
+    ai_json = json.loads(
+        raw["choices"][0]["message"]["content"]
+    )
+    return {
+        "llm": raw.get("model"),
+        **ai_json
+    }
+
+
+def quantize(value, digits):
+    if isinstance(value, float) and value != 0 and math.isfinite(value):
+        return round(value, digits - 1 - int(math.floor(math.log10(abs(value)))))
+    if isinstance(value, list):
+        return [quantize(v, digits) for v in value]
+    if isinstance(value, dict):
+        return {k: quantize(v, digits) for k, v in value.items()}
+    return value
+
+
+def payload_key(payload, digits=AI_CACHE_SIGNIFICANT_DIGITS):
+    # Canonical hash of everything that determines the answer: model,
+    # prompts and the (optionally quantized) payload.
+    if digits is not None:
+        payload = quantize(payload, digits)
+    canonical = json.dumps(
+        [AI_MODEL, SYSTEM_PROMPT, build_user_prompt(""), payload],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class AiInsightCache:
+    # AI results keyed by payload hash, shared by every session and persisted
+    # across restarts. Concurrent requests for the same key make one LLM call.
+    # The file is shared with other processes (the daily batch, other
+    # dashboards): it is reloaded when it changes, and writes merge into its
+    # current contents under a file lock.
+
+    def __init__(self, path=AI_CACHE_PATH, ttl=AI_CACHE_TTL, max_entries=AI_CACHE_ENTRIES,
+                 significant_digits=AI_CACHE_SIGNIFICANT_DIGITS):
+        self.path = path
+        self.ttl = ttl
+        self.significant_digits = significant_digits
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._entries = {}
+        self._mtime = None
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+        self.errors = 0
+
+    def _load(self):
+        # Called with self._lock held.
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime != self._mtime:
+            now = time.time()
+            self._entries = {
+                key: entry for key, entry in (read_json(self.path, {}) or {}).items()
+                if entry["expires_at"] > now
+            }
+            self._mtime = mtime
+
+    def get(self, key):
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None or entry["expires_at"] <= time.time():
+                return None
+            return entry["result"]
+
+    def put(self, key, result, ttl=None):
+        with self._lock, file_lock(self.path):
+            self._load()
+            self._entries[key] = {"result": result, "expires_at": time.time() + (ttl or self.ttl)}
+            if len(self._entries) > self.max_entries:
+                for old in sorted(self._entries, key=lambda k: self._entries[k]["expires_at"])[:len(self._entries) - self.max_entries]:
+                    del self._entries[old]
+            write_json(self.path, self._entries)
+            self._mtime = os.path.getmtime(self.path)
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get_or_generate(self, payload, api_key, force=False):
+        # With `force`, a fresh result is generated (and cached) even when
+        # one is cached already. Forced calls coalesce only with each other,
+        # so they never receive a result generated for a plain miss.
+        key = payload_key(payload, self.significant_digits)
+        result = None if force else self.get(key)
+        if result is not None:
+            self._count("hits")
+            return result
+        self._count("misses")
+
+        def generate():
+            self._count("requests")
+            try:
+                result = parse_ai_insight(request_ai_insight(payload, api_key))
+            except Exception:
+                self._count("errors")
+                raise
+            self.put(key, result)
+            return result
+
+        return self._flight.do((key, "force") if force else key, generate)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "requests": self.requests,
+                "errors": self.errors,
+            }
+
+
+ai_cache = AiInsightCache()
+metrics.register_collector("ai_cache", ai_cache.stats)
+
+
+def get_ai_insight(payload, api_key, force=False):
+    return ai_cache.get_or_generate(payload, api_key, force)
@@ -0,0 +1,151 @@
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from core.ai import AiRateLimitError, get_ai_insight
+from core.fng import fng_service
+from core.screener import screen
+from core.storage import data_path, file_lock, read_json, write_json
+from core.symbols import CRYPTO_OPTIONS
+
+# Pre-computed daily AI insights per instrument. Run headless, e.g. from cron
+# shortly after the daily close:
+#
+#     OPENROUTER_API_KEY=... python -m core.ai_batch
+#
+# Results go to the AI cache and to a per-day store the dashboard reads.
+
+AI_DAILY_PATH = data_path("ai_daily.json")
+# Days of daily insights kept in the store.
+AI_DAILY_DAYS = 7
+# Concurrent LLM calls made by one batch run.
+AI_BATCH_WORKERS = 4
+AI_BATCH_RETRIES = 5
+# Seconds; doubled per retry when the upstream gives no Retry-After.
+AI_BATCH_BACKOFF = 2
+AI_BATCH_MAX_BACKOFF = 60
+
+def utc_day(ts=None):
+    return datetime.fromtimestamp(time.time() if ts is None else ts, timezone.utc).strftime("%Y-%m-%d")
+
+
+class DailyInsightStore:
+    # {day: {instrument: {"result", "generated_at"}}} in one JSON file.
+    # Written by the batch process, so readers reload when the file changes;
+    # writes merge into the file's current contents under a file lock.
+
+    def __init__(self, path=AI_DAILY_PATH, days=AI_DAILY_DAYS):
+        self.path = path
+        self.days = days
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._days = {}
+
+    def _load(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime != self._mtime:
+            self._days = read_json(self.path, {}) or {}
+            self._mtime = mtime
+
+    def get(self, instrument, day=None):
+        with self._lock:
+            self._load()
+            return self._days.get(day or utc_day(), {}).get(instrument)
+
+    def put(self, instrument, result, day=None):
+        with self._lock, file_lock(self.path):
+            self._load()
+            self._days.setdefault(day or utc_day(), {})[instrument] = {
+                "result": result,
+                "generated_at": time.time(),
+            }
+            for old in sorted(self._days)[:-self.days]:
+                del self._days[old]
+            write_json(self.path, self._days)
+            self._mtime = os.path.getmtime(self.path)
+
+
+daily_insights = DailyInsightStore()
+
+
+def daily_insight(instrument, day=None):
+    return daily_insights.get(instrument, day)
+
+
+class _Backoff:
+    # Shared by the workers of one run: a 429 on any of them pauses all.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+
+    def wait(self):
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+
+def generate(payload, api_key, backoff, retries=AI_BATCH_RETRIES):
+    for attempt in range(retries + 1):
+        backoff.wait()
+        try:
+            return get_ai_insight(payload, api_key)
+        except AiRateLimitError as e:
+            if attempt == retries:
+                raise
+            delay = e.retry_after or AI_BATCH_BACKOFF * 2 ** attempt
+            backoff.pause(min(delay, AI_BATCH_MAX_BACKOFF))
+
+
+def run_batch(api_key, instruments=CRYPTO_OPTIONS, workers=AI_BATCH_WORKERS, store=daily_insights):
+    # Returns {instrument: "ok" | error message}.
+    fng_value, fng_class = fng_service.latest()
+    payloads = screen(instruments, fng_value=fng_value, fng_class=fng_class)
+    day = utc_day()
+    backoff = _Backoff()
+
+    def run(payload):
+        if "error" in payload:
+            return payload["error"]
+        try:
+            result = generate(payload, api_key, backoff)
+        except Exception as e:
+            return str(e)
+        store.put(payload["instrument"], result, day)
+        return "ok"
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-batch") as pool:
+        outcomes = list(pool.map(run, payloads))
+    return {p["instrument"]: outcome for p, outcome in zip(payloads, outcomes)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate daily AI insights for every instrument.")
+    parser.add_argument("instruments", nargs="*", default=CRYPTO_OPTIONS)
+    parser.add_argument("--workers", type=int, default=AI_BATCH_WORKERS)
+    args = parser.parse_args()
+
+    api_key = os.environ.get("OPENROUTER_API_KEY")
+    if not api_key:
+        parser.error("OPENROUTER_API_KEY is not set")
+
+    outcomes = run_batch(api_key, args.instruments, args.workers)
+    for instrument, outcome in outcomes.items():
+        print(f"{instrument}: {outcome}")
+    if any(outcome != "ok" for outcome in outcomes.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
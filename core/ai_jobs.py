@@ -0,0 +1,79 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from core.ai import get_ai_insight
+
+# LLM calls in flight at once, across every session in the process.
+AI_WORKERS = 4
+# Seconds a job may take, queueing included, before it is reported as timed out.
+AI_JOB_TIMEOUT = 120
+# Seconds a finished job's result stays available to poll.
+AI_JOB_RETENTION = 600
+
+
+class _Job:
+    __slots__ = ("future", "created", "cancelled")
+
+    def __init__(self, future):
+        self.future = future
+        self.created = time.monotonic()
+        self.cancelled = False
+
+
+class AiJobQueue:
+    # Runs AI insight requests on a bounded worker pool so the script thread
+    # never waits on the LLM. Callers get a job id and poll `status`.
+
+    def __init__(self, workers=AI_WORKERS, timeout=AI_JOB_TIMEOUT):
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai")
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def submit(self, payload, api_key, force=False):
+        job_id = uuid.uuid4().hex
+        future = self._pool.submit(get_ai_insight, payload, api_key, force)
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = _Job(future)
+        return job_id
+
+    def status(self, job_id):
+        # ("pending" | "done" | "error" | "timeout" | "cancelled" | "unknown", value)
+        # where value is the result for "done" and the error for "error".
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return "unknown", None
+        if job.cancelled:
+            return "cancelled", None
+        if not job.future.done():
+            if time.monotonic() - job.created > self.timeout:
+                self.cancel(job_id)
+                return "timeout", None
+            return "pending", None
+        error = job.future.exception()
+        if error is not None:
+            return "error", error
+        return "done", job.future.result()
+
+    def cancel(self, job_id):
+        # A job that has not started is dropped; a running one finishes in
+        # the background (its result still lands in the AI cache) but is
+        # reported as cancelled.
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.cancelled = True
+                job.future.cancel()
+
+    def _prune(self):
+        cutoff = time.monotonic() - AI_JOB_RETENTION
+        for job_id, job in list(self._jobs.items()):
+            if job.created < cutoff and (job.future.done() or job.cancelled):
+                del self._jobs[job_id]
+
+
+ai_jobs = AiJobQueue()
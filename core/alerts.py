@@ -0,0 +1,353 @@
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from core.http import session
+from core.indicator_engine import COLUMNS, IndicatorStream
+from core.klines import KLINE_TTL, kline_store
+from core.metrics import metrics, serve_metrics
+from core.screener import binance_symbol
+from core.storage import data_path, read_json
+from core.stream import market_stream
+from core.symbols import CRYPTO_OPTIONS
+
+# Indicator alerts evaluated on every closed candle, headless:
+#
+#     python -m core.alerts [--rules FILE]
+#
+# Rules are a JSON list, reloaded when the file changes:
+#
+#     [{"id": "btc-rsi-oversold", "instrument": "BTC-USD", "interval": "1d",
+#       "when": ["RSI14", "crosses_below", 30], "sinks": ["telegram"]},
+#      {"id": "di-cross", "instrument": "*", "when": ["PLUS_DI14", "crosses_above", "MINUS_DI14"]}]
+#
+# Operands are a feature name (CLOSE or an indicator column) or a number.
+# Rules are indexed by (symbol, interval) and every (symbol, interval) keeps
+# streaming indicator state, so a new candle costs one indicator step and
+# one comparison per distinct condition, independent of history length.
+
+ALERT_RULES_PATH = data_path("alert_rules.json")
+# Candles that seed the indicator state of a newly watched (symbol, interval).
+ALERT_HISTORY = 300
+# Seconds between passes over the watched series when no update arrives.
+ALERT_POLL = 30
+ALERT_SINK_WORKERS = 4
+
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org")
+
+FEATURES = ("CLOSE",) + COLUMNS
+OPERATORS = ("crosses_above", "crosses_below")
+
+
+class Rule:
+    __slots__ = ("id", "instrument", "symbol", "interval", "condition", "sinks")
+
+    def __init__(self, id, instrument, interval, condition, sinks):
+        self.id = id
+        self.instrument = instrument
+        self.symbol = binance_symbol(instrument)
+        self.interval = interval
+        self.condition = condition
+        self.sinks = sinks
+
+
+def _operand(value):
+    if isinstance(value, str):
+        if value not in FEATURES:
+            raise ValueError(f"unknown feature {value!r}")
+        return value
+    return float(value)
+
+
+def parse_rules(specs, instruments=CRYPTO_OPTIONS):
+    # Rule specs -> Rules; an instrument of "*" expands to every instrument.
+    rules = []
+    for spec in specs:
+        left, op, right = spec["when"]
+        if op not in OPERATORS:
+            raise ValueError(f"unknown operator {op!r}")
+        interval = spec.get("interval", "1d")
+        if interval not in KLINE_TTL:
+            raise ValueError(f"unknown interval {interval!r}")
+        condition = (_operand(left), op, _operand(right))
+        sinks = tuple(spec.get("sinks", ("log",)))
+        targets = instruments if spec["instrument"] == "*" else (spec["instrument"],)
+        for instrument in targets:
+            rules.append(Rule(spec["id"], instrument, interval, condition, sinks))
+    return rules
+
+
+def _value(features, operand):
+    return features[operand] if isinstance(operand, str) else operand
+
+
+def crossed(condition, prev, current):
+    # NaN (indicator warm-up) compares false, so it never triggers.
+    left, op, right = condition
+    before = _value(prev, left), _value(prev, right)
+    after = _value(current, left), _value(current, right)
+    if op == "crosses_above":
+        return before[0] <= before[1] and after[0] > after[1]
+    return before[0] >= before[1] and after[0] < after[1]
+
+
+def describe(condition):
+    left, op, right = condition
+    if not isinstance(right, str):
+        right = f"{right:g}"
+    return f"{left} {op.replace('_', ' ')} {right}"
+
+
+# Sinks are callables taking the alert dict; delivery runs on a pool, and
+# an exception counts as a failed delivery.
+
+def log_sink(alert):
+    print(alert["message"], flush=True)
+
+
+class WebhookSink:
+    def __init__(self, url):
+        self.url = url
+
+    def __call__(self, alert):
+        session.post(self.url, json=alert).raise_for_status()
+
+
+class TelegramSink:
+    def __init__(self, token, chat_id):
+        self.url = f"{TELEGRAM_API_URL}/bot{token}/sendMessage"
+        self.chat_id = chat_id
+
+    def __call__(self, alert):
+        session.post(self.url, json={"chat_id": self.chat_id, "text": alert["message"]}).raise_for_status()
+
+
+def default_sinks():
+    sinks = {"log": log_sink}
+    if os.environ.get("ALERT_WEBHOOK_URL"):
+        sinks["webhook"] = WebhookSink(os.environ["ALERT_WEBHOOK_URL"])
+    if os.environ.get("TELEGRAM_BOT_TOKEN") and os.environ.get("TELEGRAM_CHAT_ID"):
+        sinks["telegram"] = TelegramSink(os.environ["TELEGRAM_BOT_TOKEN"], os.environ["TELEGRAM_CHAT_ID"])
+    return sinks
+
+
+class _Track:
+    # Indicator state of one (symbol, interval) and the last two feature rows.
+    __slots__ = ("indicators", "prev", "current")
+
+    def __init__(self):
+        self.indicators = IndicatorStream()
+        self.prev = None
+        self.current = None
+
+    def step(self, kline):
+        features = self.indicators.step(int(kline['open_time']), float(kline['high']), float(kline['low']), float(kline['close']))
+        features["CLOSE"] = float(kline['close'])
+        self.prev, self.current = self.current, features
+
+
+class AlertEngine:
+    # Kline updates arrive from the kline store (REST refreshes and the
+    # WebSocket stream) and from a periodic pass over the watched series;
+    # only the latest window per (symbol, interval) is queued, and the
+    # engine thread steps through the candles closed since the last one.
+
+    def __init__(self, rules_path=ALERT_RULES_PATH, sinks=None, history=ALERT_HISTORY, poll=ALERT_POLL):
+        self.rules_path = rules_path
+        self.sinks = default_sinks() if sinks is None else dict(sinks)
+        self.history = history
+        self.poll = poll
+        self._lock = threading.Lock()
+        self._index = {}
+        self._tracks = {}
+        self._pending = {}
+        self._wake = threading.Event()
+        self._mtime = None
+        self._thread = None
+        self._pool = ThreadPoolExecutor(max_workers=ALERT_SINK_WORKERS, thread_name_prefix="alert-sink")
+        self._stats = {"candles": 0, "evaluations": 0, "fired": 0, "delivered": 0, "failed": 0}
+
+    def add_sink(self, name, sink):
+        self.sinks[name] = sink
+
+    def set_rules(self, rules):
+        # {(symbol, interval): {condition: [rules]}}; identical conditions on
+        # one series are evaluated once per candle.
+        index = {}
+        for rule in rules:
+            index.setdefault((rule.symbol, rule.interval), {}).setdefault(rule.condition, []).append(rule)
+        with self._lock:
+            self._index = index
+            for key in list(self._tracks):
+                if key not in index:
+                    del self._tracks[key]
+
+    def reload(self):
+        # A rules file that does not parse is reported and skipped; the
+        # previous rules stay in force until the file changes again.
+        try:
+            mtime = os.path.getmtime(self.rules_path)
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        try:
+            rules = parse_rules(read_json(self.rules_path, []) or [])
+        except (KeyError, TypeError, ValueError) as e:
+            metrics.inc("alert_rule_errors")
+            print(f"alerts: ignoring {self.rules_path}: {e!r}", flush=True)
+            return
+        self.set_rules(rules)
+
+    def on_klines(self, symbol, interval, klines):
+        key = (symbol, interval)
+        if key in self._index:
+            with self._lock:
+                self._pending[key] = klines
+            self._wake.set()
+
+    def process(self, symbol, interval, klines):
+        # klines: KLINE_DTYPE window with the open candle last. Returns the
+        # alerts fired by the candles closed since the previous call; a new
+        # or discontinuous series is seeded without firing.
+        key = (symbol, interval)
+        conditions = self._index.get(key)
+        closed = klines[:-1]
+        if not conditions or not len(closed):
+            return []
+
+        track = self._tracks.get(key)
+        if track is not None:
+            open_times = closed['open_time']
+            last = track.indicators.last_open_time
+            i = int(np.searchsorted(open_times, last))
+            if i < len(open_times) and open_times[i] == last:
+                new = closed[i + 1:]
+            elif open_times[-1] < last:
+                new = closed[:0]
+            else:
+                track = None
+
+        if track is None:
+            track = self._tracks[key] = _Track()
+            for kline in closed:
+                track.step(kline)
+            return []
+
+        alerts = []
+        for kline in new:
+            track.step(kline)
+            for condition, rules in conditions.items():
+                if track.prev is not None and crossed(condition, track.prev, track.current):
+                    alerts.extend(self._alert(rule, kline, track.current) for rule in rules)
+        self._count("candles", len(new))
+        self._count("evaluations", len(new) * len(conditions))
+        return alerts
+
+    def _alert(self, rule, kline, features):
+        left, _, right = rule.condition
+        values = {name: features[name] for name in (left, right) if isinstance(name, str)}
+        shown = ", ".join(f"{name} {value:.4f}" for name, value in values.items())
+        return {
+            "rule": rule.id,
+            "instrument": rule.instrument,
+            "interval": rule.interval,
+            "open_time": int(kline['open_time']),
+            "condition": describe(rule.condition),
+            "values": values,
+            "sinks": rule.sinks,
+            "message": f"{rule.instrument} {rule.interval}: {describe(rule.condition)} ({shown})",
+        }
+
+    def deliver(self, alert):
+        self._count("fired")
+        for name in alert["sinks"]:
+            sink = self.sinks.get(name)
+            if sink is None:
+                metrics.inc("alert_deliveries", sink=name, status="no_sink")
+                continue
+            self._pool.submit(self._send, name, sink, alert)
+
+    def _send(self, name, sink, alert):
+        try:
+            sink(alert)
+            status = "ok"
+        except Exception:
+            status = "error"
+        metrics.inc("alert_deliveries", sink=name, status=status)
+        self._count("delivered" if status == "ok" else "failed")
+
+    def _count(self, name, value=1):
+        # Every _stats update goes through here, under the lock.
+        with self._lock:
+            self._stats[name] += value
+
+    def _drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for (symbol, interval), klines in pending.items():
+            with metrics.timed("alert_process_seconds", interval=interval):
+                alerts = self.process(symbol, interval, klines)
+            for alert in alerts:
+                self.deliver(alert)
+
+    def run_once(self):
+        # One pass: reload the rules, keep the watched streams subscribed,
+        # refresh every watched series through the kline store and evaluate.
+        self.reload()
+        for symbol, interval in list(self._index):
+            market_stream.subscribe(symbol, (interval,))
+            try:
+                series = kline_store.series(symbol, interval, self.history)
+            except Exception:
+                metrics.inc("alert_feed_errors", symbol=symbol, interval=interval)
+                continue
+            self.on_klines(symbol, interval, series.klines)
+        self._drain()
+
+    def run_forever(self):
+        kline_store.listen(self.on_klines)
+        next_pass = 0
+        while True:
+            if time.monotonic() >= next_pass:
+                self.run_once()
+                next_pass = time.monotonic() + self.poll
+            if self._wake.wait(max(0.0, next_pass - time.monotonic())):
+                self._wake.clear()
+                self._drain()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, name="alerts", daemon=True)
+            self._thread.start()
+
+    def stats(self):
+        with self._lock:
+            index = self._index
+            stats = dict(self._stats)
+        return dict(
+            stats,
+            series=len(index),
+            rules=sum(len(rules) for conditions in index.values() for rules in conditions.values()),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate indicator alert rules on every closed candle.")
+    parser.add_argument("--rules", default=ALERT_RULES_PATH)
+    parser.add_argument("--poll", type=float, default=ALERT_POLL)
+    args = parser.parse_args()
+
+    engine = AlertEngine(args.rules, poll=args.poll)
+    metrics.register_collector("alerts", engine.stats)
+    serve_metrics()
+    engine.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from core.binance import fetch_klines
+from core.cache import SingleFlight
+from core.klines import INTERVAL_MS, KLINE_DTYPE, KLINE_PAGE_LIMIT, decode_klines, kline_frame
+from core.storage import data_path
+
+ARCHIVE_DIR = data_path("klines")
+
+# Column name -> dtype, the fields of the in-memory kline records. Each
+# column is its own append-only file, read back through np.memmap. open_time
+# is written last, so its length is the number of complete rows.
+ARCHIVE_COLUMNS = {name: KLINE_DTYPE[name] for name in KLINE_DTYPE.names}
+
+# How far back an empty archive is backfilled; None means from listing.
+ARCHIVE_HISTORY_MS = {
+    "1d": None,
+    "1h": 365 * 86_400_000,
+    "1m": 30 * 86_400_000,
+}
+
+
+class KlineArchive:
+    # Closed klines per (symbol, interval) on disk, one memory-mapped file per
+    # column. Backfilled from Binance with paginated startTime requests, in
+    # the background when a view first needs it; range reads return views
+    # into the mapped files.
+
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._backfilling = set()
+
+    def _path(self, symbol, interval, column):
+        return os.path.join(self.root, symbol, interval, f"{column}.bin")
+
+    def _lock(self, symbol, interval):
+        with self._locks_lock:
+            return self._locks.setdefault((symbol, interval), threading.Lock())
+
+    def _map(self, symbol, interval, column, rows=None):
+        path = self._path(symbol, interval, column)
+        dtype = np.dtype(ARCHIVE_COLUMNS[column])
+        try:
+            size = os.path.getsize(path) // dtype.itemsize
+        except OSError:
+            size = 0
+        if rows is not None:
+            size = min(size, rows)
+        if size == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(size,))
+
+    def rows(self, symbol, interval):
+        return len(self._map(symbol, interval, "open_time"))
+
+    def last_open_time(self, symbol, interval):
+        open_time = self._map(symbol, interval, "open_time")
+        return int(open_time[-1]) if len(open_time) else None
+
+    def append(self, symbol, interval, klines):
+        # Appends KLINE_DTYPE klines newer than the last archived one.
+        with self._lock(symbol, interval):
+            last = self.last_open_time(symbol, interval)
+            if last is not None:
+                klines = klines[klines['open_time'] > last]
+            if not len(klines):
+                return 0
+
+            committed = self.rows(symbol, interval)
+            os.makedirs(os.path.dirname(self._path(symbol, interval, "open_time")), exist_ok=True)
+            for column, dtype in reversed(ARCHIVE_COLUMNS.items()):
+                path = self._path(symbol, interval, column)
+                with open(path, "ab") as f:
+                    # Drop any tail left by an interrupted append.
+                    f.truncate(committed * dtype.itemsize)
+                    f.write(klines[column].tobytes())
+            return len(klines)
+
+    def backfill(self, symbol, interval):
+        return self._flight.do((symbol, interval), lambda: self._backfill(symbol, interval))
+
+    def _backfill(self, symbol, interval):
+        now = int(time.time() * 1000)
+        last = self.last_open_time(symbol, interval)
+        if last is not None:
+            start = last + 1
+        else:
+            history = ARCHIVE_HISTORY_MS.get(interval)
+            start = 0 if history is None else now - history
+
+        added = 0
+        while True:
+            page = fetch_klines(symbol, interval, KLINE_PAGE_LIMIT, start_time=start)
+            # Only closed candles are archived; the live one stays in the kline store.
+            closed = [k for k in page if k[6] < now]
+            added += self.append(symbol, interval, decode_klines(closed))
+            if len(page) < KLINE_PAGE_LIMIT or not closed:
+                return added
+            start = closed[-1][0] + 1
+
+    def backfill_async(self, symbol, interval):
+        # Starts a backfill on a background thread unless one is running.
+        key = (symbol, interval)
+        with self._locks_lock:
+            if key in self._backfilling:
+                return
+            self._backfilling.add(key)
+
+        def run():
+            try:
+                self.backfill(symbol, interval)
+            except Exception:
+                pass
+            finally:
+                with self._locks_lock:
+                    self._backfilling.discard(key)
+
+        threading.Thread(target=run, name=f"archive-{symbol}-{interval}", daemon=True).start()
+
+    def fetch_range(self, symbol, interval, start, end):
+        # Closed klines with open times in [start, end) from Binance, not
+        # archived; each page asks for no more rows than remain.
+        step = INTERVAL_MS[interval]
+        now = int(time.time() * 1000)
+        rows = []
+        while start < end:
+            limit = min(-(-(end - start) // step), KLINE_PAGE_LIMIT)
+            page = fetch_klines(symbol, interval, limit, start_time=start)
+            closed = [k for k in page if k[0] < end and k[6] < now]
+            rows.extend(closed)
+            if len(page) < limit or len(closed) < len(page) or not closed:
+                break
+            start = closed[-1][0] + step
+        return decode_klines(rows)
+
+    def history(self, symbol, interval, end, limit):
+        # Up to `limit` closed klines before `end` (ms). Served from the
+        # archive when it reaches `end`; otherwise only that span is fetched
+        # here and the archive is backfilled in the background for next time.
+        step = INTERVAL_MS[interval]
+        last = self.last_open_time(symbol, interval)
+        if last is not None and last + step >= end:
+            return self.read(symbol, interval, end=end, limit=limit)
+        self.backfill_async(symbol, interval)
+        return self.fetch_range(symbol, interval, end - limit * step, end)
+
+    def read(self, symbol, interval, start=None, end=None, limit=None):
+        # Columns for open times in [start, end), optionally only the last
+        # `limit` rows of that range. The arrays are views of the mapped files.
+        open_time = self._map(symbol, interval, "open_time")
+        rows = len(open_time)
+        lo = 0 if start is None else int(np.searchsorted(open_time, start, "left"))
+        hi = rows if end is None else int(np.searchsorted(open_time, end, "left"))
+        if limit is not None:
+            lo = max(lo, hi - limit)
+        return {
+            column: self._map(symbol, interval, column, rows)[lo:hi]
+            for column in ARCHIVE_COLUMNS
+        }
+
+    def frame(self, symbol, interval, start=None, end=None, limit=None):
+        # The range as a frame with chart_component's column names.
+        return kline_frame(self.read(symbol, interval, start, end, limit))
+
+
+kline_archive = KlineArchive()
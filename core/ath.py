@@ -0,0 +1,76 @@
+import threading
+import time
+
+from core.binance import fetch_klines
+from core.cache import SingleFlight
+from core.klines import decode_klines
+from core.storage import data_path, read_json, write_json
+
+ATH_INDEX_PATH = data_path("ath_index.json")
+# A 24h high only covers the last day; an entry not confirmed for longer than
+# this may have missed a high and is rebuilt from the monthly klines.
+ATH_MAX_AGE = 86400
+# How stale the persisted "updated" time may get before it is rewritten.
+ATH_SAVE_INTERVAL = 3600
+
+
+def scan_ath(klines):
+    # (highest high, its candle's open time in seconds) of a KLINE_DTYPE array.
+    if not len(klines) or klines['high'].max() <= 0:
+        return 0, 0
+    i = int(klines['high'].argmax())
+    return float(klines['high'][i]), int(klines['open_time'][i]) / 1000.0
+
+
+class AthIndex:
+    # Per-symbol all-time high (value, timestamp), persisted to disk. Built
+    # once from the monthly klines, then kept current from the 24h ticker's
+    # highPrice.
+
+    def __init__(self, path=ATH_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._entries = read_json(path, {})
+        self._saved_at = time.time()
+
+    def _is_cold(self, entry, now):
+        return entry is None or now - entry["updated"] > ATH_MAX_AGE
+
+    def get(self, symbol):
+        entry = self._entries.get(symbol)
+        if self._is_cold(entry, time.time()):
+            entry = self._flight.do(symbol, lambda: self._bootstrap(symbol))
+        return entry["ath"], entry["ts"]
+
+    def _bootstrap(self, symbol):
+        ath, ath_ts = scan_ath(decode_klines(fetch_klines(symbol, "1M", 1000)))
+        entry = {"ath": ath, "ts": ath_ts, "updated": time.time()}
+        with self._lock:
+            self._entries[symbol] = entry
+            self._save()
+        return entry
+
+    def observe(self, symbol, high, ts=None):
+        # Folds in a recent high (e.g. the 24h ticker's highPrice).
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None:
+                return None
+            changed = high > entry["ath"]
+            if changed:
+                entry = {"ath": high, "ts": ts or now, "updated": now}
+            else:
+                entry = {**entry, "updated": now}
+            self._entries[symbol] = entry
+            if changed or now - self._saved_at > ATH_SAVE_INTERVAL:
+                self._save()
+            return entry["ath"], entry["ts"]
+
+    def _save(self):
+        write_json(self.path, self._entries)
+        self._saved_at = time.time()
+
+
+ath_index = AthIndex()
@@ -0,0 +1,245 @@
+import argparse
+import math
+import time
+
+import numpy as np
+
+from core.ai_batch import AI_DAILY_PATH
+from core.archive import kline_archive
+from core.payload import indicator_columns
+from core.screener import binance_symbol
+from core.storage import read_json
+from core.symbols import CRYPTO_OPTIONS
+
+# Backtests of the technical payload's signals over the archived daily
+# history, headless:
+#
+#     python -m core.backtest [BTC-USD ...] [--horizons 1 7 30] [--fee-bps 10] [--ai [FILE]]
+#
+# The payload indicators are computed once over the whole history with the
+# array kernels, so every bar's payload values come out of a single pass.
+# The EMAs are seeded at the first archived candle rather than 300 candles
+# back, as the dashboard's window is; the difference has decayed to noise
+# once the warm-up is skipped. Positions are taken at a bar's close and
+# earn the next bar's return.
+
+BACKTEST_INTERVAL = "1d"
+BACKTEST_HORIZONS = (1, 7, 30)
+# Bars skipped at the start of the history while the EMAs settle.
+BACKTEST_WARMUP = 100
+# Cost of one unit of position change, in basis points.
+BACKTEST_FEE_BPS = 10
+# Annualisation of daily returns; crypto trades every day.
+PERIODS_PER_YEAR = 365
+
+
+def load_history(instrument, interval=BACKTEST_INTERVAL, fetch=True):
+    # Closed candles from the archive, backfilled first unless `fetch` is off
+    # or the upstream is unreachable.
+    symbol = binance_symbol(instrument)
+    if fetch:
+        try:
+            kline_archive.backfill(symbol, interval)
+        except Exception:
+            pass
+    return kline_archive.read(symbol, interval)
+
+
+def signal_features(history):
+    # The payload's scalar fields at every bar, as arrays. The `_last_N`
+    # lists of the payload are trailing windows of the same arrays.
+    close = np.asarray(history['close'], dtype=np.float64)
+    columns = indicator_columns(history['high'], history['low'], close)
+    features = {"close": close}
+    for span in (20, 50, 100):
+        ema = columns[f"EMA{span}"]
+        features[f"ema_{span}"] = ema
+        features[f"price_vs_ema{span}_percent"] = (close - ema) / ema * 100
+    features["rsi_14"] = columns["RSI14"]
+    features["macd_histogram"] = columns["MACD_HIST"]
+    features["adx_14"] = columns["ADX14"]
+    features["positive_di_14"] = columns["PLUS_DI14"]
+    features["negative_di_14"] = columns["MINUS_DI14"]
+    features["di_delta_14"] = columns["PLUS_DI14"] - columns["MINUS_DI14"]
+    return features
+
+
+def forward_fill(values):
+    # Each NaN replaced by the last value before it; leading NaNs stay.
+    index = np.where(np.isnan(values), 0, np.arange(len(values)))
+    np.maximum.accumulate(index, out=index)
+    return values[index]
+
+
+def hold_between(enter, leave):
+    # 1 from a bar where `enter` holds until the next bar where `leave`
+    # holds, else 0.
+    events = np.full(len(enter), np.nan)
+    events[leave] = 0.0
+    events[enter & ~leave] = 1.0
+    return np.nan_to_num(forward_fill(events))
+
+
+# Rule strategies over signal_features: position per bar, 1 long, -1 short,
+# 0 flat. Comparisons with NaN are false, so warm-up bars stay flat.
+
+def buy_and_hold(f):
+    return np.ones(len(f["close"]))
+
+
+def rsi_reversion(f):
+    return hold_between(f["rsi_14"] < 30, f["rsi_14"] > 70)
+
+
+def macd_momentum(f):
+    return (f["macd_histogram"] > 0).astype(np.float64)
+
+
+def ema_trend(f):
+    return ((f["price_vs_ema50_percent"] > 0) & (f["ema_20"] > f["ema_50"])).astype(np.float64)
+
+
+def adx_di(f):
+    trending = f["adx_14"] > 25
+    long = trending & (f["di_delta_14"] > 0)
+    short = trending & (f["di_delta_14"] < 0)
+    return long.astype(np.float64) - short.astype(np.float64)
+
+
+STRATEGIES = {
+    "buy_and_hold": buy_and_hold,
+    "rsi_reversion": rsi_reversion,
+    "macd_momentum": macd_momentum,
+    "ema_trend": ema_trend,
+    "adx_di": adx_di,
+}
+
+
+def ai_positions(instrument, open_time, path=AI_DAILY_PATH, min_confidence=0.0):
+    # Replays stored AI decisions ({day: {instrument: {"result",
+    # "generated_at"}}}, the daily insight store's format). A decision is
+    # acted on at the close of the candle it was generated in, so it never
+    # earns a return it could have seen, and held until the next one; bars
+    # before the first decision are NaN.
+    days = read_json(path, {}) or {}
+    open_time = np.asarray(open_time)
+    position = np.full(len(open_time), np.nan)
+    for day in sorted(days):
+        entry = days[day].get(instrument)
+        if not entry:
+            continue
+        result = entry["result"]
+        confidences = {
+            side: float(result.get(f"{side}_confidence", 0))
+            for side in ("buy", "hold", "sell")
+        }
+        side = max(confidences, key=confidences.get)
+        if confidences[side] < min_confidence:
+            side = "hold"
+        i = int(np.searchsorted(open_time, entry["generated_at"] * 1000, "right")) - 1
+        if i >= 0:
+            position[i] = {"buy": 1.0, "hold": 0.0, "sell": -1.0}[side]
+    return forward_fill(position)
+
+
+def forward_returns(close, horizon):
+    # close[i + horizon] / close[i] - 1, NaN where the horizon runs past the end.
+    out = np.full(len(close), np.nan)
+    if len(close) > horizon:
+        out[:-horizon] = close[horizon:] / close[:-horizon] - 1
+    return out
+
+
+def evaluate(close, position, horizons=BACKTEST_HORIZONS, fee_bps=BACKTEST_FEE_BPS, warmup=BACKTEST_WARMUP):
+    # Summary of one position series: equity statistics from the next-bar
+    # returns net of fees, and the mean forward return / hit rate of the
+    # bars held long at each horizon. NaN positions (no decision yet) are
+    # excluded from the evaluated range.
+    close = close[warmup:]
+    position = position[warmup:]
+    active = ~np.isnan(position)
+    if not active.any():
+        return None
+    start = int(np.argmax(active))
+    close = close[start:]
+    position = np.nan_to_num(position[start:])
+
+    step = np.zeros(len(close))
+    step[1:] = close[1:] / close[:-1] - 1
+    turnover = np.abs(np.diff(position, prepend=0.0))
+    returns = np.zeros(len(close))
+    returns[1:] = position[:-1] * step[1:]
+    returns -= turnover * fee_bps / 10_000
+    equity = np.cumprod(1 + returns)
+    drawdown = 1 - equity / np.maximum.accumulate(equity)
+    years = len(returns) / PERIODS_PER_YEAR
+    std = returns.std()
+
+    summary = {
+        "bars": len(returns),
+        "exposure": float(np.mean(position != 0)),
+        "trades": int(np.count_nonzero(turnover)),
+        "total_return": float(equity[-1] - 1),
+        "cagr": float(equity[-1] ** (1 / years) - 1) if years and equity[-1] > 0 else math.nan,
+        "sharpe": float(returns.mean() / std * math.sqrt(PERIODS_PER_YEAR)) if std else math.nan,
+        "max_drawdown": float(drawdown.max()),
+    }
+    long = position > 0
+    for h in horizons:
+        fwd = forward_returns(close, h)
+        held = long & ~np.isnan(fwd)
+        summary[f"fwd{h}_mean"] = float(fwd[held].mean()) if held.any() else math.nan
+        summary[f"fwd{h}_hit"] = float((fwd[held] > 0).mean()) if held.any() else math.nan
+    return summary
+
+
+def backtest(instrument, history, strategies=STRATEGIES, horizons=BACKTEST_HORIZONS,
+             fee_bps=BACKTEST_FEE_BPS, ai_path=None):
+    # {strategy: summary} for one instrument's history.
+    features = signal_features(history)
+    close = features["close"]
+    results = {}
+    for name, strategy in strategies.items():
+        results[name] = evaluate(close, strategy(features), horizons, fee_bps)
+    if ai_path is not None:
+        position = ai_positions(instrument, history['open_time'], path=ai_path)
+        results["ai"] = evaluate(close, position, horizons, fee_bps)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the technical payload's signals over archived daily history.")
+    parser.add_argument("instruments", nargs="*", default=CRYPTO_OPTIONS)
+    parser.add_argument("--horizons", type=int, nargs="+", default=list(BACKTEST_HORIZONS))
+    parser.add_argument("--fee-bps", type=float, default=BACKTEST_FEE_BPS)
+    parser.add_argument("--ai", nargs="?", const=AI_DAILY_PATH, default=None,
+                        help="also replay stored AI decisions (default: the daily insight store)")
+    parser.add_argument("--offline", action="store_true", help="use the archive as is, without backfilling")
+    args = parser.parse_args()
+
+    columns = ["bars", "exposure", "trades", "total_return", "cagr", "sharpe", "max_drawdown"]
+    columns += [f"fwd{h}_{stat}" for h in args.horizons for stat in ("mean", "hit")]
+    print(f"{'instrument':<10} {'strategy':<14} " + " ".join(f"{c:>13}" for c in columns))
+
+    load_seconds = run_seconds = 0.0
+    for instrument in args.instruments:
+        start = time.perf_counter()
+        history = load_history(instrument, fetch=not args.offline)
+        load_seconds += time.perf_counter() - start
+        if len(history['open_time']) <= BACKTEST_WARMUP:
+            print(f"{instrument:<10} not enough archived history ({len(history['open_time'])} candles)")
+            continue
+        start = time.perf_counter()
+        results = backtest(instrument, history, horizons=args.horizons, fee_bps=args.fee_bps, ai_path=args.ai)
+        run_seconds += time.perf_counter() - start
+        for name, summary in results.items():
+            if summary is None:
+                print(f"{instrument:<10} {name:<14} no decisions in range")
+                continue
+            cells = (f"{summary[c]:>13}" if isinstance(summary[c], int) else f"{summary[c]:>13.4g}" for c in columns)
+            print(f"{instrument:<10} {name:<14} " + " ".join(cells))
+    print(f"load {load_seconds:.2f}s, backtest {run_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+
+from core.cache import SingleFlight
+from core.http import build_session
+from core.metrics import metrics
+
+BINANCE_API_URL = os.environ.get("BINANCE_API_URL", "https://data-api.binance.vision/api/v3")
+
+# Request weight Binance allows per IP and minute, and the share of it this
+# process plans to use; the rest is headroom for other clients on the IP.
+BINANCE_WEIGHT_LIMIT = 6000
+BINANCE_WEIGHT_HEADROOM = 0.8
+# Seconds a call may wait for weight before failing instead.
+BINANCE_MAX_WAIT = 10
+# Used when a 429 / 418 comes without Retry-After.
+BINANCE_RETRY_AFTER = 60
+BINANCE_BAN_RETRY_AFTER = 300
+
+
+class BinanceRateLimitError(RuntimeError):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def request_weight(path, params):
+    # Weights from the Binance spot API documentation.
+    if path == "/klines":
+        limit = params.get("limit", 500)
+        if limit < 100:
+            return 1
+        if limit < 500:
+            return 2
+        if limit <= 1000:
+            return 5
+        return 10
+    if path == "/ticker/24hr":
+        return 2 if "symbol" in params else 80
+    return 1
+
+
+class WeightLimiter:
+    # Token bucket over request weight, refilled continuously at the
+    # per-minute budget. Each X-MBX-USED-WEIGHT-1M header caps the tokens at
+    # what the server says is left, which accounts for every other client
+    # behind the same IP. A 429/418 blocks all calls until Retry-After.
+
+    def __init__(self, limit=BINANCE_WEIGHT_LIMIT, headroom=BINANCE_WEIGHT_HEADROOM):
+        self.capacity = limit * headroom
+        self.rate = self.capacity / 60
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.used_weight = None
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, weight, max_wait=BINANCE_MAX_WAIT):
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._blocked_until > now:
+                    delay = self._blocked_until - now
+                elif self._tokens >= weight:
+                    self._tokens -= weight
+                    if waited:
+                        self.waits += 1
+                        self.wait_seconds += waited
+                    return
+                else:
+                    delay = (weight - self._tokens) / self.rate
+            if waited + delay > max_wait:
+                raise BinanceRateLimitError("Binance request weight exhausted", retry_after=delay)
+            time.sleep(delay)
+            waited += delay
+
+    def observe(self, used_weight):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.used_weight = used_weight
+            self._tokens = min(self._tokens, self.capacity - used_weight)
+
+    def block(self, seconds):
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class BinanceClient:
+    # Every Binance REST call of the process goes through here: one pooled
+    # session, identical in-flight requests coalesced into one, weight
+    # reserved before sending and 429/418 turned into a process-wide pause.
+
+    def __init__(self, base_url=BINANCE_API_URL, limiter=None):
+        self.base_url = base_url
+        self.limiter = limiter or WeightLimiter()
+        # Rate-limit answers are handled here, not retried by urllib3.
+        self._session = build_session(retry_statuses=(500, 502, 503, 504), respect_retry_after=False)
+        self._flight = SingleFlight()
+        # Guards the counters, which every session's threads update.
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.requests = 0
+        self.throttled = 0
+        self.rate_limited = 0
+        self.errors = 0
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, path, params):
+        self._count("calls")
+        key = (path, tuple(sorted(params.items())))
+        return self._flight.do(key, lambda: self._get(path, params))
+
+    def _get(self, path, params):
+        try:
+            self.limiter.acquire(request_weight(path, params))
+        except BinanceRateLimitError:
+            self._count("throttled")
+            raise
+        self._count("requests")
+        try:
+            response = self._session.get(f"{self.base_url}{path}", params=params)
+        except Exception:
+            self._count("errors")
+            raise
+
+        used = response.headers.get("X-MBX-USED-WEIGHT-1M")
+        if used is not None and used.isdigit():
+            self.limiter.observe(int(used))
+        if response.status_code in (418, 429):
+            self._count("rate_limited")
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                retry_after = int(retry_after)
+            else:
+                retry_after = BINANCE_BAN_RETRY_AFTER if response.status_code == 418 else BINANCE_RETRY_AFTER
+            self.limiter.block(retry_after)
+            raise BinanceRateLimitError(f"Binance rate limit ({response.status_code})", retry_after=retry_after)
+        return response
+
+    def stats(self):
+        with self._lock:
+            calls, requests, throttled = self.calls, self.requests, self.throttled
+            rate_limited, errors = self.rate_limited, self.errors
+        return {
+            "calls": calls,
+            "requests": requests,
+            "coalesced": calls - requests - throttled,
+            "throttled": throttled,
+            "rate_limited": rate_limited,
+            "errors": errors,
+            "used_weight": self.limiter.used_weight,
+            "waits": self.limiter.waits,
+            "wait_seconds": round(self.limiter.wait_seconds, 3),
+        }
+
+
+binance_client = BinanceClient()
+metrics.register_collector("binance", binance_client.stats)
+
+
+def fetch_ticker_24hr(symbol):
+    # Returned as-is: on an unknown symbol Binance answers with {"code", "msg"}.
+    return binance_client.get("/ticker/24hr", {"symbol": symbol}).json()
+
+
+def fetch_klines(symbol, interval, limit=300, start_time=None):
+    params = {"symbol": symbol, "interval": interval, "limit": limit}
+    if start_time is not None:
+        params["startTime"] = start_time
+    response = binance_client.get("/klines", params)
+    response.raise_for_status()
+    return response.json()
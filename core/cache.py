@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    # Collapses concurrent calls that share a key into a single call of `fn`;
+    # every caller gets the leader's result (or exception).
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "weight")
+
+    def __init__(self, value, expires_at, weight):
+        self.value = value
+        self.expires_at = expires_at
+        self.weight = weight
+
+
+class TTLCache:
+    # Thread-safe LRU cache with a per-entry TTL. Bounded by entry count and,
+    # when `weigher` is given, by the summed weight of the entries.
+
+    def __init__(self, max_entries=128, max_weight=None, weigher=None):
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self.weigher = weigher or (lambda value: 1)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._weight = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= now:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def peek(self, key, default=None):
+        # Returns the entry even when expired, without touching LRU order or stats.
+        with self._lock:
+            entry = self._entries.get(key)
+            return default if entry is None else entry.value
+
+    def set(self, key, value, ttl):
+        weight = self.weigher(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._weight -= old.weight
+            self._entries[key] = _Entry(value, time.monotonic() + ttl, weight)
+            self._weight += weight
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._weight -= entry.weight
+
+    def _evict(self):
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries
+            or (self.max_weight is not None and self._weight > self.max_weight)
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._weight -= entry.weight
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "weight": self._weight,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,94 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# Reduce long series to a point budget before they reach Plotly. Candles are
+# re-bucketed into coarser OHLC candles; lines use Largest-Triangle-Three-
+# Buckets, which keeps the visually significant points.
+
+
+def lttb(x, y, threshold):
+    # Indices of the points LTTB keeps. NaN points (indicator warm-up) are
+    # never selected.
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(y))
+    if len(valid) < len(y):
+        return valid[lttb(x[valid], y[valid], threshold)]
+
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def bucket_starts(n, target):
+    # Start index of each bucket when n rows are grouped into at most
+    # `target` buckets. Buckets are aligned to the end, so the newest candle
+    # closes the last full bucket and only the oldest one may be partial.
+    size = math.ceil(n / target) if target > 0 else n
+    offset = n % size
+    starts = np.arange(offset, n, size)
+    if offset:
+        starts = np.concatenate(([0], starts))
+    return starts
+
+
+def ohlc_buckets(time, open_, high, low, close, volume, target):
+    n = len(time)
+    if n <= target:
+        return time, open_, high, low, close, volume
+    starts = bucket_starts(n, target)
+    ends = np.append(starts[1:], n) - 1
+    return (
+        np.asarray(time)[starts],
+        np.asarray(open_)[starts],
+        np.maximum.reduceat(np.asarray(high, dtype=np.float64), starts),
+        np.minimum.reduceat(np.asarray(low, dtype=np.float64), starts),
+        np.asarray(close)[ends],
+        np.add.reduceat(np.asarray(volume, dtype=np.float64), starts),
+    )
+
+
+def downsample_candles(df, target):
+    # chart_component's frame re-bucketed to at most `target` candles.
+    if len(df) <= target:
+        return df
+    time, open_, high, low, close, volume = ohlc_buckets(
+        df['UTCTIME'].to_numpy(), df['OPEN'].to_numpy(), df['HIGH'].to_numpy(),
+        df['LOW'].to_numpy(), df['CLOSE'].to_numpy(), df['VOLUME'].to_numpy(), target
+    )
+    return pd.DataFrame({
+        'UTCTIME': time,
+        'OPEN': open_,
+        'HIGH': high,
+        'LOW': low,
+        'CLOSE': close,
+        'VOLUME': volume,
+    })
+
+
+def downsample_line(df, column, target):
+    # (x, y) of `column` against UTCTIME, reduced with LTTB.
+    y = df[column].to_numpy(dtype=np.float64)
+    x = df['UTCTIME'].to_numpy()
+    if len(df) <= target:
+        return x, y
+    selected = lttb(x.astype("datetime64[ms]").astype(np.float64), y, target)
+    return x[selected], y[selected]
@@ -0,0 +1,166 @@
+import numpy as np
+
+# chart_component's figure, built once per (chart type, indicator set) and
+# refilled with the new trace arrays on every run. Times are passed as epoch
+# milliseconds and all arrays as float64, so Plotly serializes them as
+# base64 typed arrays (through orjson when installed) instead of per-element JSON.
+# Plotly is imported on the first template build, so importing this module
+# (for OVERLAYS or epoch_ms) does not pull it in.
+
+OVERLAYS = {
+    "MA": (("MA7", "MA(7)", "orange"), ("MA50", "MA(50)", "cyan"), ("MA100", "MA(100)", "purple")),
+    "EMA": (("EMA7", "EMA(7)", "orange"), ("EMA50", "EMA(50)", "cyan"), ("EMA100", "EMA(100)", "purple")),
+}
+# Volume bars are coloured through this scale from 0 (down) / 1 (up) values;
+# Plotly validates a per-bar list of colour names far more slowly.
+VOLUME_COLORSCALE = [[0, 'red'], [1, 'green']]
+CHART_TEMPLATES = 16
+
+
+def epoch_ms(times):
+    return np.asarray(times).astype("datetime64[ms]").astype(np.float64)
+
+
+class ChartTemplate:
+    # The figure skeleton for one chart configuration; `fill` swaps in data.
+
+    def __init__(self, chart_type, indicators):
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+
+        self.chart_type = chart_type
+        self.volume = "VOL" in indicators
+        self.overlays = [name for name in OVERLAYS if name in indicators]
+
+        if self.volume:
+            fig = make_subplots(
+                rows=2, cols=1,
+                shared_xaxes=True,
+                vertical_spacing=0.00,
+                row_heights=[0.85, 0.15],
+                subplot_titles=(f"", '')
+            )
+        else:
+            fig = make_subplots(
+                rows=1, cols=1,
+                shared_xaxes=True,
+                subplot_titles=(f"", '')
+            )
+
+        if chart_type == "Candlestick":
+            fig.add_trace(go.Candlestick(name='Candlestick', showlegend=False), row=1, col=1)
+        elif chart_type == "Line":
+            fig.add_trace(go.Scatter(
+                mode='lines+markers',
+                name='Close Price',
+                line=dict(width=1.5),
+                marker=dict(size=4),
+                showlegend=False
+            ), row=1, col=1)
+        elif chart_type == "OHLC":
+            fig.add_trace(go.Ohlc(name='OHLC', showlegend=False), row=1, col=1)
+
+        if self.volume:
+            fig.add_trace(go.Bar(
+                marker=dict(colorscale=VOLUME_COLORSCALE, cmin=0, cmax=1),
+                marker_opacity=0.25,
+                showlegend=False
+            ), row=2, col=1)
+
+        self.lines = {}
+        self.annotations = {}
+        for overlay in self.overlays:
+            for column, name, color in OVERLAYS[overlay]:
+                self.lines[column] = len(fig.data)
+                fig.add_trace(go.Scatter(
+                    mode='lines',
+                    name=name,
+                    line=dict(color=color, width=1.5)
+                ), row=1, col=1)
+            self.annotations[overlay] = len(fig.layout.annotations)
+            fig.add_annotation(
+                x=0, y=1.1,
+                xref='paper', yref='paper',
+                showarrow=False,
+                align='left',
+                font=dict(size=12),
+                borderpad=4,
+                bgcolor='rgba(0,0,0,0)',
+            )
+
+        fig.update_layout(
+            template='plotly_dark',
+            dragmode=False,
+            showlegend=False,
+            xaxis_rangeslider_visible=False,
+            margin=dict(
+                t=69 if self.overlays else 50,
+                b=100,
+                l=0,
+                r=0
+                ),
+        )
+        # Times arrive as epoch milliseconds.
+        fig.update_xaxes(type='date')
+
+        if self.volume:
+            fig.update_xaxes(showgrid=True, row=1, col=1)
+            fig.update_xaxes(showgrid=True, row=2, col=1)
+            fig.update_yaxes(showgrid=False, row=2, col=1)
+            fig.update_yaxes(showticklabels=False, row=2, col=1)
+        else:
+            fig.update_xaxes(showgrid=True, row=1, col=1)
+
+        self.fig = fig
+
+    def fill(self, candles, close_line=None, lines=None, volume_name=None, overlay_text=None):
+        # candles: frame with UTCTIME/OPEN/HIGH/LOW/CLOSE/VOLUME; close_line
+        # and each lines[column]: (x, y) for the Line chart and the overlays;
+        # overlay_text: annotation text per overlay ("MA" / "EMA").
+        fig = self.fig
+        price = fig.data[0]
+        if self.chart_type == "Line":
+            x, y = close_line
+            price.x = epoch_ms(x)
+            price.y = np.asarray(y, dtype=np.float64)
+        else:
+            price.x = epoch_ms(candles['UTCTIME'])
+            price.open = candles['OPEN'].to_numpy(dtype=np.float64)
+            price.high = candles['HIGH'].to_numpy(dtype=np.float64)
+            price.low = candles['LOW'].to_numpy(dtype=np.float64)
+            price.close = candles['CLOSE'].to_numpy(dtype=np.float64)
+
+        if self.volume:
+            bars = fig.data[1]
+            bars.x = epoch_ms(candles['UTCTIME'])
+            bars.y = candles['VOLUME'].to_numpy(dtype=np.float64)
+            bars.marker.color = (candles['CLOSE'].to_numpy() > candles['OPEN'].to_numpy()).astype(np.float64)
+            bars.name = volume_name
+
+        for column, index in self.lines.items():
+            x, y = lines[column]
+            fig.data[index].x = epoch_ms(x)
+            fig.data[index].y = np.asarray(y, dtype=np.float64)
+
+        for overlay, index in self.annotations.items():
+            fig.layout.annotations[index].text = overlay_text[overlay]
+        return fig
+
+
+class ChartTemplates:
+    # Templates by configuration, least recently used dropped first. Not
+    # thread-safe: keep one per session (fragment runs of a session are serial).
+
+    def __init__(self, max_entries=CHART_TEMPLATES):
+        self.max_entries = max_entries
+        self._templates = {}
+
+    def get(self, chart_type, indicators):
+        key = (chart_type, tuple(sorted(indicators)))
+        template = self._templates.pop(key, None)
+        if template is None:
+            template = ChartTemplate(chart_type, indicators)
+        self._templates[key] = template
+        if len(self._templates) > self.max_entries:
+            del self._templates[next(iter(self._templates))]
+        return template
@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+
+from core.cache import SingleFlight
+from core.http import session
+from core.storage import data_path, read_json, write_json
+
+FNG_URL = os.environ.get("FNG_API_URL", "https://api.alternative.me/fng/")
+FNG_PATH = data_path("fng.json")
+# Points fetched on a cold start; longer history is fetched once (limit=0)
+# when a caller asks for more.
+FNG_HISTORY = 30
+# The index updates once a day; the cache expires at the announced update
+# time plus this slack.
+FNG_UPDATE_SLACK = 60
+# Used when the response carries no time_until_update.
+FNG_DEFAULT_TTL = 3600
+# After a failed refresh the last known series is served for this long
+# before the upstream is tried again.
+FNG_RETRY = 60
+
+DAY = 86400
+
+
+def fetch_fng(limit):
+    # Entries oldest first as (timestamp, value, classification), plus the
+    # seconds until the next update when the upstream reports it.
+    data = session.get(FNG_URL, params={"limit": limit, "format": "json"}).json()['data']
+    entries = sorted(
+        (int(d['timestamp']), int(d['value']), d['value_classification'])
+        for d in data
+    )
+    until_update = next((d['time_until_update'] for d in data if d.get('time_until_update')), None)
+    return entries, int(until_update) if until_update is not None else None
+
+
+class FngService:
+    # Process-wide Fear & Greed series, shared by the sidebar chart and the
+    # technical payload. Refreshed when the daily update is due, by appending
+    # only the missing days; on upstream failure the last known series stays.
+
+    def __init__(self, path=FNG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        saved = read_json(path, {}) or {}
+        self._entries = [tuple(e) for e in saved.get("entries", [])]
+        self._full = saved.get("full", False)
+        self._expires_at = 0
+
+    def series(self, limit=FNG_HISTORY):
+        # The last `limit` entries (all of them for limit=0), oldest first.
+        # Refreshes coalesce per limit: a caller asking for more history
+        # must not settle for a shorter refresh already in flight.
+        need_full = limit == 0 and not self._full
+        if need_full or len(self._entries) < limit or time.time() >= self._expires_at:
+            self._flight.do(("refresh", limit), lambda: self._refresh(limit))
+        with self._lock:
+            return self._entries[-limit:] if limit else list(self._entries)
+
+    def latest(self):
+        # (value, classification) of the newest entry, or (None, None).
+        try:
+            entries = self.series(1)
+        except Exception:
+            return None, None
+        if not entries:
+            return None, None
+        _, value, classification = entries[-1]
+        return value, classification
+
+    def _refresh(self, limit):
+        with self._lock:
+            entries = self._entries
+            full = self._full
+        if limit == 0 and not full:
+            fetch_limit = 0
+        elif entries and len(entries) >= limit:
+            # Only the days since the newest entry, and that entry again.
+            fetch_limit = int((time.time() - entries[-1][0]) // DAY) + 2
+        else:
+            fetch_limit = max(limit, FNG_HISTORY)
+
+        try:
+            fetched, until_update = fetch_fng(fetch_limit)
+        except Exception:
+            if not entries:
+                raise
+            with self._lock:
+                self._expires_at = time.time() + FNG_RETRY
+            return
+
+        with self._lock:
+            merged = dict((e[0], e) for e in self._entries)
+            merged.update((e[0], e) for e in fetched)
+            self._entries = sorted(merged.values())
+            self._full = self._full or fetch_limit == 0
+            ttl = max(until_update, 0) + FNG_UPDATE_SLACK if until_update is not None else FNG_DEFAULT_TTL
+            self._expires_at = time.time() + ttl
+            write_json(self.path, {"entries": self._entries, "full": self._full})
+
+
+fng_service = FngService()
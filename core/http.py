@@ -0,0 +1,60 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core.metrics import metrics
+
+# Connections kept alive per host; sized for the screener fan-out.
+HTTP_POOL_SIZE = 32
+# (connect, read) seconds applied to every request that does not set its own.
+HTTP_TIMEOUT = (3.05, 10)
+HTTP_RETRIES = 3
+HTTP_BACKOFF = 0.3
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+FETCH_WORKERS = 16
+
+
+class _Session(requests.Session):
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", HTTP_TIMEOUT)
+        # Latency covers retries and the body download.
+        host = urlsplit(url).hostname
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, **kwargs)
+        except Exception:
+            metrics.observe("upstream_request_seconds", time.perf_counter() - start, host=host, status="error")
+            raise
+        metrics.observe("upstream_request_seconds", time.perf_counter() - start, host=host, status=str(response.status_code))
+        metrics.inc("upstream_response_bytes", len(response.content), host=host)
+        return response
+
+
+def build_session(retry_statuses=HTTP_RETRY_STATUSES, respect_retry_after=True):
+    session = _Session()
+    # Only idempotent GETs are retried; 429/503 honour Retry-After.
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=retry_statuses,
+        # Otherwise urllib3 also retries any 413/429/503 carrying Retry-After.
+        respect_retry_after_header=respect_retry_after,
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Shared by every fetch in the process so requests reuse pooled connections.
+session = build_session()
+
+# Runs independent fetches of one rerun concurrently.
+fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="fetch")
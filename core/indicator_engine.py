@@ -0,0 +1,312 @@
+import math
+import threading
+from collections import deque
+
+from core.cache import TTLCache
+
+# Streaming counterpart of the chart indicators in core.indicators. Smoother
+# state is kept per (symbol, interval): while the window only grows, closed
+# candles are committed once, and a rerun within the same candle evaluates
+# only the live one. The EMAs depend on where the window starts, so when a
+# fixed-size window (the chart's 300 rows) slides by a closed candle, the
+# state is rebuilt from the whole window. Every step replays the exact
+# arithmetic of pandas' ewm(adjust=False).mean() and rolling().mean(), so the
+# values are bit-identical to the pandas formulas over the same rows.
+
+MA_WINDOWS = (7, 50, 100)
+EMA_SPANS = (7, 20, 50, 100)
+PERIOD = 14
+
+COLUMNS = (
+    "MA7", "MA50", "MA100",
+    "EMA7", "EMA20", "EMA50", "EMA100",
+    "RSI14", "MACD", "MACD_SIGNAL", "MACD_HIST",
+    "ADX14", "PLUS_DI14", "MINUS_DI14",
+)
+
+ENGINE_WINDOW = 300
+ENGINE_CACHE_ENTRIES = 256
+
+NAN = float("nan")
+
+
+def ewm_alpha(span=None, alpha=None):
+    # Derived the way pandas does (through the center of mass), which is not
+    # always bit-equal to 2 / (span + 1).
+    if span is not None:
+        com = (span - 1) / 2
+    else:
+        com = (1 - alpha) / alpha
+    return 1.0 / (1.0 + com)
+
+
+def ewm_step(state, x, alpha):
+    weighted, old_wt = state
+    if weighted == weighted:
+        old_wt *= 1.0 - alpha
+        if x == x:
+            if weighted != x:
+                weighted = (old_wt * weighted + alpha * x) / (old_wt + alpha)
+            old_wt = 1.0
+    elif x == x:
+        weighted = x
+    return weighted, old_wt
+
+
+EWM_START = (NAN, 1.0)
+
+
+def rolling_mean_step(state, x, leaving, window):
+    # state: (sum, add compensation, remove compensation, nobs, negatives,
+    # consecutive equal values, previous value); `leaving` is the value that
+    # drops out of the window, or None while the window is filling.
+    sum_x, comp_add, comp_remove, nobs, neg_ct, same, prev = state
+
+    if leaving is not None and leaving == leaving:
+        nobs -= 1
+        y = -leaving - comp_remove
+        t = sum_x + y
+        comp_remove = t - sum_x - y
+        sum_x = t
+        if math.copysign(1.0, leaving) < 0:
+            neg_ct -= 1
+
+    if x == x:
+        nobs += 1
+        y = x - comp_add
+        t = sum_x + y
+        comp_add = t - sum_x - y
+        sum_x = t
+        if math.copysign(1.0, x) < 0:
+            neg_ct += 1
+        same = same + 1 if x == prev else 1
+        prev = x
+
+    if nobs >= window:
+        result = sum_x / nobs
+        if same >= nobs:
+            result = prev
+        elif neg_ct == 0 and result < 0:
+            result = 0.0
+        elif neg_ct == nobs and result > 0:
+            result = 0.0
+    else:
+        result = NAN
+
+    return (sum_x, comp_add, comp_remove, nobs, neg_ct, same, prev), result
+
+
+def rolling_start(first):
+    return (0.0, 0.0, 0.0, 0, 0, 0, first)
+
+
+def ieee_div(a, b):
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if a != a or a == 0:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+
+def as_floats(values):
+    # Plain Python floats: numpy scalars (from a Series or an array) divide by
+    # zero with a RuntimeWarning instead of the ZeroDivisionError ieee_div expects.
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
+class _State:
+    __slots__ = ("prev_high", "prev_low", "prev_close", "ma", "ema", "rsi", "macd", "adx")
+
+    def __init__(self, first_close=NAN):
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.prev_close = NAN
+        self.ma = [rolling_start(first_close) for _ in MA_WINDOWS]
+        self.ema = [EWM_START for _ in EMA_SPANS]
+        # avg gain, avg loss
+        self.rsi = [EWM_START, EWM_START]
+        # fast, slow, signal
+        self.macd = [EWM_START, EWM_START, EWM_START]
+        # atr, +dm, -dm, adx
+        self.adx = [EWM_START, EWM_START, EWM_START, EWM_START]
+
+    def copy(self):
+        other = _State.__new__(_State)
+        other.prev_high = self.prev_high
+        other.prev_low = self.prev_low
+        other.prev_close = self.prev_close
+        other.ma = list(self.ma)
+        other.ema = list(self.ema)
+        other.rsi = list(self.rsi)
+        other.macd = list(self.macd)
+        other.adx = list(self.adx)
+        return other
+
+
+_EMA_ALPHAS = tuple(ewm_alpha(span=s) for s in EMA_SPANS)
+_MACD_ALPHAS = (ewm_alpha(span=12), ewm_alpha(span=26), ewm_alpha(span=9))
+_WILDER_ALPHA = ewm_alpha(alpha=1 / PERIOD)
+
+
+def _step(state, closes, high, low, close):
+    # Advances `state` in place by one candle and returns the indicator row.
+    # `closes` holds the closes already committed, for the rolling windows.
+    n = len(closes)
+    row = []
+
+    for i, window in enumerate(MA_WINDOWS):
+        leaving = closes[n - window] if n >= window else None
+        state.ma[i], value = rolling_mean_step(state.ma[i], close, leaving, window)
+        row.append(value)
+
+    for i, alpha in enumerate(_EMA_ALPHAS):
+        state.ema[i] = ewm_step(state.ema[i], close, alpha)
+        row.append(state.ema[i][0])
+
+    delta = close - state.prev_close
+    if delta == delta:
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+    else:
+        gain = loss = NAN
+    state.rsi[0] = ewm_step(state.rsi[0], gain, _WILDER_ALPHA)
+    state.rsi[1] = ewm_step(state.rsi[1], loss, _WILDER_ALPHA)
+    rs = ieee_div(state.rsi[0][0], state.rsi[1][0])
+    row.append(100 - (100 / (1 + rs)))
+
+    fast_alpha, slow_alpha, signal_alpha = _MACD_ALPHAS
+    state.macd[0] = ewm_step(state.macd[0], close, fast_alpha)
+    state.macd[1] = ewm_step(state.macd[1], close, slow_alpha)
+    macd_line = state.macd[0][0] - state.macd[1][0]
+    state.macd[2] = ewm_step(state.macd[2], macd_line, signal_alpha)
+    row.extend((macd_line, state.macd[2][0], macd_line - state.macd[2][0]))
+
+    up_move = high - state.prev_high
+    down_move = -(low - state.prev_low)
+    plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+    minus_dm = down_move if down_move > up_move and down_move > 0 else 0.0
+
+    tr = high - low
+    tr2 = abs(high - state.prev_close)
+    tr3 = abs(low - state.prev_close)
+    if tr2 > tr:
+        tr = tr2
+    if tr3 > tr:
+        tr = tr3
+
+    state.adx[0] = ewm_step(state.adx[0], tr, _WILDER_ALPHA)
+    state.adx[1] = ewm_step(state.adx[1], plus_dm, _WILDER_ALPHA)
+    state.adx[2] = ewm_step(state.adx[2], minus_dm, _WILDER_ALPHA)
+    atr = state.adx[0][0]
+    plus_di = 100 * ieee_div(state.adx[1][0], atr)
+    minus_di = 100 * ieee_div(state.adx[2][0], atr)
+    dx = ieee_div(abs(plus_di - minus_di), plus_di + minus_di) * 100
+    state.adx[3] = ewm_step(state.adx[3], dx, _WILDER_ALPHA)
+    row.extend((state.adx[3][0], plus_di, minus_di))
+
+    state.prev_high = high
+    state.prev_low = low
+    state.prev_close = close
+    return row
+
+
+class IndicatorEngine:
+    # Indicator state for one (symbol, interval). `update` receives the
+    # visible window with the live candle last; closed candles are committed
+    # once, the live one is re-evaluated on a copy of the committed state.
+    # When the window start moves (each new candle, once the window is
+    # full), the state is reseeded from the window so the result keeps
+    # matching the pandas formulas over those same rows.
+
+    def __init__(self, window=ENGINE_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.open_times = []
+        self.closes = []
+        self.columns = {name: [] for name in COLUMNS}
+        self.state = None
+
+    def seed(self, open_times, high, low, close):
+        with self._lock:
+            self.reset()
+            self._commit(as_floats(open_times), as_floats(high), as_floats(low), as_floats(close), 0)
+
+    def _commit(self, open_times, high, low, close, start):
+        if self.state is None:
+            if len(open_times) == 0:
+                return
+            self.state = _State(close[0])
+        for i in range(start, len(open_times)):
+            row = _step(self.state, self.closes, high[i], low[i], close[i])
+            self.open_times.append(open_times[i])
+            self.closes.append(close[i])
+            for name, value in zip(COLUMNS, row):
+                self.columns[name].append(value)
+
+    def _is_prefix(self, open_times, closed):
+        committed = len(self.open_times)
+        return (
+            0 < committed <= closed
+            and self.open_times[0] == open_times[0]
+            and self.open_times[-1] == open_times[committed - 1]
+        )
+
+    def update(self, open_times, high, low, close):
+        open_times = as_floats(open_times)[-self.window:]
+        high = as_floats(high)[-self.window:]
+        low = as_floats(low)[-self.window:]
+        close = as_floats(close)[-self.window:]
+        if not open_times:
+            return {name: [] for name in COLUMNS}
+        closed = len(open_times) - 1
+
+        with self._lock:
+            start = len(self.open_times)
+            if not self._is_prefix(open_times, closed):
+                self.reset()
+                start = 0
+            self._commit(open_times[:closed], high[:closed], low[:closed], close[:closed], start)
+
+            if self.state is None:
+                live_state = _State(close[-1])
+            else:
+                live_state = self.state.copy()
+            live = _step(live_state, self.closes, high[-1], low[-1], close[-1])
+            return {name: self.columns[name] + [value] for name, value in zip(COLUMNS, live)}
+
+
+class IndicatorStream:
+    # Indicator values advanced one closed candle at a time, for consumers
+    # that only need the latest row (the alert engine). Only the closes the
+    # moving averages still drop out of their windows are kept.
+
+    def __init__(self):
+        self.closes = deque(maxlen=max(MA_WINDOWS))
+        self.state = None
+        self.last_open_time = None
+
+    def step(self, open_time, high, low, close):
+        if self.state is None:
+            self.state = _State(close)
+        row = _step(self.state, self.closes, high, low, close)
+        self.closes.append(close)
+        self.last_open_time = open_time
+        return dict(zip(COLUMNS, row))
+
+
+_engines = TTLCache(max_entries=ENGINE_CACHE_ENTRIES)
+_engines_lock = threading.Lock()
+
+
+def get_indicator_engine(symbol, interval, window=ENGINE_WINDOW):
+    key = (symbol, interval, window)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = IndicatorEngine(window)
+            _engines.set(key, engine, math.inf)
+        return engine
@@ -0,0 +1,143 @@
+import numpy as np
+
+from core.indicator_engine import ewm_alpha, ieee_div
+
+# Array kernels for RSI, MACD, ATR and ADX/DI over contiguous float64
+# buffers. They produce the same values as core.indicators without building
+# intermediate Series: the Wilder smoothers of one indicator share a single
+# Python pass over plain floats, which is far cheaper than pandas at a few
+# hundred rows.
+
+
+def _as_array(values):
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def ewm(values, alpha):
+    # ewm(alpha=alpha, adjust=False).mean() over a float64 array.
+    out = []
+    append = out.append
+    factor = 1.0 - alpha
+    weighted = np.nan
+    old_wt = 1.0
+    for x in _as_array(values).tolist():
+        if weighted == weighted:
+            old_wt *= factor
+            if x == x:
+                if weighted != x:
+                    weighted = (old_wt * weighted + alpha * x) / (old_wt + alpha)
+                old_wt = 1.0
+        elif x == x:
+            weighted = x
+        append(weighted)
+    return np.array(out)
+
+
+def ema(values, span):
+    return ewm(values, ewm_alpha(span=span))
+
+
+def rsi(close, period=14):
+    close = _as_array(close)
+    delta = np.empty(len(close))
+    delta[:1] = np.nan
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+
+    alpha = ewm_alpha(alpha=1 / period)
+    avg_gain = ewm(np.where(delta > 0, delta, np.where(delta == delta, 0.0, np.nan)), alpha)
+    avg_loss = ewm(np.where(delta < 0, -delta, np.where(delta == delta, 0.0, np.nan)), alpha)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    close = _as_array(close)
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def true_range(high, low, close):
+    high = _as_array(high)
+    low = _as_array(low)
+    close = _as_array(close)
+    tr = high - low
+    if len(tr) > 1:
+        prev_close = close[:-1]
+        np.maximum(tr[1:], np.abs(high[1:] - prev_close), out=tr[1:])
+        np.maximum(tr[1:], np.abs(low[1:] - prev_close), out=tr[1:])
+    return tr
+
+
+def atr(high, low, close, period=14):
+    return ewm(true_range(high, low, close), ewm_alpha(alpha=1 / period))
+
+
+def directional_movement(high, low):
+    high = _as_array(high)
+    low = _as_array(low)
+    up_move = np.empty(len(high))
+    down_move = np.empty(len(low))
+    up_move[:1] = np.nan
+    down_move[:1] = np.nan
+    np.subtract(high[1:], high[:-1], out=up_move[1:])
+    np.negative(low[1:] - low[:-1], out=down_move[1:])
+
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+    return plus_dm, minus_dm
+
+
+def adx(high, low, close, period=14):
+    # ATR, +DM and -DM smoothing and the ADX smoother over DX run in one pass.
+    tr = true_range(high, low, close).tolist()
+    plus_dm, minus_dm = directional_movement(high, low)
+    plus_dm = plus_dm.tolist()
+    minus_dm = minus_dm.tolist()
+
+    n = len(tr)
+    adx_out = []
+    plus_di_out = []
+    minus_di_out = []
+
+    alpha = ewm_alpha(alpha=1 / period)
+    factor = 1.0 - alpha
+    # TR, +DM and -DM are never NaN, so their smoothers start at row 0.
+    s_tr = tr[0] if n else np.nan
+    s_plus = plus_dm[0] if n else np.nan
+    s_minus = minus_dm[0] if n else np.nan
+    s_adx = np.nan
+    adx_wt = 1.0
+
+    for i in range(n):
+        if i:
+            x = tr[i]
+            if s_tr != x:
+                s_tr = (factor * s_tr + alpha * x) / (factor + alpha)
+            x = plus_dm[i]
+            if s_plus != x:
+                s_plus = (factor * s_plus + alpha * x) / (factor + alpha)
+            x = minus_dm[i]
+            if s_minus != x:
+                s_minus = (factor * s_minus + alpha * x) / (factor + alpha)
+
+        plus_di = 100 * ieee_div(s_plus, s_tr)
+        minus_di = 100 * ieee_div(s_minus, s_tr)
+        dx = ieee_div(abs(plus_di - minus_di), plus_di + minus_di) * 100
+
+        if s_adx == s_adx:
+            adx_wt *= factor
+            if dx == dx:
+                if s_adx != dx:
+                    s_adx = (adx_wt * s_adx + alpha * dx) / (adx_wt + alpha)
+                adx_wt = 1.0
+        elif dx == dx:
+            s_adx = dx
+
+        adx_out.append(s_adx)
+        plus_di_out.append(plus_di)
+        minus_di_out.append(minus_di)
+
+    return np.array(adx_out), np.array(plus_di_out), np.array(minus_di_out)
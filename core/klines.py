@@ -0,0 +1,203 @@
+import threading
+import time
+
+import numpy as np
+
+from core.binance import fetch_klines
+from core.cache import SingleFlight, TTLCache
+from core.metrics import metrics
+
+# Seconds a cached series stays fresh. The live candle of short intervals
+# moves faster, so those entries expire sooner.
+KLINE_TTL = {"1m": 5, "1h": 15, "1d": 30, "1M": 300}
+DEFAULT_KLINE_TTL = 15
+
+# Fixed candle lengths; monthly candles vary and are not listed.
+INTERVAL_MS = {"1m": 60_000, "1h": 3_600_000, "1d": 86_400_000}
+# Shortest month, for sizing requests of monthly candles.
+MIN_MONTH_MS = 28 * 86_400_000
+
+# Maximum rows Binance returns for a single klines request.
+KLINE_PAGE_LIMIT = 1000
+
+KLINE_CACHE_ENTRIES = 1024
+# Bytes of kline records the store may hold; 48 bytes per candle.
+KLINE_CACHE_BYTES = 64 * 1024 * 1024
+
+# The kline fields the dashboard uses, as one record per candle.
+KLINE_DTYPE = np.dtype([
+    ("open_time", np.int64),
+    ("open", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("close", np.float64),
+    ("volume", np.float64),
+])
+
+
+def decode_klines(rows):
+    # REST kline rows (open time, then OHLCV as strings, then unused fields)
+    # to a KLINE_DTYPE array, in a single pass.
+    return np.fromiter(
+        ((k[0], float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5])) for k in rows),
+        KLINE_DTYPE,
+        len(rows),
+    )
+
+
+def kline_frame(klines):
+    # chart_component's frame from anything indexable by KLINE_DTYPE field
+    # name: a decoded array or the archive's column dict. pandas is imported
+    # here so fetching and decoding stay importable without it.
+    import pandas as pd
+
+    open_time = klines['open_time']
+    return pd.DataFrame({
+        'TIMESTAMP': open_time / 1000.0,
+        'OPEN': klines['open'],
+        'HIGH': klines['high'],
+        'LOW': klines['low'],
+        'CLOSE': klines['close'],
+        'VOLUME': klines['volume'],
+        'UTCTIME': open_time.astype('datetime64[ms]'),
+    })
+
+
+class KlineSeries:
+    # The most recent klines of one (symbol, interval), kept as a bounded
+    # KLINE_DTYPE window. After the first load only candles since the last
+    # stored open time are requested: the open candle is patched and newly
+    # opened ones are appended. Every update swaps in a new read-only array,
+    # so windows handed out by `tail` never change under their reader.
+
+    def __init__(self, symbol, interval):
+        self.symbol = symbol
+        self.interval = interval
+        self.limit = 0
+        self.klines = np.empty(0, KLINE_DTYPE)
+        self._lock = threading.Lock()
+
+    def _set(self, klines):
+        klines.flags.writeable = False
+        self.klines = klines
+
+    def load(self, limit):
+        klines = decode_klines(fetch_klines(self.symbol, self.interval, limit))
+        with self._lock:
+            self._set(klines)
+            self.limit = limit
+
+    def last_open_time(self):
+        klines = self.klines
+        return int(klines['open_time'][-1]) if len(klines) else None
+
+    def refresh(self):
+        last = self.last_open_time()
+        if last is None:
+            return self.load(self.limit)
+
+        # Sized to the candles opened since `last` (plus the open one), so a
+        # steady-state refresh stays in Binance's cheapest weight tier.
+        step = INTERVAL_MS.get(self.interval, MIN_MONTH_MS)
+        limit = min(int(time.time() * 1000 - last) // step + 2, KLINE_PAGE_LIMIT)
+        rows = fetch_klines(self.symbol, self.interval, limit, start_time=last)
+        if len(rows) >= limit:
+            # More candles than expected, or too far behind for one page; start over.
+            return self.load(self.limit)
+        self.apply(decode_klines(rows))
+
+    def apply(self, klines):
+        # klines: KLINE_DTYPE array, oldest first. A candle with the last
+        # stored open time replaces it; older ones are ignored.
+        with self._lock:
+            current = self.klines
+            if len(current):
+                last = current['open_time'][-1]
+                klines = klines[klines['open_time'] >= last]
+                if len(klines) and klines['open_time'][0] == last:
+                    current = current[:-1]
+            if not len(klines):
+                return
+            self._set(np.concatenate((current, klines))[-self.limit:])
+
+    def tail(self, limit):
+        return self.klines[-limit:]
+
+    def __len__(self):
+        return len(self.klines)
+
+
+class KlineStore:
+    # Process-wide kline cache keyed by (symbol, interval). Every Streamlit
+    # session reads from the same store, so concurrent viewers of one pair
+    # cost a single upstream request per TTL window. Expired series are
+    # refreshed incrementally rather than refetched.
+
+    def __init__(self, max_entries=KLINE_CACHE_ENTRIES, max_bytes=KLINE_CACHE_BYTES):
+        self._cache = TTLCache(max_entries=max_entries, max_weight=max_bytes, weigher=lambda s: s.klines.nbytes)
+        self._flight = SingleFlight()
+        self._listeners = []
+
+    def listen(self, callback):
+        # callback(symbol, interval, klines) after a series is loaded or
+        # updated, on the thread that updated it; it should only hand off.
+        self._listeners.append(callback)
+
+    def _notify(self, series):
+        for callback in self._listeners:
+            callback(series.symbol, series.interval, series.klines)
+
+    def get(self, symbol, interval, limit=300):
+        return self.series(symbol, interval, limit).tail(limit)
+
+    def series(self, symbol, interval, limit=300):
+        key = (symbol, interval)
+        series = self._cache.get(key)
+        if series is not None and series.limit >= limit:
+            return series
+
+        def load():
+            series = self._cache.peek(key) or KlineSeries(symbol, interval)
+            if series.limit >= limit:
+                series.refresh()
+            else:
+                # A longer window than the one held; reload it in full.
+                series.load(limit)
+            self._cache.set(key, series, KLINE_TTL.get(interval, DEFAULT_KLINE_TTL))
+            self._notify(series)
+            return series
+
+        series = self._flight.do(key, load)
+        if series.limit < limit:
+            # Joined a shorter in-flight load; extend it.
+            series = self._flight.do(key, load)
+        return series
+
+    def apply(self, symbol, interval, klines):
+        # Pushes KLINE_DTYPE klines received elsewhere (the WebSocket stream)
+        # into a cached series and renews its TTL. Candles that would leave a
+        # gap are ignored; the next REST refresh fills it instead.
+        key = (symbol, interval)
+        series = self._cache.peek(key)
+        step = INTERVAL_MS.get(interval)
+        if series is None or step is None or not len(klines):
+            return False
+        last_open = series.last_open_time()
+        if last_open is None or klines['open_time'][0] not in (last_open, last_open + step):
+            return False
+        series.apply(klines)
+        self._cache.set(key, series, KLINE_TTL.get(interval, DEFAULT_KLINE_TTL))
+        self._notify(series)
+        return True
+
+    def stats(self):
+        return self._cache.stats()
+
+
+kline_store = KlineStore()
+metrics.register_collector("kline_store", kline_store.stats)
+
+
+def get_klines(symbol, interval, limit=300):
+    # The last `limit` candles as a read-only KLINE_DTYPE array.
+    return kline_store.get(symbol, interval, limit)
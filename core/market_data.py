@@ -0,0 +1,220 @@
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from core.fng import FNG_HISTORY
+from core.indicator_engine import COLUMNS
+from core.klines import KLINE_DTYPE
+from core.reference import DAY_MS, REFERENCE_LOOKBACKS
+from core.storage import data_path
+
+# Market data published by the worker process (core.market_worker) through
+# memory-mapped files: one per series, one per ticker, one per symbol for
+# the ATH and reference closes, and one for the Fear & Greed series. The
+# Streamlit process only maps and reads them; when no worker is running, or
+# it stops checking in, every read returns None and the caller fetches
+# in-process.
+
+MARKET_DATA_DIR = os.environ.get("MARKET_DATA_DIR") or (
+    "/dev/shm/crypto-dashboard" if os.path.isdir("/dev/shm") else data_path("market")
+)
+# Published data whose writer has not checked in for this long is ignored.
+MARKET_STALE = 15
+# Attempts at an untorn copy before a read gives up.
+MARKET_READ_RETRIES = 100
+
+# One record per candle: the kline fields, then the chart's indicator columns.
+MARKET_DTYPE = np.dtype(KLINE_DTYPE.descr + [(name, np.float64) for name in COLUMNS])
+TICKER_DTYPE = np.dtype([
+    ("last_price", np.float64),
+    ("change_percent", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("close_time", np.int64),
+])
+# ATH and the closes the ticker's change metrics compare against (NaN when
+# there is none), for the UTC day starting at day_start.
+SUMMARY_DTYPE = np.dtype(
+    [("ath", np.float64), ("ath_time", np.float64), ("day_start", np.int64)]
+    + [(f"close_{days}d", np.float64) for days in REFERENCE_LOOKBACKS]
+)
+FNG_DTYPE = np.dtype([("timestamp", np.int64), ("value", np.int64), ("classification", "S24")])
+
+# int64 header words.
+VERSION, ROWS, HEARTBEAT, CAPACITY = range(4)
+HEADER_BYTES = 4 * 8
+
+
+def series_path(root, symbol, interval):
+    return os.path.join(root, f"{symbol}-{interval}.bin")
+
+
+def ticker_path(root, symbol):
+    return os.path.join(root, f"{symbol}-ticker.bin")
+
+
+def summary_path(root, symbol):
+    return os.path.join(root, f"{symbol}-summary.bin")
+
+
+def fng_path(root):
+    return os.path.join(root, "fng.bin")
+
+
+class SharedBlock:
+    # Up to `capacity` records of `dtype` in a memory-mapped file behind an
+    # int64 header [version, rows, heartbeat ms, capacity]. There is one
+    # writer. The version is odd while a write is in progress (a seqlock),
+    # so readers retry instead of keeping a torn copy, and skip the copy
+    # altogether when the version is the one they already hold.
+
+    def __init__(self, path, dtype, capacity, mode="r"):
+        self.path = path
+        self.dtype = dtype
+        self.capacity = capacity
+        size = HEADER_BYTES + capacity * dtype.itemsize
+        if os.path.getsize(path) != size:
+            raise ValueError(f"{path}: unexpected size")
+        buf = np.memmap(path, dtype=np.uint8, mode=mode, shape=(size,))
+        self.header = buf[:HEADER_BYTES].view(np.int64)
+        self.records = buf[HEADER_BYTES:].view(dtype)
+
+    def write(self, records):
+        header = self.header
+        header[VERSION] += 1
+        self.records[:len(records)] = records
+        header[ROWS] = len(records)
+        header[VERSION] += 1
+        self.touch()
+
+    def touch(self):
+        self.header[HEARTBEAT] = int(time.time() * 1000)
+
+    def fresh(self):
+        return time.time() * 1000 - int(self.header[HEARTBEAT]) <= MARKET_STALE * 1000
+
+    def read(self, version=None):
+        # (version, read-only copy of the records), with None for the copy
+        # when `version` is still current; None if no clean copy was made.
+        header = self.header
+        for _ in range(MARKET_READ_RETRIES):
+            current = int(header[VERSION])
+            if current & 1:
+                time.sleep(0)
+                continue
+            if current == version:
+                return current, None
+            records = np.array(self.records[:int(header[ROWS])])
+            if int(header[VERSION]) == current:
+                records.flags.writeable = False
+                return current, records
+        return None
+
+
+def create_block(path, dtype, capacity):
+    # A new zeroed file swapped in by rename: readers still mapping an old
+    # one keep a consistent (stale) view and reopen once it stops checking in.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.truncate(HEADER_BYTES + capacity * dtype.itemsize)
+    os.replace(tmp, path)
+    block = SharedBlock(path, dtype, capacity, mode="r+")
+    block.header[CAPACITY] = capacity
+    return block
+
+
+class MarketData:
+    # Reader side: the latest published series and tickers, copied out of the
+    # shared files only when their version moved, and shared by every session.
+
+    def __init__(self, root=MARKET_DATA_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._blocks = {}
+        self._copies = {}
+
+    def _read(self, path, dtype, capacity=None):
+        with self._lock:
+            block = self._blocks.get(path)
+            if block is None or not block.fresh():
+                # Missing, or possibly replaced by a restarted worker.
+                self._copies.pop(path, None)
+                try:
+                    if capacity is None:
+                        capacity = (os.path.getsize(path) - HEADER_BYTES) // dtype.itemsize
+                    block = SharedBlock(path, dtype, capacity)
+                except (OSError, ValueError):
+                    self._blocks.pop(path, None)
+                    return None
+                self._blocks[path] = block
+                if not block.fresh():
+                    return None
+
+            version, records = self._copies.get(path, (None, None))
+            result = block.read(version)
+            if result is None:
+                return None
+            if result[1] is not None:
+                self._copies[path] = result
+                records = result[1]
+            return records if len(records) else None
+
+    def series(self, symbol, interval):
+        # MARKET_DTYPE records, oldest first with the live candle last, or None.
+        return self._read(series_path(self.root, symbol, interval), MARKET_DTYPE)
+
+    def ticker(self, symbol):
+        # The /ticker/24hr fields the dashboard reads, or None.
+        records = self._read(ticker_path(self.root, symbol), TICKER_DTYPE, 1)
+        if records is None:
+            return None
+        ticker = records[0]
+        return {
+            "symbol": symbol,
+            "lastPrice": float(ticker['last_price']),
+            "priceChangePercent": float(ticker['change_percent']),
+            "highPrice": float(ticker['high']),
+            "lowPrice": float(ticker['low']),
+            "closeTime": int(ticker['close_time']),
+        }
+
+    def _summary(self, symbol):
+        records = self._read(summary_path(self.root, symbol), SUMMARY_DTYPE, 1)
+        return None if records is None else records[0]
+
+    def ath(self, symbol):
+        # (all-time high, its time in seconds), or None.
+        summary = self._summary(symbol)
+        if summary is None or summary['ath'] <= 0:
+            return None
+        return float(summary['ath']), float(summary['ath_time'])
+
+    def references(self, symbol):
+        # {lookback: close or None} as core.reference gives them, or None
+        # when nothing was published for the current UTC day.
+        summary = self._summary(symbol)
+        if summary is None or int(summary['day_start']) != int(time.time() * 1000) // DAY_MS * DAY_MS:
+            return None
+        closes = {}
+        for days in REFERENCE_LOOKBACKS:
+            close = float(summary[f'close_{days}d'])
+            closes[days] = None if np.isnan(close) else close
+        return closes
+
+    def fng(self):
+        # The last FNG_HISTORY (timestamp, value, classification) entries,
+        # oldest first, as core.fng gives them, or None.
+        records = self._read(fng_path(self.root), FNG_DTYPE, FNG_HISTORY)
+        if records is None:
+            return None
+        return [
+            (int(r['timestamp']), int(r['value']), r['classification'].decode())
+            for r in records
+        ]
+
+
+market_data = MarketData()
@@ -0,0 +1,217 @@
+import argparse
+import multiprocessing
+import time
+
+import numpy as np
+
+from core import binance
+from core.ath import ath_index
+from core.binance import BINANCE_WEIGHT_LIMIT, WeightLimiter, fetch_ticker_24hr
+from core.fng import FNG_HISTORY, fng_service
+from core.indicator_engine import get_indicator_engine
+from core.klines import kline_store
+from core.market_data import (
+    FNG_DTYPE, MARKET_DATA_DIR, MARKET_DTYPE, SUMMARY_DTYPE, TICKER_DTYPE,
+    create_block, fng_path, series_path, summary_path, ticker_path,
+)
+from core.metrics import metrics, serve_metrics
+from core.payload import PAYLOAD_HISTORY
+from core.reference import DAY_MS, reference_prices
+from core.screener import binance_symbol
+from core.stream import market_stream
+from core.symbols import CRYPTO_OPTIONS
+
+# Market-data worker: fetches, caches and computes the indicators of every
+# (symbol, interval) outside the Streamlit process and publishes them through
+# core.market_data, with the tickers, each symbol's ATH and reference closes
+# and the Fear & Greed series, so the dashboard's sessions only read and
+# render:
+#
+#     python -m core.market_worker [--processes 2] [--intervals 1d 1h 1m]
+#
+# With several processes the symbols are split between them, each with its
+# share of the Binance request-weight budget; the first one also publishes
+# the Fear & Greed series. Ranges longer than the published window are still
+# read from the kline archive by the dashboard itself.
+
+MARKET_INTERVALS = ("1d", "1h", "1m")
+# Seconds between passes over the published series.
+MARKET_WORKER_INTERVAL = 1
+# Seconds a REST ticker is reused while the WebSocket stream has none.
+MARKET_TICKER_TTL = 5
+
+
+def market_records(klines, indicators):
+    records = np.empty(len(klines), MARKET_DTYPE)
+    for name in klines.dtype.names:
+        records[name] = klines[name]
+    for name, values in indicators.items():
+        records[name] = values
+    return records
+
+
+def ticker_record(ticker):
+    record = np.empty(1, TICKER_DTYPE)
+    record['last_price'] = float(ticker['lastPrice'])
+    record['change_percent'] = float(ticker['priceChangePercent'])
+    record['high'] = float(ticker['highPrice'])
+    record['low'] = float(ticker['lowPrice'])
+    record['close_time'] = int(ticker['closeTime'])
+    return record
+
+
+def summary_record(ath, references, day_start):
+    record = np.empty(1, SUMMARY_DTYPE)
+    record['ath'], record['ath_time'] = ath
+    record['day_start'] = day_start
+    for days, close in references.items():
+        record[f'close_{days}d'] = np.nan if close is None else close
+    return record
+
+
+def fng_records(entries):
+    records = np.empty(len(entries), FNG_DTYPE)
+    for i, (timestamp, value, classification) in enumerate(entries):
+        records[i] = (timestamp, value, classification.encode())
+    return records
+
+
+class MarketWorker:
+    # One pass refreshes every series through the kline store (kept current
+    # by the WebSocket stream where available) and republishes only the ones
+    # whose kline array was swapped since; the others are just marked alive.
+
+    def __init__(self, symbols, intervals=MARKET_INTERVALS, root=MARKET_DATA_DIR, fng=True):
+        self.symbols = symbols
+        self.intervals = intervals
+        self.root = root
+        self.fng = fng
+        self._blocks = {}
+        self._published = {}
+        self._tickers = {}
+
+    def _block(self, path, dtype, capacity):
+        block = self._blocks.get(path)
+        if block is None:
+            block = self._blocks[path] = create_block(path, dtype, capacity)
+        return block
+
+    def _publish(self, path, dtype, capacity, records):
+        # Writes `records` unless they are the ones already published.
+        block = self._block(path, dtype, capacity)
+        if self._published.get(path) == records.tobytes():
+            block.touch()
+            return False
+        block.write(records)
+        self._published[path] = records.tobytes()
+        return True
+
+    def publish_series(self, symbol, interval):
+        series = kline_store.series(symbol, interval, PAYLOAD_HISTORY)
+        klines = series.klines
+        block = self._block(series_path(self.root, symbol, interval), MARKET_DTYPE, PAYLOAD_HISTORY)
+        if self._published.get((symbol, interval)) is klines:
+            block.touch()
+            return False
+        klines = klines[-PAYLOAD_HISTORY:]
+        engine = get_indicator_engine(symbol, interval)
+        indicators = engine.update(
+            klines['open_time'].tolist(), klines['high'].tolist(), klines['low'].tolist(), klines['close'].tolist()
+        )
+        block.write(market_records(klines, indicators))
+        self._published[(symbol, interval)] = series.klines
+        return True
+
+    def publish_ticker(self, symbol):
+        ticker = market_stream.ticker(symbol)
+        if ticker is None:
+            fetched_at, ticker = self._tickers.get(symbol, (0, None))
+            if time.monotonic() - fetched_at > MARKET_TICKER_TTL:
+                ticker = fetch_ticker_24hr(symbol)
+                if 'lastPrice' not in ticker:
+                    raise RuntimeError(ticker.get('msg', 'Unknown error'))
+                self._tickers[symbol] = (time.monotonic(), ticker)
+        self._block(ticker_path(self.root, symbol), TICKER_DTYPE, 1).write(ticker_record(ticker))
+        return ticker
+
+    def publish_summary(self, symbol, ticker):
+        # The ATH is scanned from the monthly klines about once a day and
+        # otherwise follows the ticker's 24h high; the reference closes are
+        # read once per UTC day.
+        ath_index.get(symbol)
+        ath = ath_index.observe(symbol, float(ticker['highPrice']))
+        day_start = int(time.time() * 1000) // DAY_MS * DAY_MS
+        references = reference_prices.get(symbol)
+        self._publish(summary_path(self.root, symbol), SUMMARY_DTYPE, 1, summary_record(ath, references, day_start))
+
+    def publish_fng(self):
+        entries = fng_service.series(FNG_HISTORY)
+        if entries:
+            self._publish(fng_path(self.root), FNG_DTYPE, FNG_HISTORY, fng_records(entries))
+
+    def run_once(self):
+        if self.fng:
+            try:
+                self.publish_fng()
+            except Exception:
+                metrics.inc("market_worker_errors", symbol="", interval="fng")
+        for symbol in self.symbols:
+            market_stream.subscribe(symbol, self.intervals)
+            try:
+                ticker = self.publish_ticker(symbol)
+            except Exception:
+                ticker = None
+                metrics.inc("market_worker_errors", symbol=symbol, interval="ticker")
+            if ticker is not None:
+                try:
+                    self.publish_summary(symbol, ticker)
+                except Exception:
+                    metrics.inc("market_worker_errors", symbol=symbol, interval="summary")
+            for interval in self.intervals:
+                try:
+                    with metrics.timed("market_publish_seconds", interval=interval):
+                        self.publish_series(symbol, interval)
+                except Exception:
+                    metrics.inc("market_worker_errors", symbol=symbol, interval=interval)
+
+    def run_forever(self, every=MARKET_WORKER_INTERVAL):
+        while True:
+            start = time.monotonic()
+            self.run_once()
+            time.sleep(max(0.0, every - (time.monotonic() - start)))
+
+
+def serve(symbols, intervals=MARKET_INTERVALS, processes=1, fng=True):
+    if processes > 1:
+        binance.binance_client.limiter = WeightLimiter(BINANCE_WEIGHT_LIMIT / processes)
+    MarketWorker(symbols, intervals, fng=fng).run_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish market data and indicators for the dashboard.")
+    parser.add_argument("instruments", nargs="*", default=CRYPTO_OPTIONS)
+    parser.add_argument("--intervals", nargs="+", default=list(MARKET_INTERVALS))
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+
+    symbols = [binance_symbol(i) for i in args.instruments]
+    if args.processes <= 1:
+        serve_metrics()
+        serve(symbols, args.intervals)
+        return
+
+    # Spawned rather than forked: the parent has already built sessions and pools.
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=serve, args=(symbols[i::args.processes], args.intervals, args.processes, i == 0),
+                        name=f"market-worker-{i}", daemon=True)
+        for i in range(args.processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# In-process instrumentation: latency summaries and counters keyed by name and
+# labels, plus stats() of the shared caches, exported as Prometheus text or
+# JSON. Recording is a dict lookup and a few additions under one lock.
+
+METRICS_PREFIX = "dashboard_"
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# When set, /metrics (Prometheus) and /metrics.json are served on this port.
+METRICS_PORT = os.environ.get("DASHBOARD_METRICS_PORT")
+# Interface the endpoint binds; loopback unless exposed on purpose.
+METRICS_HOST = os.environ.get("DASHBOARD_METRICS_HOST", "127.0.0.1")
+
+
+class _Timing:
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+
+class Metrics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings = {}
+        self._counters = {}
+        self._collectors = {}
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            timing = self._timings.get(key)
+            if timing is None:
+                timing = self._timings[key] = _Timing()
+            timing.count += 1
+            timing.total += seconds
+            if seconds > timing.max:
+                timing.max = seconds
+            timing.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    @contextmanager
+    def timed(self, name, **labels):
+        # Also usable as a decorator; each call is timed separately.
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def register_collector(self, name, stats):
+        # `stats` returns a flat dict of numbers, read at export time.
+        self._collectors[name] = stats
+
+    def snapshot(self):
+        with self._lock:
+            timings = [
+                {"name": name, "labels": dict(labels), "count": t.count,
+                 "sum": round(t.total, 6), "max": round(t.max, 6)}
+                for (name, labels), t in self._timings.items()
+            ]
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self._counters.items()
+            ]
+        collectors = {}
+        for name, stats in list(self._collectors.items()):
+            try:
+                collectors[name] = stats()
+            except Exception as e:
+                collectors[name] = {"error": str(e)}
+        return {"timings": timings, "counters": counters, "collectors": collectors}
+
+    def prometheus(self):
+        lines = []
+        with self._lock:
+            timings = [(name, labels, t.count, t.total, list(t.buckets)) for (name, labels), t in self._timings.items()]
+            counters = list(self._counters.items())
+        for name, labels, count, total, buckets in sorted(timings):
+            metric = METRICS_PREFIX + name
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                cumulative += n
+                lines.append(f"{metric}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(labels)} {total}")
+            lines.append(f"{metric}_count{_labels(labels)} {count}")
+        for (name, labels), value in sorted(counters):
+            lines.append(f"{METRICS_PREFIX}{name}_total{_labels(labels)} {value}")
+        for collector, stats in sorted(self.snapshot()["collectors"].items()):
+            for key, value in sorted(stats.items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"{METRICS_PREFIX}{collector}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+metrics = Metrics()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = metrics.prometheus().encode(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(metrics.snapshot()).encode(), "application/json"
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve_metrics(port=METRICS_PORT, host=METRICS_HOST):
+    # Starts the export endpoint once per process; a no-op without a port.
+    global _server
+    with _server_lock:
+        if _server is not None or not port:
+            return _server
+        _server = ThreadingHTTPServer((host, int(port)), _Handler)
+        threading.Thread(target=_server.serve_forever, daemon=True, name="metrics").start()
+        return _server
@@ -0,0 +1,57 @@
+import numpy as np
+
+from core import kernels
+
+# Candles the indicators are computed over, matching the chart's window.
+PAYLOAD_HISTORY = 300
+
+
+def r4(x):
+    return float(round(float(x), 4))
+
+
+def indicator_columns(high, low, close):
+    # The payload indicators for a whole window, from the array kernels.
+    adx, plus_di, minus_di = kernels.adx(high, low, close, 14)
+    _, _, macd_hist = kernels.macd(close)
+    return {
+        "EMA20": kernels.ema(close, 20),
+        "EMA50": kernels.ema(close, 50),
+        "EMA100": kernels.ema(close, 100),
+        "RSI14": kernels.rsi(close, 14),
+        "MACD_HIST": macd_hist,
+        "ADX14": adx,
+        "PLUS_DI14": plus_di,
+        "MINUS_DI14": minus_di,
+    }
+
+
+def build_technical_payload(instrument, close, columns, fng_value=None, fng_class=None):
+    # `close` and every column are ordered chronologically, live candle last.
+    close = np.asarray(close, dtype=np.float64)
+    last_close = close[-1]
+    ema20_last = columns['EMA20'][-1]
+    ema50_last = columns['EMA50'][-1]
+    ema100_last = columns['EMA100'][-1]
+    plus_di_last = columns['PLUS_DI14'][-1]
+    minus_di_last = columns['MINUS_DI14'][-1]
+
+    return {
+        "source": "binance",
+        "instrument": instrument,
+        "price_last_14": [r4(v) for v in close[-14:].tolist()],
+        "ema_20": r4(ema20_last),
+        "ema_50": r4(ema50_last),
+        "ema_100": r4(ema100_last),
+        "price_vs_ema20_percent": r4(((last_close - ema20_last) / ema20_last) * 100),
+        "price_vs_ema50_percent": r4(((last_close - ema50_last) / ema50_last) * 100),
+        "price_vs_ema100_percent": r4(((last_close - ema100_last) / ema100_last) * 100),
+        "rsi_14_last_7": [r4(v) for v in list(columns['RSI14'][-7:])],
+        "macd_histogram_12_26_9_last_7": [r4(v) for v in list(columns['MACD_HIST'][-7:])],
+        "adx_14": r4(columns['ADX14'][-1]),
+        "positive_di_14": r4(plus_di_last),
+        "negative_di_14": r4(minus_di_last),
+        "di_delta_14": r4(plus_di_last - minus_di_last),
+        "crypto_fng_value": fng_value,
+        "crypto_fng_class": fng_class
+    }
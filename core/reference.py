@@ -0,0 +1,57 @@
+import threading
+import time
+
+import numpy as np
+
+from core.cache import SingleFlight
+from core.klines import INTERVAL_MS, get_klines
+
+# Lookbacks, in daily candles, of the ticker's change metrics; the live
+# candle counts as the first (7 = Week to Date).
+REFERENCE_LOOKBACKS = (7, 30, 365)
+
+DAY_MS = INTERVAL_MS["1d"]
+
+
+def reference_closes(klines, day_start, lookbacks=REFERENCE_LOOKBACKS):
+    # {lookback: close of the daily candle opened lookback - 1 days before
+    # day_start}; the first candle's close when the series starts later,
+    # None when there are no candles.
+    if not len(klines):
+        return {days: None for days in lookbacks}
+    open_time = klines['open_time']
+    closes = {}
+    for days in lookbacks:
+        i = int(np.searchsorted(open_time, day_start - (days - 1) * DAY_MS, "left"))
+        closes[days] = float(klines['close'][min(i, len(klines) - 1)])
+    return closes
+
+
+class ReferencePrices:
+    # Historical closes per symbol for the change metrics. They cannot change
+    # during a UTC day, so each symbol's are read once a day from the shared
+    # daily kline series (the one the chart's 1d view also reads).
+
+    def __init__(self, lookbacks=REFERENCE_LOOKBACKS):
+        self.lookbacks = lookbacks
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._entries = {}
+
+    def get(self, symbol):
+        day_start = int(time.time() * 1000) // DAY_MS * DAY_MS
+        with self._lock:
+            entry = self._entries.get(symbol)
+        if entry is not None and entry[0] == day_start:
+            return entry[1]
+        return self._flight.do((symbol, day_start), lambda: self._compute(symbol, day_start))
+
+    def _compute(self, symbol, day_start):
+        klines = get_klines(symbol, "1d", max(self.lookbacks) + 1)
+        closes = reference_closes(klines, day_start, self.lookbacks)
+        with self._lock:
+            self._entries[symbol] = (day_start, closes)
+        return closes
+
+
+reference_prices = ReferencePrices()
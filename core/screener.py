@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from core.cache import SingleFlight, TTLCache
+from core.klines import get_klines
+from core.payload import PAYLOAD_HISTORY, build_technical_payload, indicator_columns
+
+SCREENER_INTERVAL = "1d"
+SCREENER_WORKERS = 8
+SCREENER_TTL = 30
+
+# One bounded pool for the whole process, so concurrent screener sessions
+# cannot multiply the number of in-flight upstream requests.
+_pool = ThreadPoolExecutor(max_workers=SCREENER_WORKERS, thread_name_prefix="screener")
+_results = TTLCache(max_entries=16)
+_flight = SingleFlight()
+
+
+def binance_symbol(instrument):
+    return instrument.replace('-USD', 'USDT')
+
+
+def scan_instrument(instrument, interval=SCREENER_INTERVAL, fng_value=None, fng_class=None):
+    klines = get_klines(binance_symbol(instrument), interval, PAYLOAD_HISTORY)
+    high, low, close = klines['high'], klines['low'], klines['close']
+    columns = indicator_columns(high, low, close)
+    return build_technical_payload(instrument, close, columns, fng_value, fng_class)
+
+
+def _scan(instrument, interval, fng_value, fng_class):
+    try:
+        return scan_instrument(instrument, interval, fng_value, fng_class)
+    except Exception as e:
+        return {"instrument": instrument, "error": str(e)}
+
+
+def screen(instruments, interval=SCREENER_INTERVAL, fng_value=None, fng_class=None):
+    # Technical payloads for every instrument, fetched concurrently. A failed
+    # instrument yields {"instrument", "error"} instead of failing the scan.
+    key = (tuple(instruments), interval, fng_value, fng_class)
+    payloads = _results.get(key)
+    if payloads is not None:
+        return payloads
+
+    def run():
+        futures = [_pool.submit(_scan, i, interval, fng_value, fng_class) for i in instruments]
+        payloads = [f.result() for f in futures]
+        _results.set(key, payloads, SCREENER_TTL)
+        return payloads
+
+    return _flight.do(key, run)
+
+
+def screener_rows(payloads):
+    rows = []
+    for p in payloads:
+        if "error" in p:
+            rows.append({"Instrument": p["instrument"], "Error": p["error"]})
+            continue
+        rows.append({
+            "Instrument": p["instrument"],
+            "Price": p["price_last_14"][-1],
+            "RSI(14)": p["rsi_14_last_7"][-1],
+            "MACD Hist": p["macd_histogram_12_26_9_last_7"][-1],
+            "ADX(14)": p["adx_14"],
+            "+DI(14)": p["positive_di_14"],
+            "-DI(14)": p["negative_di_14"],
+            "DI Delta": p["di_delta_14"],
+            "vs EMA20 %": p["price_vs_ema20_percent"],
+            "vs EMA50 %": p["price_vs_ema50_percent"],
+            "vs EMA100 %": p["price_vs_ema100_percent"],
+        })
+    return rows
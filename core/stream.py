@@ -0,0 +1,168 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+from core.klines import decode_klines, kline_store
+
+BINANCE_WS_URL = os.environ.get("BINANCE_WS_URL", "wss://data-stream.binance.vision/stream")
+
+# Data older than this is treated as missing and callers fall back to REST.
+STREAM_STALE = 15
+# Streams nobody asked for within this many seconds are unsubscribed.
+STREAM_IDLE = 60
+# How often subscriptions are reconciled when nothing else wakes the loop.
+STREAM_SYNC = 5
+STREAM_MAX_BACKOFF = 30
+
+
+def ticker_from_event(data):
+    # 24hrTicker event -> the fields of /api/v3/ticker/24hr we use.
+    return {
+        "symbol": data["s"],
+        "lastPrice": data["c"],
+        "priceChangePercent": data["P"],
+        "highPrice": data["h"],
+        "lowPrice": data["l"],
+        "closeTime": data["C"],
+    }
+
+
+def kline_from_event(k):
+    # kline event payload -> a /api/v3/klines row.
+    return [k["t"], k["o"], k["h"], k["l"], k["c"], k["v"], k["T"], k["q"], k["n"], k["V"], k["Q"], "0"]
+
+
+class MarketStream:
+    # One WebSocket connection per process, shared by every session. Sessions
+    # declare what they are viewing with `subscribe`; the consumer thread
+    # keeps the combined stream's subscriptions in line with that, stores the
+    # latest ticker per symbol and pushes kline updates into the kline store.
+
+    def __init__(self, url=BINANCE_WS_URL):
+        self.url = url
+        self.connected = False
+        self._lock = threading.Lock()
+        self._wanted = {}
+        self._tickers = {}
+        self._thread = None
+        self._loop = None
+        self._changed = None
+        self._next_id = 1
+
+    @property
+    def available(self):
+        return websockets is not None
+
+    def subscribe(self, symbol, intervals=()):
+        if websockets is None:
+            return False
+        symbol = symbol.lower()
+        names = [f"{symbol}@ticker"] + [f"{symbol}@kline_{i}" for i in intervals]
+        now = time.monotonic()
+        with self._lock:
+            added = any(name not in self._wanted for name in names)
+            for name in names:
+                self._wanted[name] = now
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run_forever, name="market-stream", daemon=True)
+                self._thread.start()
+        if added:
+            self._wake()
+        return True
+
+    def ticker(self, symbol):
+        # Latest 24h ticker for `symbol`, or None when it is not fresh.
+        entry = self._tickers.get(symbol)
+        if not self.connected or entry is None or time.monotonic() - entry[1] > STREAM_STALE:
+            return None
+        return entry[0]
+
+    def _wake(self):
+        loop = self._loop
+        if loop is not None and self._changed is not None:
+            loop.call_soon_threadsafe(self._changed.set)
+
+    def _streams(self):
+        cutoff = time.monotonic() - STREAM_IDLE
+        with self._lock:
+            for name, seen in list(self._wanted.items()):
+                if seen < cutoff:
+                    del self._wanted[name]
+            return sorted(self._wanted)
+
+    def _run_forever(self):
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._run())
+
+    async def _run(self):
+        self._changed = asyncio.Event()
+        backoff = 1
+        while True:
+            streams = self._streams()
+            if not streams:
+                await self._wait_changed(STREAM_SYNC)
+                continue
+            try:
+                async with websockets.connect(f"{self.url}?streams={'/'.join(streams)}") as ws:
+                    self.connected = True
+                    backoff = 1
+                    await self._serve(ws, set(streams))
+            except Exception:
+                pass
+            finally:
+                self.connected = False
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, STREAM_MAX_BACKOFF)
+
+    async def _wait_changed(self, timeout):
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._changed.clear()
+
+    async def _serve(self, ws, active):
+        reader = asyncio.ensure_future(self._read(ws))
+        try:
+            while True:
+                waiter = asyncio.ensure_future(self._wait_changed(STREAM_SYNC))
+                await asyncio.wait([reader, waiter], return_when=asyncio.FIRST_COMPLETED)
+                if reader.done():
+                    waiter.cancel()
+                    return reader.result()
+                streams = set(self._streams())
+                if not streams:
+                    return
+                await self._send(ws, "SUBSCRIBE", streams - active)
+                await self._send(ws, "UNSUBSCRIBE", active - streams)
+                active = streams
+        finally:
+            reader.cancel()
+
+    async def _send(self, ws, method, streams):
+        if streams:
+            await ws.send(json.dumps({"method": method, "params": sorted(streams), "id": self._next_id}))
+            self._next_id += 1
+
+    async def _read(self, ws):
+        async for message in ws:
+            self._handle(json.loads(message))
+
+    def _handle(self, message):
+        data = message.get("data", message)
+        event = data.get("e") if isinstance(data, dict) else None
+        if event == "24hrTicker":
+            self._tickers[data["s"]] = (ticker_from_event(data), time.monotonic())
+        elif event == "kline":
+            k = data["k"]
+            kline_store.apply(data["s"], k["i"], decode_klines([kline_from_event(k)]))
+
+
+market_stream = MarketStream()
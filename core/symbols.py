@@ -0,0 +1,10 @@
+# Instruments offered by the dashboard and processed by the batch jobs.
+CRYPTO_OPTIONS = ["BTC-USD", "ETH-USD", 'XRP-USD', 
+                  "BNB-USD", "SOL-USD", "TRX-USD", 
+                  "DOGE-USD", "ADA-USD", "BCH-USD", 
+                  "SUI-USD", "LINK-USD", "LTC-USD", 
+                  "MATIC-USD", "DOT-USD", "AVAX-USD", 
+                  "XLM-USD", "ETC-USD", "FIL-USD", 
+                  "VET-USD", "ICP-USD", "ALGO-USD", 
+                  "AAVE-USD", "UNI-USD", "XMR-USD",
+                  "POL-USD"]
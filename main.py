@@ -1,75 +1,33 @@
-import json
 import streamlit as st
 import pandas as pd
-import requests
-import plotly.graph_objects as go
-from datetime import datetime
-from plotly.subplots import make_subplots
+from datetime import datetime, timezone
+from core.ai_batch import daily_insight
+from core.ai_jobs import ai_jobs
+from core.archive import kline_archive
+from core.ath import ath_index
+from core.binance import fetch_ticker_24hr
+from core.downsample import downsample_candles, downsample_line
+from core.figure import ChartTemplates
+from core.fng import fng_service
+from core.http import fetch_pool
+from core.indicator_engine import COLUMNS as INDICATOR_COLUMNS, get_indicator_engine
+from core.klines import get_klines, kline_frame
+from core.market_data import market_data
+from core.metrics import metrics, serve_metrics
+from core.payload import PAYLOAD_HISTORY, build_technical_payload
+from core.reference import reference_prices
+from core.screener import screen, screener_rows
+from core.stream import market_stream
+from core.symbols import CRYPTO_OPTIONS
 
 st.set_page_config(layout="wide")
 
 # Binance Public API is used; no API key required.
 TICKER_DURATION = 10
-
-def r4(x):
-    return float(round(float(x), 4))
-
-
-def calculate_rsi(series, period=14):
-    delta = series.diff()
-
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-
-    avg_gain = gain.ewm(alpha=1/period, adjust=False).mean()
-    avg_loss = loss.ewm(alpha=1/period, adjust=False).mean()
-
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-
-    return rsi
-
-
-def calculate_macd(series, fast=12, slow=26, signal=9):
-    ema_fast = series.ewm(span=fast, adjust=False).mean()
-    ema_slow = series.ewm(span=slow, adjust=False).mean()
-
-    macd_line = ema_fast - ema_slow
-    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-
-    macd_histogram = macd_line - signal_line
-
-    return macd_line, signal_line, macd_histogram
-
-
-def calculate_adx(high, low, close, period=14):
-
-    up_move = high.diff()
-    down_move = -low.diff()
-
-    plus_dm = pd.Series(0.0, index=high.index)
-    minus_dm = pd.Series(0.0, index=high.index)
-
-    plus_dm[(up_move > down_move) & (up_move > 0)] = up_move
-    minus_dm[(down_move > up_move) & (down_move > 0)] = down_move
-
-    tr1 = high - low
-    tr2 = (high - close.shift()).abs()
-    tr3 = (low - close.shift()).abs()
-
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-
-    atr = tr.ewm(alpha=1/period, adjust=False).mean()
-
-    plus_di = 100 * (plus_dm.ewm(alpha=1/period, adjust=False).mean() / atr)
-    minus_di = 100 * (minus_dm.ewm(alpha=1/period, adjust=False).mean() / atr)
-
-    dx = (abs(plus_di - minus_di) / (plus_di + minus_di)) * 100
-    adx = dx.ewm(alpha=1/period, adjust=False).mean()
-
-    return adx, plus_di, minus_di
-
-
+# Most points a chart trace is drawn with; longer ranges are downsampled.
+CHART_POINT_BUDGET = 500
+# Seconds between checks on a running AI insight job.
+AI_POLL_INTERVAL = 1
 
 def number_format(value):
     if value >= 1:
@@ -97,119 +55,9 @@ def enforce_indicator_rules():
         st.session_state["indicator_widget"] = indicators
 
 
-SYSTEM_PROMPT = """
-You are a professional crypto technical analyst.
-
-STRICT RULES:
-- Analyze ONLY provided data
-- Do NOT assume external market context
-- Be consistent and deterministic in reasoning.
-"""
-
-
-def build_user_prompt(payload):
-    return f"""
-You are analyzing crypto technical indicators on the DAILY timeframe.
-
-OUTPUT RULES:
-- buy_confidence + hold_confidence + sell_confidence MUST sum to 1.0
-- Higher value = stronger directional bias.
-
-DATA STRUCTURE:
-- Any field ending with `_last_N` is a LIST ordered chronologically.
-- The FIRST element is the OLDEST value.
-- The LAST element is the MOST RECENT value.
-
-PAYLOAD FIELD DESCRIPTIONS:
-- price_last_14: Closing prices of the last 14 daily candles ordered chronologically.
-- ema_20: Latest EMA(20) value representing short-term trend baseline.
-- ema_50: Latest EMA(50) value representing mid-term trend baseline.
-- ema_100: Latest EMA(100) value representing long-term trend baseline.
-- price_vs_ema20_percent: Percentage distance between latest price and EMA(20); positive means price above trend.
-- price_vs_ema50_percent: Percentage distance between latest price and EMA(50); positive means price above trend.
-- price_vs_ema100_percent: Percentage distance between latest price and EMA(100); positive means price above trend.
-- rsi_14_last_7: RSI(14) values from the last 7 candles showing momentum progression.
-- macd_histogram_12_26_9_last_7: MACD histogram values showing recent momentum acceleration or deceleration.
-- adx_14: ADX(14) value indicating current trend strength regardless of direction.
-- positive_di_14: Positive directional index measuring bullish directional pressure.
-- negative_di_14: Negative directional index measuring bearish directional pressure.
-- di_delta_14: Difference between positive_di_14 and negative_di_14 indicating directional dominance.
-- crypto_fng_value: Current Fear & Greed Index numerical sentiment value.
-- crypto_fng_class: Text classification of Fear & Greed sentiment state.
-
-CONTEXT:
-- Indicators derived from daily candles.
-- Latest candle contains live market tick update.
-- Use ONLY provided values.
-
-TECHNICAL PAYLOAD:
-{payload}
-"""
-
-
-
-
-def get_ai_insight():
-    url = "https://openrouter.ai/api/v1/chat/completions"
-
-    headers = {
-        "Authorization": f"Bearer {st.secrets['OPENROUTER_API_KEY']}",
-        "Content-Type": "application/json"
-    }
-
-    body = {
-        "model": "google/gemini-3-flash-preview",
-        "messages": [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": build_user_prompt(st.session_state["technical_payload"])}
-        ],
-        "response_format": {
-            "type": "json_schema",
-            "json_schema": {
-                "name": "crypto_analysis",
-                "strict": True,
-                "schema": {
-                    "type": "object",
-                    "properties": {
-                        "buy_confidence": {
-                            "type": "number",
-                            "minimum": 0,
-                            "maximum": 1,
-                            "description": "Probability score favoring a buy decision."
-                        },
-                        "hold_confidence": {
-                            "type": "number",
-                            "minimum": 0,
-                            "maximum": 1,
-                            "description": "Probability score favoring a hold decision."
-                        },
-                        "sell_confidence": {
-                            "type": "number",
-                            "minimum": 0,
-                            "maximum": 1,
-                            "description": "Probability score favoring a sell decision."
-                        },
-                        "reasoning": {
-                            "type": "string",
-                            "description": "Brief technical explanation supporting the dominant decision. Keep it concise and signal-focused."
-                        }
-                    },
-                    "required": ["buy_confidence","hold_confidence","sell_confidence","reasoning"],
-                    "additionalProperties": False
-                }
-            }
-        }
-    }
-
-    res = requests.post(url, headers=headers, json=body)
-    return res.json()
-
-
-
-
 # ===== FETCHING CRYPTO DATA =====
-if "ai_loading" not in st.session_state:
-    st.session_state.ai_loading = False
+if "ai_job" not in st.session_state:
+    st.session_state.ai_job = None
 if "ai_result" not in st.session_state:
     st.session_state.ai_result = None
 if "show_ai_result" not in st.session_state:
@@ -234,20 +82,16 @@ if 'ticker_ath_ts' not in st.session_state:
     st.session_state['ticker_ath_ts'] = "ath timestamp"
 if "indicator_widget" not in st.session_state:
     st.session_state["indicator_widget"] = ["VOL"]
+if "show_screener" not in st.session_state:
+    st.session_state["show_screener"] = False
+if "live_mode" not in st.session_state:
+    st.session_state["live_mode"] = False
 
 st.sidebar.title("⚙️ Configurations")
 
-crypto_options = ["BTC-USD", "ETH-USD", 'XRP-USD', 
-                  "BNB-USD", "SOL-USD", "TRX-USD", 
-                  "DOGE-USD", "ADA-USD", "BCH-USD", 
-                  "SUI-USD", "LINK-USD", "LTC-USD", 
-                  "MATIC-USD", "DOT-USD", "AVAX-USD", 
-                  "XLM-USD", "ETC-USD", "FIL-USD", 
-                  "VET-USD", "ICP-USD", "ALGO-USD", 
-                  "AAVE-USD", "UNI-USD", "XMR-USD",
-                  "POL-USD"]
+crypto_options = CRYPTO_OPTIONS
 interval_options = ["Days", "Hours", "Minutes"]
-range_options = [15, 30, 60, 90, 180]
+range_options = [15, 30, 60, 90, 180, 365, 730]
 indicator_options = ["VOL", "MA", "EMA"]
 chart_options = ["Candlestick", "Line", 'OHLC']
 volume_options = ["Volume"]
@@ -272,6 +116,9 @@ with col5:
         on_change=enforce_indicator_rules
 )
 
+st.sidebar.toggle("🔎 Screener", key="show_screener")
+st.sidebar.toggle("⚡ Live Prices", key="live_mode")
+
 st.session_state["selected_indicator"] = list(st.session_state["indicator_widget"])
 
 st.session_state['crypto_symbol'] = st.session_state['selected_crypto'].split('-')[0]
@@ -279,17 +126,42 @@ st.session_state['crypto_symbol'] = st.session_state['selected_crypto'].split('-
 if st.session_state.get("_last_crypto") != st.session_state['selected_crypto']:
     st.session_state.show_ai_result = False
     st.session_state.ai_result = None
+    if st.session_state.ai_job:
+        ai_jobs.cancel(st.session_state.ai_job)
+        st.session_state.ai_job = None
 
 st.session_state["_last_crypto"] = st.session_state['selected_crypto']
 
+# In live mode the ticker and chart fragments rerun on a timer and read the
+# WebSocket stream, falling back to REST whenever it has nothing fresh.
+live_refresh = TICKER_DURATION if st.session_state["live_mode"] else None
 
-@st.fragment()
+
+@st.fragment(run_every=live_refresh)
+@metrics.timed("fragment_seconds", fragment="ticker_component")
 def ticker_component():
     symbol = st.session_state['selected_crypto'].replace('-USD', 'USDT')
-    
-    ticker_url = f"https://data-api.binance.vision/api/v3/ticker/24hr?symbol={symbol}"
+
+    # Published by the market-data worker when one is running.
+    ticker_data = market_data.ticker(symbol)
+    published_ath = market_data.ath(symbol)
+    references = market_data.references(symbol)
+    if ticker_data is None and st.session_state["live_mode"] and market_stream.subscribe(symbol, ["1d"]):
+        ticker_data = market_stream.ticker(symbol)
+
+    # The requests are independent; start them together and draw each
+    # metric as soon as its data is in.
+    if ticker_data is None:
+        ticker_future = fetch_pool.submit(fetch_ticker_24hr, symbol)
+    if published_ath is None:
+        ath_future = fetch_pool.submit(ath_index.get, symbol)
+    # Closes 7/30/365 days back; fetched once per UTC day per symbol.
+    if references is None:
+        references_future = fetch_pool.submit(reference_prices.get, symbol)
+
     try:
-        ticker_data = requests.get(ticker_url).json()
+        if ticker_data is None:
+            ticker_data = ticker_future.result()
         if 'lastPrice' not in ticker_data:
             st.error(f"Failed to fetch data for {symbol}. API response: {ticker_data.get('msg', 'Unknown error')}")
             return
@@ -301,71 +173,71 @@ def ticker_component():
     day_change = float(ticker_data['priceChangePercent'])
     day_high_val = float(ticker_data['highPrice'])
     day_low_val = float(ticker_data['lowPrice'])
-    
-    m_klines_url = f"https://data-api.binance.vision/api/v3/klines?symbol={symbol}&interval=1M&limit=1000"
-    m_klines = requests.get(m_klines_url).json()
-    
-    ticker_ath = 0
-    ticker_ath_ts = 0
-    for k in m_klines:
-        high = float(k[2])
-        if high > ticker_ath:
-            ticker_ath = high
-            ticker_ath_ts = int(k[0]) / 1000.0
-            
-    from_ath_change = ((ticker_value - ticker_ath) / ticker_ath) * 100 if ticker_ath > 0 else 0
-    
-    d_klines_url = f"https://data-api.binance.vision/api/v3/klines?symbol={symbol}&interval=1d&limit=366"
-    d_klines = requests.get(d_klines_url).json()
-    
-    def get_change(klines, days_ago):
-        if len(klines) >= days_ago:
-            old_price = float(klines[-days_ago][4])
-            return ((ticker_value - old_price) / old_price) * 100 if old_price > 0 else 0
-        elif len(klines) > 0:
-            old_price = float(klines[0][4])
-            return ((ticker_value - old_price) / old_price) * 100 if old_price > 0 else 0
-        return 0
-        
-    week_change = get_change(d_klines, 7)
-    month_change = get_change(d_klines, 30)
-    year_change = get_change(d_klines, 365)
 
     st.session_state['ticker_close'] = ticker_value
 
     ticker_value_str = number_format(ticker_value)
-    
     day_change_str = f"{day_change:.2f}%"
-    week_change_str = f"{week_change:.2f}%"
-    month_change_str = f"{month_change:.2f}%"
-    year_change_str = f"{year_change:.2f}%"
-    from_ath_change_str = f"{from_ath_change:.2f}%"
-    
     day_high_str = f'${number_format(day_high_val)}'
     day_low_str = f'${number_format(day_low_val)}'
-    ticker_ath_str = number_format(ticker_ath)
-    
-    ticker_ath_ts_dt = datetime.fromtimestamp(ticker_ath_ts) if ticker_ath_ts > 0 else datetime.now()
-    ticker_ath_ts_str = ticker_ath_ts_dt.strftime('%d %b %Y')
 
     col1, col2, col3 = st.columns(3, vertical_alignment='top')
+    col4, col5, col6, col7 = st.columns(4)
     with col1:
         st.metric(label=st.session_state['crypto_symbol'], value=f"${ticker_value_str}", delta=f"{day_change_str} (Today)")
-    with col2:
-        st.metric(label=f"ATH ({ticker_ath_ts_str})", value=f'${ticker_ath_str}')
     with col3:
         st.markdown(f'''H: :green-background[{day_high_str}]''')
         st.markdown(f'''L: :red-background[{day_low_str}]''')
 
-    col4, col5, col6, col7 = st.columns(4)
-    with col4:
-        st.metric(label="Week to Date", value="", delta=week_change_str)
-    with col5:
-        st.metric(label="Month to Date", value="", delta=month_change_str)
-    with col6:
-        st.metric(label="Year to Date", value="", delta=year_change_str)
-    with col7:
-        st.metric(label="Since ATH", value="", delta=from_ath_change_str)
+    # Only scans the monthly klines while the symbol's index entry is cold.
+    # A failed scan leaves the ATH metrics at "n/a" rather than the ticker.
+    try:
+        if published_ath is None:
+            ath_future.result()
+            ticker_ath, ticker_ath_ts = ath_index.observe(symbol, day_high_val)
+        elif day_high_val > published_ath[0]:
+            ticker_ath, ticker_ath_ts = day_high_val, datetime.now().timestamp()
+        else:
+            ticker_ath, ticker_ath_ts = published_ath
+    except Exception:
+        ticker_ath = None
+
+    if ticker_ath is None:
+        with col2:
+            st.metric(label="ATH", value="n/a")
+        with col7:
+            st.metric(label="Since ATH", value="n/a")
+    else:
+        from_ath_change = ((ticker_value - ticker_ath) / ticker_ath) * 100 if ticker_ath > 0 else 0
+        from_ath_change_str = f"{from_ath_change:.2f}%"
+        ticker_ath_str = number_format(ticker_ath)
+        ticker_ath_ts_dt = datetime.fromtimestamp(ticker_ath_ts) if ticker_ath_ts > 0 else datetime.now()
+        ticker_ath_ts_str = ticker_ath_ts_dt.strftime('%d %b %Y')
+
+        with col2:
+            st.metric(label=f"ATH ({ticker_ath_ts_str})", value=f'${ticker_ath_str}')
+        with col7:
+            st.metric(label="Since ATH", value="", delta=from_ath_change_str)
+
+    # A failed daily-klines fetch leaves the change metrics at "n/a".
+    if references is None:
+        try:
+            references = references_future.result()
+        except Exception:
+            references = None
+
+    def get_change(references, days_ago):
+        old_price = references[days_ago]
+        if old_price is not None:
+            return ((ticker_value - old_price) / old_price) * 100 if old_price > 0 else 0
+        return 0
+
+    for col, label, days_ago in ((col4, "Week to Date", 7), (col5, "Month to Date", 30), (col6, "Year to Date", 365)):
+        with col:
+            if references is None:
+                st.metric(label=label, value="n/a")
+            else:
+                st.metric(label=label, value="", delta=f"{get_change(references, days_ago):.2f}%")
 
 ticker_component()
 # === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === ===
@@ -373,31 +245,24 @@ ticker_component()
 
 
 # ===== FEAR & GREED INDEX =====
+def fng_latest():
+    # (value, classification), from the market-data worker when it publishes.
+    entries = market_data.fng()
+    return entries[-1][1:] if entries else fng_service.latest()
+
+
 with st.sidebar:
     @st.fragment()
+    @metrics.timed("fragment_seconds", fragment="fng_index")
     def fng_index():
+        import plotly.graph_objects as go
+
         st.divider()        
-        fng_url = "https://api.alternative.me/fng/?limit=30&format=json"
-        fng_response = requests.get(fng_url)
-        fng_data = fng_response.json()['data']
-
-        df_fng = pd.DataFrame(fng_data)
-        df_fng.rename(
-            columns={
-                'value': 'FNG_VALUE',
-                'value_classification': 'FNG_CLASS'
-            }, 
-            inplace=True)
-        df_fng['FNG_VALUE'] = pd.to_numeric(df_fng['FNG_VALUE'])
-        df_fng['UTCTIME'] = pd.to_datetime(df_fng['timestamp'].astype(int), unit='s')
-        df_fng = df_fng.sort_values(by='UTCTIME').reset_index(drop=True)
-
-        latest_fng = df_fng.iloc[-1]
-        yesterday_fng = int(df_fng.iloc[-2]['FNG_VALUE'])
-        fng_value =  latest_fng['FNG_VALUE']
-        fng_class =  latest_fng['FNG_CLASS']
-        st.session_state["crypto_fng_value"] = int(fng_value)
-        st.session_state["crypto_fng_class"] = fng_class
+        fng_entries = market_data.fng() or fng_service.series(30)
+        fng_times = pd.to_datetime([e[0] for e in fng_entries], unit='s')
+        fng_values = [e[1] for e in fng_entries]
+
+        fng_value, fng_class = fng_entries[-1][1:]
         title_badge = ':green-badge[68 - GREED]'
         title_icon = f"😱"
         if fng_class == "Extreme Fear":
@@ -418,10 +283,6 @@ with st.sidebar:
 
         st.title(f"{title_icon} Crypto Fear & Greed Index {title_badge}")
 
-        df_fng_chart = df_fng.tail(30)
-        df_fng_chart = df_fng_chart.set_index('UTCTIME')
-        fng_line_data = df_fng_chart[['FNG_VALUE']]
-
         def get_color(val):
             if val <= 20:
                 return '#B22222'
@@ -433,15 +294,14 @@ with st.sidebar:
                 return '#81C784'
             else:
                 return '#388E3C'
-        df_fng_chart['color'] = df_fng_chart['FNG_VALUE'].apply(get_color)
         fig = go.Figure(
             data=[
                 go.Scatter(
-                    x=df_fng_chart.index,
-                    y=df_fng_chart['FNG_VALUE'],
+                    x=fng_times,
+                    y=fng_values,
                     mode='lines+markers',
                     line=dict(color='gray', width=1.5, shape='spline'),
-                    marker=dict(color=df_fng_chart['color'], size=4),
+                    marker=dict(color=[get_color(v) for v in fng_values], size=4),
                     opacity=0.9,
                     name='FNG Index'
                 ),
@@ -476,27 +336,32 @@ with st.sidebar:
     telegram_bot()
 
 # ===== CRYPTO CHART =====
-@st.fragment()
+@st.fragment(run_every=live_refresh)
+@metrics.timed("fragment_seconds", fragment="chart_component")
 def chart_component():
     interval_map = {"Days": "1d", "Hours": "1h", "Minutes": "1m"}
     b_interval = interval_map.get(st.session_state['selected_interval'], "1d")
     symbol = st.session_state['selected_crypto'].replace('-USD', 'USDT')
+    show_range = st.session_state['selected_range']
 
-    response = requests.get(
-        f'https://data-api.binance.vision/api/v3/klines',
-        params={
-            "symbol": symbol,
-            "interval": b_interval,
-            "limit": 300
-        }
-    )
-    data = response.json()
-    df = pd.DataFrame(data, columns=['TIMESTAMP', 'OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME', 'CLOSE_TIME', 'QUOTE_VOL', 'TRADES', 'TB_BASE_VOL', 'TB_QUOTE_VOL', 'IGNORE'])
-    
-    for col in ['OPEN', 'HIGH', 'LOW', 'CLOSE', 'VOLUME']:
-        df[col] = df[col].astype(float)
-        
-    df['TIMESTAMP'] = df['TIMESTAMP'].astype(float) / 1000.0
+    # With a market-data worker running, its published window already holds
+    # the klines and indicator columns; ranges beyond it are built here.
+    published = market_data.series(symbol, b_interval)
+    if published is not None and show_range > len(published):
+        published = None
+    if published is None and st.session_state["live_mode"]:
+        market_stream.subscribe(symbol, [b_interval])
+
+    klines = published if published is not None else get_klines(symbol, b_interval, PAYLOAD_HISTORY)
+    df = kline_frame(klines)
+
+    # Ranges longer than the fetched window are completed from the on-disk
+    # archive; until it reaches the first fetched candle, only the missing
+    # span is fetched and the archive is backfilled in the background.
+    if show_range > len(df) and len(df) > 0:
+        first_open = int(klines['open_time'][0])
+        df_history = kline_frame(kline_archive.history(symbol, b_interval, first_open, show_range - len(df)))
+        df = pd.concat([df_history, df], ignore_index=True)
 
     df.loc[df.index[-1], 'CLOSE'] = st.session_state['ticker_close']
     if df['HIGH'].iloc[-1] < st.session_state['ticker_close']:
@@ -504,52 +369,36 @@ def chart_component():
     if df['LOW'].iloc[-1] > st.session_state['ticker_close']:
         df.loc[df.index[-1], 'LOW'] = st.session_state['ticker_close']
 
-    df['UTCTIME'] = pd.to_datetime(df['TIMESTAMP'].astype(int), unit='s')
-    df['MA7'] = df['CLOSE'].rolling(window=7).mean()
-    df['MA50'] = df['CLOSE'].rolling(window=50).mean()
-    df['MA100'] = df['CLOSE'].rolling(window=100).mean()
-    df['EMA7'] = df['CLOSE'].ewm(span=7, adjust=False).mean()
-    df['EMA20'] = df['CLOSE'].ewm(span=20, adjust=False).mean()
-    df['EMA50'] = df['CLOSE'].ewm(span=50, adjust=False).mean()
-    df['EMA100'] = df['CLOSE'].ewm(span=100, adjust=False).mean()
-    df['RSI14'] = calculate_rsi(df['CLOSE'], 14)
-    df['MACD'], df['MACD_SIGNAL'], df['MACD_HIST'] = calculate_macd(df['CLOSE'])
-    df['ADX14'], df['PLUS_DI14'], df['MINUS_DI14'] = calculate_adx(df['HIGH'], df['LOW'], df['CLOSE'], 14)
-
+    # MA/EMA/RSI/MACD/ADX columns; closed candles are computed once per
+    # process, only the live candle is re-evaluated here. Published columns
+    # are used as they are, computed on the worker's latest live candle.
+    with metrics.timed("stage_seconds", stage="indicators"):
+        if published is not None:
+            indicators = {name: published[name] for name in INDICATOR_COLUMNS}
+        else:
+            engine = get_indicator_engine(symbol, b_interval, max(len(df), PAYLOAD_HISTORY))
+            indicators = engine.update(df['TIMESTAMP'], df['HIGH'], df['LOW'], df['CLOSE'])
+        for name, values in indicators.items():
+            df[name] = values
 
+        # The AI payload always reads the indicators over the last PAYLOAD_HISTORY candles.
+        if len(df) > PAYLOAD_HISTORY:
+            df_payload = df.tail(PAYLOAD_HISTORY)
+            engine = get_indicator_engine(symbol, b_interval)
+            indicators = engine.update(df_payload['TIMESTAMP'], df_payload['HIGH'], df_payload['LOW'], df_payload['CLOSE'])
 
 
-    show_range = st.session_state['selected_range']
     df_show = df.tail(show_range)
-    df_show['VOLUME_COLOR'] = df_show.apply(
-        lambda row: 'green' if row['CLOSE'] > row['OPEN'] else 'red', axis=1
-    )
+    # Long ranges are re-bucketed to CHART_POINT_BUDGET candles for plotting;
+    # line traces are reduced with LTTB.
+    df_candles = downsample_candles(df_show, CHART_POINT_BUDGET)
     
-    last_close = df['CLOSE'].iloc[-1]
-    ema20_last = df['EMA20'].iloc[-1]
-    ema50_last = df['EMA50'].iloc[-1]
-    ema100_last = df['EMA100'].iloc[-1]
-
-    technical_payload = {
-        "source": "binance", 
-        "instrument": st.session_state['selected_crypto'],
-        "price_last_14": [r4(v) for v in df['CLOSE'].tail(14).tolist()],
-        "ema_20": r4(ema20_last),
-        "ema_50": r4(ema50_last),
-        "ema_100": r4(ema100_last),
-        "price_vs_ema20_percent": r4(((last_close - ema20_last) / ema20_last) * 100),
-        "price_vs_ema50_percent": r4(((last_close - ema50_last) / ema50_last) * 100),
-        "price_vs_ema100_percent": r4(((last_close - ema100_last) / ema100_last) * 100),
-        "rsi_14_last_7": [r4(v) for v in df['RSI14'].tail(7).tolist()],
-        "macd_histogram_12_26_9_last_7": [r4(v) for v in df['MACD_HIST'].tail(7).tolist()],
-        "adx_14": r4(df['ADX14'].iloc[-1]),
-        "positive_di_14": r4(df['PLUS_DI14'].iloc[-1]),
-        "negative_di_14": r4(df['MINUS_DI14'].iloc[-1]),
-        "di_delta_14": r4(df['PLUS_DI14'].iloc[-1] - df['MINUS_DI14'].iloc[-1]),
-        "crypto_fng_value": st.session_state.get("crypto_fng_value"),
-        "crypto_fng_class": st.session_state.get("crypto_fng_class")
-    }
-
+    technical_payload = build_technical_payload(
+        st.session_state['selected_crypto'],
+        df['CLOSE'].to_numpy(),
+        indicators,
+        *fng_latest()
+    )
 
     st.session_state["technical_payload"] = technical_payload
 
@@ -568,174 +417,45 @@ def chart_component():
     ema100 = df_show['EMA100'].iloc[-1]
     ema100 = number_format(ema100)
 
-    if 'VOL'in st.session_state['selected_indicator']:
-        fig = make_subplots(
-            rows=2, cols=1,
-            shared_xaxes=True,
-            vertical_spacing=0.00,
-            row_heights=[0.85, 0.15],
-            subplot_titles=(f"", '')
-        )
-    else:
-        fig = make_subplots(
-            rows=1, cols=1,
-            shared_xaxes=True,
-            subplot_titles=(f"", '')
-        )
-
-    if st.session_state['selected_chart'] == "Candlestick":
-        fig.add_trace(
-            go.Candlestick(
-                x=df_show['UTCTIME'],
-                open=df_show['OPEN'],
-                high=df_show['HIGH'],
-                low=df_show['LOW'],
-                close=df_show['CLOSE'],
-                name='Candlestick',
-                showlegend=False
-            ),
-            row=1, col=1
-        )
-    elif st.session_state['selected_chart'] == "Line":
-        fig.add_trace(
-            go.Scatter(
-                x=df_show['UTCTIME'],
-                y=df_show['CLOSE'],
-                mode='lines+markers',
-                name='Close Price',
-                line=dict(width=1.5),
-                marker=dict(size=4),
-                showlegend=False
-            ),
-            row=1, col=1
-        )
-    elif st.session_state['selected_chart'] == "OHLC":
-        fig.add_trace(
-            go.Ohlc(
-                x=df_show['UTCTIME'],
-                open=df_show['OPEN'],
-                high=df_show['HIGH'],
-                low=df_show['LOW'],
-                close=df_show['CLOSE'],
-                name='OHLC',
-                showlegend=False
-            ),
-            row=1, col=1
-        )
-
-    if "VOL" in st.session_state['selected_indicator']:
-        fig.add_trace(
-            go.Bar(
-                x=df_show['UTCTIME'],
-                y=df_show['VOLUME'],
-                name=f'Volume ({st.session_state['crypto_symbol']})',
-                marker_color=df_show['VOLUME_COLOR'],
-                marker_opacity=0.25,
-                showlegend=False
-            ),
-            row=2, col=1
-        )
-
-    if "MA" in st.session_state['selected_indicator']:
-        fig.add_trace(go.Scatter(
-            x=df_show['UTCTIME'],
-            y=df_show['MA7'],
-            mode='lines',
-            name='MA(7)',
-            line=dict(color='orange', width=1.5)
-        ), row=1, col=1)
-        fig.add_trace(go.Scatter(
-            x=df_show['UTCTIME'],
-            y=df_show['MA50'],
-            mode='lines',
-            name='MA(50)',
-            line=dict(color='cyan', width=1.5)
-        ), row=1, col=1)
-        fig.add_trace(go.Scatter(
-            x=df_show['UTCTIME'],
-            y=df_show['MA100'],
-            mode='lines',
-            name='MA(100)',
-            line=dict(color='purple', width=1.5)
-        ), row=1, col=1)
-        fig.add_annotation(
-            x=0, y=1.1,
-            xref='paper', yref='paper',
-            showarrow=False,
-            align='left',
-            text=f"<span style='color:orange;'>MA(7): ${ma7}</span> &nbsp; "
-                f"<span style='color:cyan;'>MA(50): ${ma50}</span> &nbsp; "
-                f"<span style='color:purple;'>MA(100): ${ma100}</span>",
-            font=dict(size=12),
-            borderpad=4,
-            bgcolor='rgba(0,0,0,0)', 
-        )
-        
-    if "EMA" in st.session_state['selected_indicator']:
-        fig.add_trace(go.Scatter(
-            x=df_show['UTCTIME'],
-            y=df_show['EMA7'],
-            mode='lines',
-            name='EMA(7)',
-            line=dict(color='orange', width=1.5)
-        ), row=1, col=1)
-        fig.add_trace(go.Scatter(
-            x=df_show['UTCTIME'],
-            y=df_show['EMA50'],
-            mode='lines',
-            name='EMA(50)',
-            line=dict(color='cyan', width=1.5)
-        ), row=1, col=1)
-        fig.add_trace(go.Scatter(
-            x=df_show['UTCTIME'],
-            y=df_show['EMA100'],
-            mode='lines',
-            name='EMA(100)',
-            line=dict(color='purple', width=1.5)
-        ), row=1, col=1)
-        fig.add_annotation(
-            x=0, y=1.1,
-            xref='paper', yref='paper',
-            showarrow=False,
-            align='left',
-            text=f"<span style='color:orange;'>EMA(7): ${ema7}</span> &nbsp; "
-                f"<span style='color:cyan;'>EMA(50): ${ema50}</span> &nbsp; "
-                f"<span style='color:purple;'>EMA(100): ${ema100}</span>",
-            font=dict(size=12),
-            borderpad=4,
-            bgcolor='rgba(0,0,0,0)', 
-        )
-
-
-    fig.update_layout(
-        template='plotly_dark',
-        dragmode=False,
-        showlegend=False,
-        xaxis_rangeslider_visible=False,
-        margin=dict(
-            t=69 if any(i in st.session_state['selected_indicator'] for i in ["MA", "EMA"]) else 50, 
-            b=100, 
-            l=0, 
-            r=0
-            ),
+    # The figure skeleton is built once per (chart type, indicator set) and
+    # only its trace data is replaced on later runs.
+    if "chart_templates" not in st.session_state:
+        st.session_state["chart_templates"] = ChartTemplates()
+    template = st.session_state["chart_templates"].get(
+        st.session_state['selected_chart'], st.session_state['selected_indicator']
     )
+    close_line = None
+    if st.session_state['selected_chart'] == "Line":
+        close_line = downsample_line(df_show, 'CLOSE', CHART_POINT_BUDGET)
+    lines = {col: downsample_line(df_show, col, CHART_POINT_BUDGET) for col in template.lines}
+    with metrics.timed("stage_seconds", stage="figure_fill"):
+        fig = template.fill(
+            df_candles,
+            close_line=close_line,
+            lines=lines,
+            volume_name=f'Volume ({st.session_state['crypto_symbol']})',
+            overlay_text={
+                "MA": f"<span style='color:orange;'>MA(7): ${ma7}</span> &nbsp; "
+                    f"<span style='color:cyan;'>MA(50): ${ma50}</span> &nbsp; "
+                    f"<span style='color:purple;'>MA(100): ${ma100}</span>",
+                "EMA": f"<span style='color:orange;'>EMA(7): ${ema7}</span> &nbsp; "
+                    f"<span style='color:cyan;'>EMA(50): ${ema50}</span> &nbsp; "
+                    f"<span style='color:purple;'>EMA(100): ${ema100}</span>",
+            },
+        )
 
-    if "VOL" in st.session_state['selected_indicator']:
-        fig.update_xaxes(showgrid=True, row=1, col=1)
-        fig.update_xaxes(showgrid=True, row=2, col=1)
-        fig.update_yaxes(showgrid=False, row=2, col=1)
-        fig.update_yaxes(showticklabels=False, row=2, col=1)
-    else:
-        fig.update_xaxes(showgrid=True, row=1, col=1)
-
-    st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+    # Serializes the figure (to_dict + JSON) and queues it for the browser.
+    with metrics.timed("stage_seconds", stage="figure_render"):
+        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
 chart_component()
 # === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === ===
 
 
 
 # ===== AI INSIGHTS =====
-@st.fragment()
+# Polls while a job is running; the LLM call itself runs on the ai_jobs pool.
+@st.fragment(run_every=AI_POLL_INTERVAL if st.session_state.ai_job else None)
+@metrics.timed("fragment_seconds", fragment="ai_panel")
 def ai_panel():
     st.subheader(f"✨ AI Insights for {st.session_state['selected_crypto']} on Daily Timeframe")
 
@@ -747,24 +467,39 @@ def ai_panel():
 
     with col2:
         st.markdown("AI Analysis Result:")
-        if not st.session_state.show_ai_result:
-            if st.button("✨ Generate", disabled=st.session_state.ai_loading):
-                st.session_state.ai_loading = True
-
-                with st.spinner("Generating AI insight..."):
-                    raw = get_ai_insight()
-
-                    ai_json = json.loads(
-                        raw["choices"][0]["message"]["content"]
-                    )
-
-                    st.session_state.ai_result = {
-                        "llm": raw.get("model"),
-                        **ai_json
-                    }
-
-                st.session_state.ai_loading = False
+        if st.session_state.ai_job:
+            status, value = ai_jobs.status(st.session_state.ai_job)
+            if status == "pending":
+                st.info("⏳ Generating AI insight...")
+                return
+
+            st.session_state.ai_job = None
+            if status == "done":
+                st.session_state.ai_result = value
                 st.session_state.show_ai_result = True
+            elif status == "error":
+                st.session_state.ai_error = f"Error generating AI insight: {value}"
+            elif status == "timeout":
+                st.session_state.ai_error = "Error generating AI insight: timed out"
+            # Full rerun so the fragment stops polling.
+            st.rerun()
+
+        if not st.session_state.show_ai_result:
+            if st.session_state.get("ai_error"):
+                st.error(st.session_state.pop("ai_error"))
+            # Pre-computed by the daily batch (python -m core.ai_batch), if it ran today.
+            daily = daily_insight(st.session_state['selected_crypto'])
+            if daily:
+                generated_at = datetime.fromtimestamp(daily["generated_at"], timezone.utc)
+                st.caption(f"Daily insight generated at {generated_at:%H:%M} UTC")
+                st.json(daily["result"], expanded=1)
+            if st.button("✨ Regenerate" if daily else "✨ Generate"):
+                # Regenerate asks for a fresh insight rather than the cached one.
+                st.session_state.ai_job = ai_jobs.submit(
+                    st.session_state["technical_payload"],
+                    st.secrets['OPENROUTER_API_KEY'],
+                    force=bool(daily)
+                )
                 st.rerun()
 
         else:
@@ -777,3 +512,42 @@ if st.session_state['selected_interval'] == "Days":
 
 
 # === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === ===
+
+
+
+# ===== SCREENER =====
+@st.fragment()
+@metrics.timed("fragment_seconds", fragment="screener_component")
+def screener_component():
+    st.subheader("🔎 Screener on Daily Timeframe")
+    payloads = screen(crypto_options)
+    st.dataframe(pd.DataFrame(screener_rows(payloads)), hide_index=True, use_container_width=True)
+
+
+if st.session_state["show_screener"]:
+    screener_component()
+# === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === ===
+
+
+
+# ===== DEBUG =====
+# Opened with ?debug=1; the same data is served on /metrics and /metrics.json
+# when DASHBOARD_METRICS_PORT is set.
+serve_metrics()
+
+if st.query_params.get("debug") == "1":
+    with st.expander("🛠 Debug: timings and cache metrics", expanded=True):
+        snapshot = metrics.snapshot()
+        timings = pd.DataFrame([
+            {
+                "Metric": t["name"],
+                "Labels": ", ".join(f"{k}={v}" for k, v in t["labels"].items()),
+                "Count": t["count"],
+                "Mean ms": t["sum"] / t["count"] * 1000,
+                "Max ms": t["max"] * 1000,
+            }
+            for t in snapshot["timings"]
+        ])
+        st.dataframe(timings, hide_index=True, use_container_width=True)
+        st.json(snapshot["collectors"], expanded=1)
+# === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === === ===
@@ -0,0 +1,6 @@
+def kline_rows(start, count, step=60_000):
+    # Raw REST klines, one every `step` ms from `start`, all with the same prices.
+    return [
+        [start + i * step, "1.0", "2.0", "0.5", "1.5", "10.0", start + (i + 1) * step - 1, "0", 1, "0", "0", "0"]
+        for i in range(count)
+    ]
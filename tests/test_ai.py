@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from core import ai
+from core.ai import AiInsightCache
+from core.storage import read_json
+
+
+@pytest.fixture
+def generated(monkeypatch):
+    generated = []
+
+    def request_ai_insight(payload, api_key):
+        generated.append(payload)
+        return {"n": len(generated)}
+
+    monkeypatch.setattr(ai, "request_ai_insight", request_ai_insight)
+    monkeypatch.setattr(ai, "parse_ai_insight", lambda raw: raw)
+    return generated
+
+
+def test_processes_keep_each_others_entries(tmp_path):
+    path = str(tmp_path / "ai_cache.json")
+    dashboard = AiInsightCache(path)
+    batch = AiInsightCache(path)
+
+    dashboard.put("a", {"from": "dashboard"})
+    batch.put("b", {"from": "batch"})
+    dashboard.put("c", {"from": "dashboard"})
+
+    assert sorted(read_json(path)) == ["a", "b", "c"]
+    assert dashboard.get("b") == {"from": "batch"}
+    assert batch.get("c") == {"from": "dashboard"}
+
+
+def test_force_skips_the_cached_result(tmp_path, generated):
+    cache = AiInsightCache(str(tmp_path / "ai_cache.json"))
+    payload = {"instrument": "BTC-USD", "close": 100.0}
+
+    assert cache.get_or_generate(payload, "key") == {"n": 1}
+    assert cache.get_or_generate(payload, "key") == {"n": 1}
+    assert cache.get_or_generate(payload, "key", force=True) == {"n": 2}
+    assert cache.get_or_generate(payload, "key") == {"n": 2}
+    assert len(generated) == 2
+
+
+def test_forced_call_does_not_join_a_plain_miss(tmp_path, monkeypatch):
+    cache = AiInsightCache(str(tmp_path / "ai_cache.json"))
+    payload = {"instrument": "BTC-USD", "close": 100.0}
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def request_ai_insight(payload, api_key):
+        calls.append(api_key)
+        if api_key == "plain":
+            started.set()
+            release.wait(5)
+        return {"n": len(calls)}
+
+    monkeypatch.setattr(ai, "request_ai_insight", request_ai_insight)
+    monkeypatch.setattr(ai, "parse_ai_insight", lambda raw: raw)
+    plain = threading.Thread(target=cache.get_or_generate, args=(payload, "plain"))
+    plain.start()
+    started.wait(5)
+    # The plain miss is still in flight: the forced call makes its own.
+    assert cache.get_or_generate(payload, "forced", force=True) == {"n": 2}
+    release.set()
+    plain.join()
+    assert calls == ["plain", "forced"]
+
+
+def test_counters_are_exact_under_concurrency(tmp_path, generated):
+    cache = AiInsightCache(str(tmp_path / "ai_cache.json"))
+    cache.put(ai.payload_key({"close": 1.0}, cache.significant_digits), {"n": 0})
+    threads, calls = 8, 200
+
+    def run():
+        for _ in range(calls):
+            cache.get_or_generate({"close": 1.0}, "key")
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    stats = cache.stats()
+    assert stats["hits"] == threads * calls
+    assert stats["misses"] == stats["requests"] == stats["errors"] == 0
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from benchmarks import standin
+from core import ai
+from core.ai import AiInsightCache
+from core.ai_jobs import AiJobQueue
+
+PAYLOAD = {"instrument": "BTC-USD", "close": 100.0}
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    server, url = standin.start(ai_delay=0.2)
+    server.url = url
+    monkeypatch.setattr(ai, "OPENROUTER_URL", f"{url}/api/v1/chat/completions")
+    monkeypatch.setattr(ai, "ai_cache", AiInsightCache(str(tmp_path / "ai_cache.json")))
+    yield server
+    server.shutdown()
+
+
+def settle(queue, job_id, timeout=5):
+    # Polls the way the dashboard does until the job leaves "pending".
+    deadline = time.monotonic() + timeout
+    while True:
+        state, value = queue.status(job_id)
+        if state != "pending" or time.monotonic() > deadline:
+            return state, value
+        time.sleep(0.02)
+
+
+def test_submitted_job_completes(server):
+    queue = AiJobQueue(workers=2)
+    job_id = queue.submit(PAYLOAD, "key")
+
+    assert queue.status(job_id) == ("pending", None)
+    state, result = settle(queue, job_id)
+
+    assert state == "done"
+    assert result["llm"] == "standin/model"
+    assert result["buy_confidence"] == 0.4
+    assert server.counts["/api/v1/chat/completions"] == 1
+    # The result is cached: a second job does not call the endpoint.
+    assert settle(queue, queue.submit(PAYLOAD, "key")) == ("done", result)
+    assert server.counts["/api/v1/chat/completions"] == 1
+
+
+def test_slow_job_times_out_then_reads_cancelled(server):
+    queue = AiJobQueue(workers=2, timeout=0.05)
+    job_id = queue.submit(PAYLOAD, "key")
+    time.sleep(0.1)
+
+    assert queue.status(job_id) == ("timeout", None)
+    assert queue.status(job_id) == ("cancelled", None)
+    # The request already running still finishes into the cache.
+    queue._pool.shutdown(wait=True)
+    assert ai.ai_cache.stats()["requests"] == 1
+    assert ai.ai_cache.get(ai.payload_key(PAYLOAD)) is not None
+
+
+def test_queued_job_cancelled_before_it_starts(server):
+    queue = AiJobQueue(workers=1)
+    running = queue.submit(PAYLOAD, "key")
+    queued = queue.submit(dict(PAYLOAD, close=200.0), "key")
+    queue.cancel(queued)
+
+    assert queue.status(queued) == ("cancelled", None)
+    assert settle(queue, running)[0] == "done"
+    queue._pool.shutdown(wait=True)
+    assert server.counts["/api/v1/chat/completions"] == 1
+
+
+def test_endpoint_error_reaches_the_poller(server, monkeypatch):
+    monkeypatch.setattr(ai, "OPENROUTER_URL", f"{server.url}/api/v1/missing")
+    queue = AiJobQueue(workers=2)
+
+    state, error = settle(queue, queue.submit(PAYLOAD, "key"))
+
+    assert state == "error"
+    assert isinstance(error, RuntimeError)
+    assert "not found" in str(error)
+    assert ai.ai_cache.stats()["errors"] == 1
@@ -0,0 +1,117 @@
+import math
+import os
+
+import pytest
+
+from core import alerts
+from core.alerts import AlertEngine, crossed, parse_rules
+from core.klines import decode_klines
+from core.storage import write_json
+from core.symbols import CRYPTO_OPTIONS
+
+DAY_MS = 86_400_000
+START_MS = 1_700_000_000_000 // DAY_MS * DAY_MS
+CLOSE_ABOVE_100 = {"id": "btc-100", "instrument": "BTC-USD", "interval": "1d", "when": ["CLOSE", "crosses_above", 100]}
+
+
+def window(closes, first=0):
+    # KLINE_DTYPE klines for candles first, first + 1, ... with these closes;
+    # the last one is the open candle.
+    rows = []
+    for i, close in enumerate(closes, first):
+        open_time = START_MS + i * DAY_MS
+        rows.append([open_time, close, close, close, close, "1", open_time + DAY_MS - 1, "1", 1, "0", "0", "0"])
+    return decode_klines(rows)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = AlertEngine(str(tmp_path / "rules.json"), sinks={})
+    engine.set_rules(parse_rules([CLOSE_ABOVE_100]))
+    return engine
+
+
+def test_crossed_fires_on_a_strict_cross_from_or_through_equality():
+    condition = ("CLOSE", "crosses_above", 100.0)
+    assert crossed(condition, {"CLOSE": 99.0}, {"CLOSE": 101.0})
+    assert crossed(condition, {"CLOSE": 100.0}, {"CLOSE": 101.0})
+    assert not crossed(condition, {"CLOSE": 99.0}, {"CLOSE": 100.0})
+    assert not crossed(condition, {"CLOSE": 101.0}, {"CLOSE": 102.0})
+
+    below = ("CLOSE", "crosses_below", 100.0)
+    assert crossed(below, {"CLOSE": 100.0}, {"CLOSE": 99.0})
+    assert not crossed(below, {"CLOSE": 101.0}, {"CLOSE": 100.0})
+
+
+def test_crossed_never_fires_during_warm_up():
+    condition = ("RSI14", "crosses_above", "EMA20")
+    warm_up = {"RSI14": math.nan, "EMA20": 50.0}
+    assert not crossed(condition, warm_up, {"RSI14": 60.0, "EMA20": 50.0})
+    assert not crossed(condition, {"RSI14": 40.0, "EMA20": 50.0}, {"RSI14": 60.0, "EMA20": math.nan})
+
+
+def test_first_window_seeds_without_firing(engine):
+    # The cross at candle 2 happened before the series was watched.
+    assert engine.process("BTCUSDT", "1d", window([90, 95, 105, 106])) == []
+
+
+def test_new_closed_candles_fire_once(engine):
+    engine.process("BTCUSDT", "1d", window([90, 95, 96]))
+    # Candles 2 (96) and 3 (105) close; only 3 crosses.
+    fired = engine.process("BTCUSDT", "1d", window([90, 95, 96, 105, 105]))
+    assert [a["rule"] for a in fired] == ["btc-100"]
+    assert fired[0]["open_time"] == START_MS + 3 * DAY_MS
+    assert engine.process("BTCUSDT", "1d", window([90, 95, 96, 105, 105, 107])) == []
+    assert engine.stats()["candles"] == 3
+
+
+def test_shifted_window_skips_seen_candles(engine):
+    engine.process("BTCUSDT", "1d", window([90, 95, 96]))
+    fired = engine.process("BTCUSDT", "1d", window([95, 96, 105, 105], first=1))
+    assert len(fired) == 1
+
+
+def test_discontinuous_window_reseeds(engine):
+    engine.process("BTCUSDT", "1d", window([90, 95, 96]))
+    # Candles 2..9 are missing: nothing to compare the cross at 11 against.
+    assert engine.process("BTCUSDT", "1d", window([90, 105, 106], first=10)) == []
+    assert engine.process("BTCUSDT", "1d", window([90, 105, 106, 90, 120, 121], first=10)) != []
+
+
+def test_unwatched_series_is_ignored(engine):
+    assert engine.process("ETHUSDT", "1d", window([90, 95, 105, 106])) == []
+
+
+def test_star_expands_to_every_instrument():
+    rules = parse_rules([dict(CLOSE_ABOVE_100, instrument="*")])
+    assert [r.instrument for r in rules] == list(CRYPTO_OPTIONS)
+    assert all(r.condition == ("CLOSE", "crosses_above", 100.0) for r in rules)
+
+
+@pytest.mark.parametrize("change", [
+    {"when": ["RSI", "crosses_above", 30]},
+    {"when": ["RSI14", "above", 30]},
+    {"interval": "2d"},
+])
+def test_bad_specs_are_rejected(change):
+    with pytest.raises(ValueError):
+        parse_rules([dict(CLOSE_ABOVE_100, **change)])
+
+
+def test_bad_rules_file_keeps_the_previous_rules(tmp_path, monkeypatch):
+    path = str(tmp_path / "rules.json")
+    write_json(path, [CLOSE_ABOVE_100])
+    engine = AlertEngine(path, sinks={})
+    engine.reload()
+    assert engine.stats()["rules"] == 1
+
+    write_json(path, [dict(CLOSE_ABOVE_100, when=["RSI", "crosses_above", 30])])
+    os.utime(path, ns=(1, 1))
+    parses = []
+    monkeypatch.setattr(alerts, "parse_rules", lambda specs: parses.append(specs) or parse_rules(specs))
+    engine.reload()
+    engine.reload()
+
+    assert len(parses) == 1
+    assert engine.stats()["rules"] == 1
+    assert ("BTCUSDT", "1d") in engine._index
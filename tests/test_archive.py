@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+import pytest
+
+from benchmarks import standin
+from core import archive
+from core.archive import KlineArchive
+
+HOUR = 3_600_000
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def fetch_klines(symbol, interval, limit=300, start_time=None):
+        calls.append((limit, start_time))
+        query = {"symbol": symbol, "interval": interval, "limit": str(limit)}
+        if start_time is not None:
+            query["startTime"] = str(start_time)
+        return standin.klines(query)
+
+    monkeypatch.setattr(archive, "fetch_klines", fetch_klines)
+    return calls
+
+
+def test_history_fetches_only_the_needed_span(calls, tmp_path, monkeypatch):
+    backfills = []
+    store = KlineArchive(str(tmp_path))
+    monkeypatch.setattr(store, "backfill_async", lambda *key: backfills.append(key))
+    end = standin.current_open("1h") - 300 * HOUR
+
+    history = store.history("BTCUSDT", "1h", end, 1200)
+
+    assert len(history) == 1200
+    assert history['open_time'][0] == end - 1200 * HOUR
+    assert history['open_time'][-1] == end - HOUR
+    assert np.all(np.diff(history['open_time']) == HOUR)
+    assert sum(limit for limit, _ in calls) == 1200
+    assert backfills == [("BTCUSDT", "1h")]
+    assert store.rows("BTCUSDT", "1h") == 0
+
+
+def test_history_reads_the_archive_once_backfilled(calls, tmp_path):
+    store = KlineArchive(str(tmp_path))
+    store.backfill_async("BTCUSDT", "1h")
+    deadline = time.monotonic() + 10
+    while store._backfilling and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store.rows("BTCUSDT", "1h") > 0
+
+    calls.clear()
+    end = store.last_open_time("BTCUSDT", "1h") + HOUR
+    history = store.history("BTCUSDT", "1h", end, 500)
+
+    assert calls == []
+    assert len(history['open_time']) == 500
+    assert history['open_time'][-1] == end - HOUR
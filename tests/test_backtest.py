@@ -0,0 +1,79 @@
+import math
+
+import numpy as np
+
+from core.backtest import ai_positions, evaluate, forward_fill, forward_returns, hold_between
+from core.storage import write_json
+
+DAY_MS = 86_400_000
+START_MS = 1_700_000_000_000 // DAY_MS * DAY_MS
+
+
+def decision(side, generated_at):
+    confidences = {"buy_confidence": 0.1, "hold_confidence": 0.1, "sell_confidence": 0.1}
+    confidences[f"{side}_confidence"] = 0.8
+    return {"result": confidences, "generated_at": generated_at}
+
+
+def test_ai_decision_is_booked_at_the_close_of_its_own_candle(tmp_path):
+    path = str(tmp_path / "ai_daily.json")
+    open_time = START_MS + np.arange(10) * DAY_MS
+    # Generated 12 hours into bar 5: it has seen part of bar 5, so it may
+    # only earn from close5 on.
+    generated_at = (open_time[5] + DAY_MS // 2) / 1000
+    write_json(path, {"day": {"BTC-USD": decision("buy", generated_at)}})
+
+    position = ai_positions("BTC-USD", open_time, path=path)
+
+    assert np.isnan(position[:5]).all()
+    assert (position[5:] == 1).all()
+
+
+def test_ai_decision_at_a_candle_open_belongs_to_that_candle(tmp_path):
+    path = str(tmp_path / "ai_daily.json")
+    open_time = START_MS + np.arange(5) * DAY_MS
+    write_json(path, {
+        "d1": {"BTC-USD": decision("buy", open_time[1] / 1000)},
+        "d3": {"BTC-USD": decision("sell", open_time[3] / 1000 + 60)},
+    })
+
+    position = ai_positions("BTC-USD", open_time, path=path)
+
+    assert np.isnan(position[0])
+    assert position[1:].tolist() == [1, 1, -1, -1]
+
+
+def test_decisions_before_the_history_are_ignored(tmp_path):
+    path = str(tmp_path / "ai_daily.json")
+    open_time = START_MS + np.arange(3) * DAY_MS
+    write_json(path, {"d": {"BTC-USD": decision("buy", (START_MS - DAY_MS) / 1000)}})
+    assert np.isnan(ai_positions("BTC-USD", open_time, path=path)).all()
+
+
+def test_position_earns_the_next_bar_return():
+    close = np.array([100.0, 110.0, 121.0, 60.5])
+    position = np.array([0.0, 1.0, 0.0, 0.0])
+    summary = evaluate(close, position, horizons=(1,), fee_bps=0, warmup=0)
+    # Long from close1 to close2 only.
+    assert math.isclose(summary["total_return"], 0.1)
+    assert summary["trades"] == 2
+    assert math.isclose(summary["fwd1_mean"], 0.1)
+
+
+def test_forward_fill_and_hold_between():
+    values = np.array([np.nan, 1.0, np.nan, 2.0, np.nan])
+    filled = forward_fill(values)
+    assert np.isnan(filled[0])
+    assert filled[1:].tolist() == [1.0, 1.0, 2.0, 2.0]
+
+    enter = np.array([False, True, False, False, False, True])
+    leave = np.array([False, False, False, True, False, False])
+    assert hold_between(enter, leave).tolist() == [0, 1, 1, 0, 0, 1]
+
+
+def test_forward_returns():
+    close = np.array([1.0, 2.0, 4.0])
+    out = forward_returns(close, 1)
+    assert out[:2].tolist() == [1.0, 1.0]
+    assert np.isnan(out[2])
+    assert np.isnan(forward_returns(close, 3)).all()
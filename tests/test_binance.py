@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+
+from core.binance import BinanceClient, BinanceRateLimitError, WeightLimiter
+
+
+class FakeResponse:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.headers = {}
+
+
+class FakeSession:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+
+    def get(self, url, params=None):
+        return FakeResponse(self.status_code)
+
+
+def client(status_code=200):
+    c = BinanceClient("http://binance.test", WeightLimiter(10 ** 9))
+    c._session = FakeSession(status_code)
+    return c
+
+
+def test_counters_are_exact_under_concurrency():
+    c = client()
+    threads, calls = 8, 500
+
+    def run(t):
+        for i in range(calls):
+            c.get("/ticker/24hr", {"symbol": f"T{t}S{i}"})
+
+    workers = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    stats = c.stats()
+    assert stats["calls"] == stats["requests"] == threads * calls
+    assert stats["coalesced"] == 0
+
+
+def test_rate_limit_is_counted():
+    c = client(429)
+    with pytest.raises(BinanceRateLimitError):
+        c.get("/ticker/24hr", {"symbol": "BTCUSDT"})
+    with pytest.raises(BinanceRateLimitError):
+        c.get("/ticker/24hr", {"symbol": "ETHUSDT"})
+
+    stats = c.stats()
+    assert stats["rate_limited"] == 1
+    assert stats["throttled"] == 1
+    assert stats["calls"] == 2
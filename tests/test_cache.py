@@ -0,0 +1,145 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from core import cache, klines
+from core.cache import SingleFlight, TTLCache
+from core.klines import KlineStore
+from tests.conftest import kline_rows
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def test_lru_eviction_at_max_entries():
+    c = TTLCache(max_entries=2)
+    c.set("a", 1, 60)
+    c.set("b", 2, 60)
+    assert c.get("a") == 1  # "b" is now least recently used
+    c.set("c", 3, 60)
+    assert c.get("b") is None
+    assert c.get("a") == 1
+    assert c.get("c") == 3
+    assert c.stats()["evictions"] == 1
+
+
+def test_weight_bound_evicts_oldest():
+    c = TTLCache(max_entries=10, max_weight=5, weigher=len)
+    c.set("a", "xxx", 60)
+    c.set("b", "xxx", 60)
+    assert c.get("a") is None
+    assert c.stats()["weight"] == 3
+
+
+def test_ttl_expiry(clock):
+    c = TTLCache()
+    c.set("a", 1, 10)
+    clock.now += 9.9
+    assert c.get("a") == 1
+    clock.now += 0.1
+    assert c.get("a") is None
+    # Expired entries stay reachable through peek for incremental refreshes.
+    assert c.peek("a") == 1
+
+
+def wait_for_waiters(flight, key, count):
+    # Until `count` callers block on the leader's future.
+    condition = flight._calls[key]._condition
+    deadline = time.monotonic() + 5
+    while len(condition._waiters) < count:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_single_flight_dedups_concurrent_callers():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", fn)))
+    leader.start()
+    assert started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", fn))) for _ in range(8)]
+    for t in followers:
+        t.start()
+    # Followers block on the leader's future.
+    wait_for_waiters(flight, "k", len(followers))
+    release.set()
+    for t in [leader] + followers:
+        t.join(5)
+
+    assert calls == [1]
+    assert results == ["result"] * 9
+
+
+def test_single_flight_shares_exception_without_caching_it():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError("upstream down")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("k", fail)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    assert started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    wait_for_waiters(flight, "k", 1)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(errors) == 2 and errors[0] is errors[1]
+    # The failure is not remembered; the next call runs again.
+    assert flight.do("k", lambda: "ok") == "ok"
+
+
+def test_shorter_limit_served_from_longer_series(monkeypatch):
+    calls = []
+
+    def fetch_klines(symbol, interval, limit=300, start_time=None):
+        calls.append((symbol, interval, limit, start_time))
+        return kline_rows(1_600_000_000_000, limit)
+
+    monkeypatch.setattr(klines, "fetch_klines", fetch_klines)
+    store = KlineStore()
+
+    long = store.get("BTCUSDT", "1m", 500)
+    assert len(long) == 500
+    short = store.get("BTCUSDT", "1m", 100)
+
+    assert len(calls) == 1
+    assert np.array_equal(short, long[-100:])
@@ -0,0 +1,56 @@
+import threading
+import time
+
+import pytest
+
+from core import fng
+from core.fng import DAY, FngService
+
+HISTORY = [(1_600_000_000 + i * DAY, i % 100, "Neutral") for i in range(400)]
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    fetches = []
+
+    def fetch_fng(limit):
+        fetches.append(limit)
+        return HISTORY[-limit:] if limit else HISTORY, 3600
+
+    monkeypatch.setattr(fng, "fetch_fng", fetch_fng)
+    return fetches
+
+
+def test_series_is_cached_until_the_update(tmp_path, fetches):
+    service = FngService(str(tmp_path / "fng.json"))
+    assert service.series(10) == HISTORY[-10:]
+    assert service.series(30) == HISTORY[-30:]
+    assert fetches == [30]
+    assert service.series(0) == HISTORY
+    assert service.series(0) == HISTORY
+    assert fetches == [30, 0]
+
+
+def test_full_history_does_not_join_a_shorter_refresh(tmp_path, fetches, monkeypatch):
+    service = FngService(str(tmp_path / "fng.json"))
+    fetch_fng = fng.fetch_fng
+    started, release = threading.Event(), threading.Event()
+
+    def slow_fetch_fng(limit):
+        if limit:
+            started.set()
+            release.wait(5)
+        return fetch_fng(limit)
+
+    monkeypatch.setattr(fng, "fetch_fng", slow_fetch_fng)
+    short = threading.Thread(target=service.series, args=(30,))
+    short.start()
+    started.wait(5)
+    # The 30-day refresh is still in flight; the full history is fetched
+    # rather than waited for.
+    begin = time.monotonic()
+    assert service.series(0) == HISTORY
+    assert time.monotonic() - begin < 1
+    release.set()
+    short.join()
+    assert sorted(fetches) == [0, 30]
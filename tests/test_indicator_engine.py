@@ -0,0 +1,107 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from core.indicator_engine import COLUMNS, IndicatorEngine
+from core.indicators import calculate_adx, calculate_macd, calculate_rsi
+
+
+def frame(n, seed=0, flat=None):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    high = close + rng.uniform(0, 1, n)
+    low = close - rng.uniform(0, 1, n)
+    if flat is not None:
+        # Zero-range bars: every difference and true range is 0.
+        close[flat] = high[flat] = low[flat] = close[flat.start]
+    return pd.DataFrame({
+        "TIMESTAMP": np.arange(n) * 60.0,
+        "HIGH": high,
+        "LOW": low,
+        "CLOSE": close,
+    })
+
+
+def pandas_columns(df):
+    macd, signal, hist = calculate_macd(df["CLOSE"])
+    adx, plus_di, minus_di = calculate_adx(df["HIGH"], df["LOW"], df["CLOSE"])
+    return {
+        "EMA20": df["CLOSE"].ewm(span=20, adjust=False).mean(),
+        "MA50": df["CLOSE"].rolling(50).mean(),
+        "RSI14": calculate_rsi(df["CLOSE"]),
+        "MACD": macd,
+        "MACD_SIGNAL": signal,
+        "MACD_HIST": hist,
+        "ADX14": adx,
+        "PLUS_DI14": plus_di,
+        "MINUS_DI14": minus_di,
+    }
+
+
+def update(engine, df):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        return engine.update(df["TIMESTAMP"], df["HIGH"], df["LOW"], df["CLOSE"])
+
+
+def test_series_input_matches_pandas_without_warnings():
+    for df in (frame(300), frame(300, seed=1, flat=slice(0, 40)), frame(300, seed=2, flat=slice(100, 160))):
+        columns = update(IndicatorEngine(), df)
+        for name, expected in pandas_columns(df).items():
+            assert np.array_equal(columns[name], expected.to_numpy(), equal_nan=True), name
+
+
+def test_array_input_matches_series_input_without_warnings():
+    df = frame(300, seed=4, flat=slice(0, 30))
+    arrays = {name: df[name].to_numpy() for name in df}
+    expected = update(IndicatorEngine(), df)
+    columns = update(IndicatorEngine(), arrays)
+    for name in COLUMNS:
+        assert np.array_equal(columns[name], expected[name], equal_nan=True), name
+
+
+def assert_matches(columns, df):
+    for name, expected in pandas_columns(df).items():
+        assert np.array_equal(columns[name], expected.to_numpy(), equal_nan=True), name
+    fresh = update(IndicatorEngine(window=len(df)), df)
+    for name in COLUMNS:
+        assert np.array_equal(columns[name], fresh[name], equal_nan=True), name
+
+
+def test_shifted_window_reseeds_to_match_pandas():
+    df = frame(320, seed=3)
+    engine = IndicatorEngine(window=300)
+    update(engine, df.iloc[:300])
+    assert_matches(update(engine, df.iloc[1:301]), df.iloc[1:301].reset_index(drop=True))
+
+
+def test_rerun_of_the_live_candle_keeps_committed_state():
+    df = frame(300, seed=5)
+    engine = IndicatorEngine(window=300)
+    update(engine, df)
+    committed = list(engine.closes)
+
+    ticked = df.copy()
+    ticked.loc[299, ["CLOSE", "HIGH", "LOW"]] = [df["CLOSE"][299] + 3, df["HIGH"][299] + 3, df["LOW"][299]]
+    assert_matches(update(engine, ticked), ticked)
+    assert engine.closes == committed
+    # Back to the first tick: the live candle is evaluated from the
+    # committed state again, not from the previous live one.
+    assert_matches(update(engine, df), df)
+
+
+def test_growing_window_commits_only_new_candles():
+    df = frame(200, seed=6)
+    engine = IndicatorEngine(window=300)
+    update(engine, df.iloc[:100])
+    state = engine.state
+    assert_matches(update(engine, df.iloc[:150]), df.iloc[:150])
+    assert engine.state is state
+    assert len(engine.closes) == 149
+    assert_matches(update(engine, df), df)
+
+
+def test_empty_window():
+    columns = update(IndicatorEngine(), frame(0))
+    assert columns == {name: [] for name in COLUMNS}
@@ -0,0 +1,93 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import indicators, kernels
+
+
+def random_walk(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    high = close + rng.uniform(0, 2, n)
+    low = close - rng.uniform(0, 2, n)
+    return high, low, close
+
+
+def with_flat(high, low, close, flat):
+    # Zero-range bars with unchanged closes: every difference, true range and
+    # directional move is 0, so the RSI and DI divisions hit 0/0.
+    high, low, close = high.copy(), low.copy(), close.copy()
+    value = close[max(flat.start - 1, 0)]
+    close[flat] = high[flat] = low[flat] = value
+    return high, low, close
+
+
+def constant(n):
+    return np.full(n, 5.0), np.full(n, 5.0), np.full(n, 5.0)
+
+
+CASES = {
+    "walk": random_walk(500, 1),
+    "walk_long": random_walk(5000, 2),
+    "flat_start": with_flat(*random_walk(300, 3), slice(0, 40)),
+    "flat_middle": with_flat(*random_walk(300, 4), slice(120, 180)),
+    "flat_end": with_flat(*random_walk(300, 5), slice(260, 300)),
+    "constant": constant(50),
+    "n0": random_walk(0, 6),
+    "n1": random_walk(1, 7),
+    "n2": random_walk(2, 8),
+}
+
+
+def pandas_atr(h, l, c, period=14):
+    tr = pd.concat([h - l, (h - c.shift()).abs(), (l - c.shift()).abs()], axis=1).max(axis=1)
+    return tr.ewm(alpha=1 / period, adjust=False).mean()
+
+
+def assert_identical(actual, expected):
+    actual = actual if isinstance(actual, tuple) else (actual,)
+    expected = expected if isinstance(expected, tuple) else (expected,)
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        e = np.asarray(e, dtype=np.float64)
+        assert np.asarray(a).shape == e.shape
+        assert np.array_equal(a, e, equal_nan=True)
+
+
+@pytest.fixture(params=sorted(CASES))
+def ohlc(request):
+    high, low, close = CASES[request.param]
+    return high, low, close, pd.Series(high), pd.Series(low), pd.Series(close)
+
+
+def kernel(fn, *args):
+    # The kernels must not leak numpy division warnings.
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        return fn(*args)
+
+
+def test_rsi(ohlc):
+    high, low, close, h, l, c = ohlc
+    assert_identical(kernel(kernels.rsi, close, 14), indicators.calculate_rsi(c, 14))
+
+
+def test_macd(ohlc):
+    high, low, close, h, l, c = ohlc
+    assert_identical(kernel(kernels.macd, close), indicators.calculate_macd(c))
+
+
+def test_atr(ohlc):
+    high, low, close, h, l, c = ohlc
+    assert_identical(kernel(kernels.atr, high, low, close, 14), pandas_atr(h, l, c, 14))
+
+
+def test_adx(ohlc):
+    high, low, close, h, l, c = ohlc
+    with warnings.catch_warnings():
+        # The pandas formula itself divides 0/0 on flat stretches.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        expected = indicators.calculate_adx(h, l, c, 14)
+    assert_identical(kernel(kernels.adx, high, low, close, 14), expected)
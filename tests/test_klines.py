@@ -0,0 +1,47 @@
+import time
+
+from core import klines
+from core.binance import request_weight
+from core.klines import KlineSeries
+from tests.conftest import kline_rows
+
+
+def test_refresh_requests_only_the_gap(monkeypatch):
+    now = int(time.time() * 1000) // 60_000 * 60_000
+    calls = []
+
+    def fetch_klines(symbol, interval, limit=300, start_time=None):
+        calls.append((limit, start_time))
+        if start_time is None:
+            return kline_rows(now - 299 * 60_000, 300)
+        return kline_rows(start_time, min(limit, (now - start_time) // 60_000 + 1))
+
+    monkeypatch.setattr(klines, "fetch_klines", fetch_klines)
+    series = KlineSeries("BTCUSDT", "1m")
+    series.load(300)
+    series.refresh()
+
+    limit, start_time = calls[-1]
+    assert start_time == now
+    assert limit <= 3
+    assert request_weight("/klines", {"limit": limit}) == 1
+    assert len(calls) == 2
+
+
+def test_refresh_reloads_when_page_comes_back_full(monkeypatch):
+    now = int(time.time() * 1000) // 60_000 * 60_000
+    calls = []
+
+    def fetch_klines(symbol, interval, limit=300, start_time=None):
+        calls.append((limit, start_time))
+        if start_time is None:
+            return kline_rows(now - 299 * 60_000, 300)
+        return kline_rows(start_time, limit)
+
+    monkeypatch.setattr(klines, "fetch_klines", fetch_klines)
+    series = KlineSeries("BTCUSDT", "1m")
+    series.load(300)
+    series.refresh()
+
+    assert calls[-1] == (300, None)
+    assert len(series) == 300
@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from benchmarks import standin
+from core import market_worker
+from core.market_data import VERSION, MarketData
+from core.market_worker import MarketWorker
+from core.reference import DAY_MS
+
+
+class FakeAthIndex:
+    def __init__(self, ath, ts):
+        self.entry = (ath, ts)
+
+    def get(self, symbol):
+        return self.entry
+
+    def observe(self, symbol, high):
+        if high > self.entry[0]:
+            self.entry = (high, 1_700_000_000.0)
+        return self.entry
+
+
+class FakeReferences:
+    def get(self, symbol):
+        return {7: 101.5, 30: 99.0, 365: None}
+
+
+class FakeFng:
+    def __init__(self):
+        self.entries = [(1_700_000_000 + i * 86400, 40 + i, "Fear") for i in range(30)]
+
+    def series(self, limit):
+        return self.entries[-limit:]
+
+
+@pytest.fixture
+def published(monkeypatch, tmp_path):
+    monkeypatch.setattr(market_worker, "ath_index", FakeAthIndex(500.0, 1_600_000_000.0))
+    monkeypatch.setattr(market_worker, "reference_prices", FakeReferences())
+    monkeypatch.setattr(market_worker, "fng_service", FakeFng())
+    worker = MarketWorker(["BTCUSDT"], root=str(tmp_path))
+    ticker = standin.ticker_24hr({"symbol": "BTCUSDT"})
+    worker.publish_summary("BTCUSDT", ticker)
+    worker.publish_fng()
+    return worker, MarketData(str(tmp_path))
+
+
+def test_summary_round_trip(published):
+    _, data = published
+    assert data.ath("BTCUSDT") == (500.0, 1_600_000_000.0)
+    assert data.references("BTCUSDT") == {7: 101.5, 30: 99.0, 365: None}
+    assert data.ath("ETHUSDT") is None
+
+
+def test_references_of_another_day_are_ignored(published, monkeypatch):
+    _, data = published
+    tomorrow = time.time() + DAY_MS / 1000
+    monkeypatch.setattr("core.market_data.time.time", lambda: tomorrow)
+    assert data.references("BTCUSDT") is None
+
+
+def test_fng_round_trip(published):
+    _, data = published
+    entries = data.fng()
+    assert entries == FakeFng().entries
+    assert entries[-1][1:] == (69, "Fear")
+
+
+def test_unchanged_summary_is_not_rewritten(published):
+    worker, data = published
+    block = worker._blocks[next(p for p in worker._blocks if p.endswith("BTCUSDT-summary.bin"))]
+    version = int(block.header[VERSION])
+    worker.publish_summary("BTCUSDT", standin.ticker_24hr({"symbol": "BTCUSDT"}))
+    assert int(block.header[VERSION]) == version
+    worker.publish_summary("BTCUSDT", {"highPrice": "900"})
+    assert int(block.header[VERSION]) == version + 2
+    assert data.ath("BTCUSDT") == (900.0, 1_700_000_000.0)
@@ -0,0 +1,127 @@
+import time
+
+import pytest
+
+from benchmarks import standin
+from core import klines, market_worker, stream
+from core.klines import KlineStore
+from core.market_worker import MarketWorker
+from core.stream import MarketStream
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def server():
+    server, url = standin.start_stream(every=0.05)
+    server.url = url
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def store(monkeypatch):
+    def fetch_klines(symbol, interval, limit=300, start_time=None):
+        query = {"symbol": symbol, "interval": interval, "limit": str(limit)}
+        if start_time is not None:
+            query["startTime"] = str(start_time)
+        return standin.klines(query)
+
+    store = KlineStore()
+    monkeypatch.setattr(klines, "fetch_klines", fetch_klines)
+    monkeypatch.setattr(stream, "kline_store", store)
+    return store
+
+
+def test_subscribe_then_ticker(server):
+    market = MarketStream(server.url)
+    assert market.ticker("BTCUSDT") is None
+    assert market.subscribe("BTCUSDT")
+    assert wait_until(lambda: market.ticker("BTCUSDT") is not None)
+
+    ticker = market.ticker("BTCUSDT")
+    expected = standin.ticker_24hr({"symbol": "BTCUSDT"})
+    assert ticker["symbol"] == "BTCUSDT"
+    assert ticker["lastPrice"] == expected["lastPrice"]
+    assert server.connects == [["btcusdt@ticker"]]
+
+
+def test_kline_events_patch_the_store(server, store):
+    series = store.series("ETHUSDT", "1m", 100)
+    before = series.klines
+    received = []
+    store.listen(lambda symbol, interval, klines: received.append((symbol, interval)))
+
+    market = MarketStream(server.url)
+    market.subscribe("ETHUSDT", ["1m"])
+    assert wait_until(lambda: series.klines is not before)
+
+    event = standin.stream_event("ethusdt@kline_1m")["k"]
+    assert len(series) == 100
+    assert int(series.klines['open_time'][-1]) == event["t"]
+    assert float(series.klines['close'][-1]) == float(event["c"])
+    assert ("ETHUSDT", "1m") in received
+
+
+def test_kline_events_for_unloaded_series_are_ignored(server, store):
+    market = MarketStream(server.url)
+    market.subscribe("ETHUSDT", ["1h"])
+    assert wait_until(lambda: market.ticker("ETHUSDT") is not None)
+    assert store.stats()["entries"] == 0
+
+
+def test_subscriptions_follow_what_is_wanted(server, monkeypatch):
+    monkeypatch.setattr(stream, "STREAM_SYNC", 0.05)
+    monkeypatch.setattr(stream, "STREAM_IDLE", 0.5)
+    market = MarketStream(server.url)
+    market.subscribe("BTCUSDT")
+    assert wait_until(lambda: market.ticker("BTCUSDT") is not None)
+
+    market.subscribe("ETHUSDT", ["1h"])
+    assert wait_until(lambda: ("SUBSCRIBE", ["ethusdt@kline_1h", "ethusdt@ticker"]) in server.requests)
+
+    # Only ETH is asked for from here on; BTC goes idle and is dropped.
+    assert wait_until(lambda: market.subscribe("ETHUSDT", ["1h"]) and ("UNSUBSCRIBE", ["btcusdt@ticker"]) in server.requests)
+    assert server.connects == [["btcusdt@ticker"]]
+
+
+def test_stale_ticker_falls_back_to_rest(server, monkeypatch, tmp_path):
+    monkeypatch.setattr(stream, "STREAM_STALE", 0.3)
+    market = MarketStream(server.url)
+    fetched = []
+
+    def fetch_ticker_24hr(symbol):
+        fetched.append(symbol)
+        return standin.ticker_24hr({"symbol": symbol})
+
+    monkeypatch.setattr(market_worker, "market_stream", market)
+    monkeypatch.setattr(market_worker, "fetch_ticker_24hr", fetch_ticker_24hr)
+    monkeypatch.setattr(market_worker, "MARKET_TICKER_TTL", 0)
+    worker = MarketWorker(["BTCUSDT"], root=str(tmp_path))
+
+    market.subscribe("BTCUSDT")
+    assert wait_until(lambda: market.ticker("BTCUSDT") is not None)
+    worker.publish_ticker("BTCUSDT")
+    assert fetched == []
+
+    server.paused = True
+    assert wait_until(lambda: market.ticker("BTCUSDT") is None)
+    worker.publish_ticker("BTCUSDT")
+    assert fetched == ["BTCUSDT"]
+
+
+def test_disconnect_falls_back_to_rest(server):
+    market = MarketStream(server.url)
+    market.subscribe("BTCUSDT")
+    assert wait_until(lambda: market.ticker("BTCUSDT") is not None)
+
+    server.drop()
+    assert wait_until(lambda: not market.connected)
+    assert market.ticker("BTCUSDT") is None